@@ -11,6 +11,7 @@ from app.users.models import *
 from app.bots.models import *
 from app.scenarios.models import *
 from app.users_data.models import *
+from app.broadcasts.models import *
 
 from app.core.database import Base
 from app.core.settings import settings
@@ -0,0 +1,40 @@
+"""Index for latest user field values
+
+Revision ID: 3b9d4f1a7c62
+Revises: 8f3a2c6d1e47
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d4f1a7c62'
+down_revision: Union[str, None] = '8f3a2c6d1e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Таблица большая: индекс строится без блокировки записи
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_field_values_field_id_user_id_created_at',
+            'user_field_values',
+            ['field_id', 'user_id', 'created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_user_field_values_field_id_user_id_created_at',
+            table_name='user_field_values',
+            postgresql_concurrently=True,
+        )
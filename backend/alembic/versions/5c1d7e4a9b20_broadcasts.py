@@ -0,0 +1,55 @@
+"""Broadcasts
+
+Revision ID: 5c1d7e4a9b20
+Revises: ae0e7b18c42d
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1d7e4a9b20'
+down_revision: Union[str, None] = 'ae0e7b18c42d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('broadcasts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('pending', 'running', 'completed', 'cancelled', name='broadcaststatus'), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('bot_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('cursor', sa.Integer(), nullable=False),
+    sa.Column('delivered', sa.Integer(), nullable=False),
+    sa.Column('blocked', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('lease_owner', sa.String(length=100), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['bot_id'], ['bots.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_broadcasts_bot_id'), 'broadcasts', ['bot_id'], unique=False)
+    op.create_index(op.f('ix_broadcasts_status'), 'broadcasts', ['status'], unique=False)
+    op.create_index(op.f('ix_broadcasts_user_id'), 'broadcasts', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_broadcasts_user_id'), table_name='broadcasts')
+    op.drop_index(op.f('ix_broadcasts_status'), table_name='broadcasts')
+    op.drop_index(op.f('ix_broadcasts_bot_id'), table_name='broadcasts')
+    op.drop_table('broadcasts')
+    sa.Enum(name='broadcaststatus').drop(op.get_bind(), checkfirst=True)
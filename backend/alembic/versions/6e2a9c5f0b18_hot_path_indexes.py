@@ -0,0 +1,47 @@
+"""Hot path indexes
+
+Revision ID: 6e2a9c5f0b18
+Revises: d41e6b8a2f93
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e2a9c5f0b18'
+down_revision: Union[str, None] = 'd41e6b8a2f93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# user_fields(scenario_id, variable) покрыт уникальным ограничением
+# uq_user_fields_scenario_id_variable, а user_field_values(field_id, user_id) —
+# индексом ix_user_field_values_field_id_user_id_created_at
+INDEXES = [
+    ('ix_bots_webhook_token', 'bots', ['webhook_token'], True),
+    ('ix_scenarios_bot_id_enabled', 'scenarios', ['bot_id', 'enabled'], False),
+    ('ix_scenarios_user_id', 'scenarios', ['user_id'], False),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Индексы строятся без блокировки записи в таблицы
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=unique,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,49 @@
+"""Unique user field per scenario variable
+
+Revision ID: 8f3a2c6d1e47
+Revises: 5c1d7e4a9b20
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3a2c6d1e47'
+down_revision: Union[str, None] = '5c1d7e4a9b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DUPLICATES = """
+    SELECT id, min(id) OVER (PARTITION BY scenario_id, variable) AS keep_id
+    FROM user_fields
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Значения дублирующих полей переносятся в самое раннее поле переменной
+    op.execute(f"""
+        UPDATE user_field_values AS v
+        SET field_id = d.keep_id
+        FROM ({DUPLICATES}) AS d
+        WHERE v.field_id = d.id AND d.id <> d.keep_id
+    """)
+    op.execute(f"""
+        DELETE FROM user_fields AS f
+        USING ({DUPLICATES}) AS d
+        WHERE f.id = d.id AND d.id <> d.keep_id
+    """)
+    op.create_unique_constraint(
+        'uq_user_fields_scenario_id_variable',
+        'user_fields',
+        ['scenario_id', 'variable'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_user_fields_scenario_id_variable', 'user_fields', type_='unique')
@@ -0,0 +1,75 @@
+"""Scenario versions
+
+Revision ID: a7c3e5d9f214
+Revises: 6e2a9c5f0b18
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+import hashlib
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e5d9f214'
+down_revision: Union[str, None] = '6e2a9c5f0b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def content_hash(data: dict) -> str:
+    # Та же каноническая форма, что и в app.scenarios.utils.content_hash
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scenario_versions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('scenario_id', sa.Integer(), nullable=False),
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['scenario_id'], ['scenarios.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('scenario_id', 'hash', name='uq_scenario_versions_scenario_id_hash')
+    )
+    op.add_column('scenarios', sa.Column('version_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'scenarios_version_id_fkey',
+        'scenarios',
+        'scenario_versions',
+        ['version_id'],
+        ['id'],
+        ondelete='SET NULL',
+    )
+
+    # Текущие тела сценариев становятся их первыми версиями
+    connection = op.get_bind()
+    scenarios = connection.execute(
+        sa.text("SELECT id, data FROM scenarios WHERE data IS NOT NULL")
+    )
+    for scenario_id, data in scenarios.all():
+        version_id = connection.execute(
+            sa.text("""
+                INSERT INTO scenario_versions (scenario_id, hash, data)
+                VALUES (:scenario_id, :hash, CAST(:data AS JSONB))
+                RETURNING id
+            """),
+            {"scenario_id": scenario_id, "hash": content_hash(data), "data": json.dumps(data)},
+        ).scalar_one()
+        connection.execute(
+            sa.text("UPDATE scenarios SET version_id = :version_id WHERE id = :scenario_id"),
+            {"version_id": version_id, "scenario_id": scenario_id},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('scenarios_version_id_fkey', 'scenarios', type_='foreignkey')
+    op.drop_column('scenarios', 'version_id')
+    op.drop_table('scenario_versions')
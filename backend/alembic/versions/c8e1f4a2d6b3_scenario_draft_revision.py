@@ -0,0 +1,31 @@
+"""Scenario draft revision
+
+Revision ID: c8e1f4a2d6b3
+Revises: a7c3e5d9f214
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e1f4a2d6b3'
+down_revision: Union[str, None] = 'a7c3e5d9f214'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'scenarios',
+        sa.Column('draft_revision', sa.Integer(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('scenarios', 'draft_revision')
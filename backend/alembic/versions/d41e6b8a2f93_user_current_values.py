@@ -0,0 +1,52 @@
+"""User current values
+
+Revision ID: d41e6b8a2f93
+Revises: 3b9d4f1a7c62
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41e6b8a2f93'
+down_revision: Union[str, None] = '3b9d4f1a7c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_current_values',
+    sa.Column('scenario_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('variable', sa.String(length=255), nullable=False),
+    sa.Column('field_id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=255), nullable=True),
+    sa.Column('value', sa.String(length=500), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['field_id'], ['user_fields.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['scenario_id'], ['scenarios.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('scenario_id', 'user_id', 'variable')
+    )
+    op.create_index(op.f('ix_user_current_values_field_id'), 'user_current_values', ['field_id'], unique=False)
+
+    # Последние значения из накопленной истории
+    op.execute("""
+        INSERT INTO user_current_values
+            (scenario_id, user_id, variable, field_id, username, value, updated_at)
+        SELECT DISTINCT ON (f.scenario_id, v.user_id, f.variable)
+            f.scenario_id, v.user_id, f.variable, f.id, v.username, v.value, v.created_at
+        FROM user_field_values AS v
+        JOIN user_fields AS f ON f.id = v.field_id
+        ORDER BY f.scenario_id, v.user_id, f.variable, v.created_at DESC, v.id DESC
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_current_values_field_id'), table_name='user_current_values')
+    op.drop_table('user_current_values')
@@ -0,0 +1,36 @@
+"""Scenario values count
+
+Revision ID: e5a2b7c9d3f1
+Revises: c8e1f4a2d6b3
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a2b7c9d3f1'
+down_revision: Union[str, None] = 'c8e1f4a2d6b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'scenarios',
+        sa.Column('values_count', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.execute(
+        'UPDATE scenarios SET values_count = ('
+        'SELECT count(*) FROM user_current_values '
+        'WHERE user_current_values.scenario_id = scenarios.id)'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('scenarios', 'values_count')
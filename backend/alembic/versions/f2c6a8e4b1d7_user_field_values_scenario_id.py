@@ -0,0 +1,58 @@
+"""User field values scenario id
+
+Revision ID: f2c6a8e4b1d7
+Revises: e5a2b7c9d3f1
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c6a8e4b1d7'
+down_revision: Union[str, None] = 'e5a2b7c9d3f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('user_field_values', sa.Column('scenario_id', sa.Integer(), nullable=True))
+    op.execute(
+        'UPDATE user_field_values SET scenario_id = user_fields.scenario_id '
+        'FROM user_fields WHERE user_fields.id = user_field_values.field_id'
+    )
+    op.alter_column('user_field_values', 'scenario_id', nullable=False)
+    op.create_foreign_key(
+        'user_field_values_scenario_id_fkey',
+        'user_field_values',
+        'scenarios',
+        ['scenario_id'],
+        ['id'],
+        ondelete='CASCADE',
+    )
+
+    # История ответов сценария читается страницами по id
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_field_values_scenario_id_id',
+            'user_field_values',
+            ['scenario_id', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_user_field_values_scenario_id_id',
+            table_name='user_field_values',
+            postgresql_concurrently=True,
+        )
+    op.drop_constraint('user_field_values_scenario_id_fkey', 'user_field_values', type_='foreignkey')
+    op.drop_column('user_field_values', 'scenario_id')
@@ -2,7 +2,13 @@ from fastapi import APIRouter, Depends, status
 
 from app.auth.dependencies.auth_deps import UserIDFromAccessTokenDI, access_token_required
 from app.bots.dependencies.services_deps import BotServiceDI
-from app.bots.schemas import BotReadSchema, BotCreateSchema, BotPatchSchema, BotDefinitionSchema
+from app.bots.schemas import (
+    BotReadSchema,
+    BotListItemSchema,
+    BotCreateSchema,
+    BotPatchSchema,
+    BotDefinitionSchema,
+)
 from app.bots.exceptions.services_exceptions import (
     BotNotFoundError,
     NoPermissionForBotError,
@@ -134,7 +140,7 @@ async def stop_bot(
 
 @router.get(
     "",
-    response_model=list[BotReadSchema],
+    response_model=list[BotListItemSchema],
 )
 async def get_bots(
         bot_service: BotServiceDI,
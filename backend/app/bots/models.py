@@ -14,7 +14,8 @@ class BotModel(Base):
     username: Mapped[str] = mapped_column(String(100), unique=True)
 
     encrypted_token: Mapped[str] = mapped_column(String(150))
-    webhook_token: Mapped[str] = mapped_column(String(150))
+    # По webhook-токену ищется бот на каждом апдейте
+    webhook_token: Mapped[str] = mapped_column(String(150), unique=True, index=True)
     
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
@@ -22,8 +23,9 @@ class BotModel(Base):
     )
 
     user: Mapped["UserModel"] = relationship(back_populates="bots")
+    # Сценарии с телами и черновиками загружаются только явно, в репозитории
     scenarios: Mapped[list["ScenarioModel"]] = relationship(
         back_populates="bot",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise",
     )
@@ -1,10 +1,11 @@
-from typing import Optional
+from typing import Optional, Sequence
 
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, Row
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 
 from app.scenarios.models import ScenarioModel
+from app.scenarios.repositories import FIELDS_COUNT
 from app.bots.models import BotModel
 from app.bots.schemas import BotPatchSchema
 from app.core.dependencies.db_deps import AsyncSessionDI
@@ -19,29 +20,58 @@ class BotRepository:
             self._session.add(bot_model)
             await self._session.commit()
             await self._session.refresh(bot_model)
+            # У нового бота сценариев нет, но схема ответа читает список
+            await self._session.refresh(bot_model, ["scenarios"])
         except IntegrityError:
             return
         return bot_model
 
-    async def get_bots_by_user_id(self, user_id: int) -> list[BotModel]:
+    async def get_bot_summaries_by_user_id(self, user_id: int) -> Sequence[Row]:
+        """Боты пользователя со сводкой по сценариям одним запросом.
+
+        Строка на каждый сценарий бота; у бота без сценариев одна строка
+        с пустыми полями сценария.
+        """
         result = await self._session.execute(
-            select(BotModel)
-            .options(
-                selectinload(BotModel.scenarios)
-                .joinedload(ScenarioModel.triggers),
+            select(
+                BotModel.id,
+                BotModel.first_name,
+                BotModel.enabled,
+                BotModel.username,
+                ScenarioModel.id.label("scenario_id"),
+                ScenarioModel.name.label("scenario_name"),
+                ScenarioModel.enabled.label("scenario_enabled"),
+                FIELDS_COUNT.label("fields_count"),
+                ScenarioModel.values_count,
             )
+            .outerjoin(ScenarioModel, ScenarioModel.bot_id == BotModel.id)
             .where(BotModel.user_id == user_id)
+            .order_by(BotModel.id, ScenarioModel.id)
         )
-        return result.scalars().all()
+        return result.all()
 
     async def get_bot_model_by_id(self, bot_id: int) -> Optional[BotModel]:
+        """Бот без сценариев"""
+        result = await self._session.execute(
+            select(BotModel)
+            .where(BotModel.id == bot_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_bot_with_scenarios_by_id(self, bot_id: int) -> Optional[BotModel]:
+        """Бот со сценариями, их триггерами и полями — всё, что читает BotReadSchema"""
         result = await self._session.execute(
             select(BotModel)
             .options(
-                selectinload(BotModel.scenarios)
-                .joinedload(ScenarioModel.triggers),
+                selectinload(BotModel.scenarios).options(
+                    selectinload(ScenarioModel.bot),
+                    selectinload(ScenarioModel.triggers),
+                    selectinload(ScenarioModel.fields),
+                ),
             )
             .where(BotModel.id == bot_id)
+            # Бот мог быть загружен в сессию раньше, без сценариев
+            .execution_options(populate_existing=True)
         )
         return result.scalar_one_or_none()
 
@@ -57,7 +87,7 @@ class BotRepository:
             bot_id: int,
             bot_data: BotPatchSchema,
     ) -> Optional[BotModel]:
-        bot = await self.get_bot_model_by_id(bot_id)
+        bot = await self.get_bot_with_scenarios_by_id(bot_id)
 
         for field, value in bot_data.dict(exclude_unset=True).items():
             if hasattr(bot, field):
@@ -75,6 +105,7 @@ class BotRepository:
         await self._session.commit()
 
     async def change_bot_status_by_id(self, bot_id: int, status: bool) -> None:
+        """Транзакция не фиксируется: статус бота меняется вместе со статусом сценария"""
         await self._session.execute(
             update(BotModel)
             .where(BotModel.id == bot_id)
@@ -23,6 +23,18 @@ class BotShortReadSchema(BaseBotReadSchema):
     pass
 
 
+class BotScenarioSummarySchema(BaseModel):
+    id: int
+    name: str
+    enabled: bool
+    fields_count: int
+    values_count: int
+
+
+class BotListItemSchema(BaseBotReadSchema):
+    scenarios: list[BotScenarioSummarySchema]
+
+
 class BotCreateSchema(BaseModel):
     token: str = Field(..., max_length=60)
 
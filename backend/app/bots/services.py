@@ -3,6 +3,8 @@ from typing import Optional
 from app.bots.models import BotModel
 from app.bots.schemas import (
     BotReadSchema,
+    BotListItemSchema,
+    BotScenarioSummarySchema,
     BotCreateSchema,
     BotPatchSchema,
     BotDefinitionSchema
@@ -28,6 +30,7 @@ from app.telegram.exceptions.manager_exceptions import (
 )
 from app.bots.dependencies.repositories_deps import BotRepositoryDI
 from app.telegram.dependencies.manager_deps import TgBotManagerDI
+from app.telegram.dependencies.cache_deps import ScenarioCacheInvalidatorDI
 from app.core.dependencies.security_deps import TokenCryptoDI
 from app.scenarios.dependencies.repositories_deps import ScenarioRepositoryDI
 
@@ -38,11 +41,13 @@ class BotService:
             scenario_repository: ScenarioRepositoryDI,
             tg_bot_manager: TgBotManagerDI,
             token_crypto: TokenCryptoDI,
+            cache_invalidator: ScenarioCacheInvalidatorDI,
     ):
         self._bot_repo = bot_repository
         self._scenario_repo = scenario_repository
         self._tg_manager = tg_bot_manager
         self._token_crypto = token_crypto
+        self._cache_invalidator = cache_invalidator
 
     async def add_bot(self, user_id: int, bot_data: BotCreateSchema) -> BotReadSchema:
         tg_info = await self._tg_manager.get_info(bot_data.token)
@@ -65,12 +70,34 @@ class BotService:
 
         return BotReadSchema.model_validate(created_bot)
 
-    async def get_bots(self, user_id: int) -> list[BotReadSchema]:
-        bots = await self._bot_repo.get_bots_by_user_id(user_id)
-        return [BotReadSchema.model_validate(bot) for bot in bots]
+    async def get_bots(self, user_id: int) -> list[BotListItemSchema]:
+        rows = await self._bot_repo.get_bot_summaries_by_user_id(user_id)
+
+        bots: dict[int, BotListItemSchema] = {}
+        for row in rows:
+            bot = bots.get(row.id)
+            if bot is None:
+                bot = bots[row.id] = BotListItemSchema(
+                    id=row.id,
+                    first_name=row.first_name,
+                    enabled=row.enabled,
+                    username=row.username,
+                    scenarios=[],
+                )
+            if row.scenario_id is not None:
+                bot.scenarios.append(
+                    BotScenarioSummarySchema(
+                        id=row.scenario_id,
+                        name=row.scenario_name,
+                        enabled=row.scenario_enabled,
+                        fields_count=row.fields_count,
+                        values_count=row.values_count,
+                    )
+                )
+        return list(bots.values())
 
     async def get_bot_by_id(self, user_id: int, bot_id: int) -> BotReadSchema:
-        bot = await self._bot_repo.get_bot_model_by_id(bot_id)
+        bot = await self._bot_repo.get_bot_with_scenarios_by_id(bot_id)
         if not bot:
             raise BotNotFoundError
         if bot.user_id != user_id:
@@ -78,11 +105,27 @@ class BotService:
 
         return BotReadSchema.model_validate(bot)
 
+    async def _get_bot_model(self, user_id: int, bot_id: int) -> BotModel:
+        """Бот с проверкой владельца, без загрузки сценариев"""
+        bot = await self._bot_repo.get_bot_model_by_id(bot_id)
+        if not bot:
+            raise BotNotFoundError
+        if bot.user_id != user_id:
+            raise NoPermissionForBotError
+        return bot
+
     async def get_decrypted_token_by_webhook_token(self, webhook_token: str) -> str:
+        encrypted_token = await self.get_encrypted_token_by_webhook_token(webhook_token)
+        return self.decrypt_token(encrypted_token)
+
+    async def get_encrypted_token_by_webhook_token(self, webhook_token: str) -> str:
         encrypted_token = await self._bot_repo.get_encrypted_token_by_webhook_token(webhook_token)
         if encrypted_token is None:
             raise BotNotFoundError
 
+        return encrypted_token
+
+    def decrypt_token(self, encrypted_token: str) -> str:
         return self._token_crypto.decrypt(encrypted_token)
 
     async def update_bot(
@@ -91,7 +134,7 @@ class BotService:
             bot_id: int,
             bot_data: BotPatchSchema,
     ) -> Optional[BotReadSchema]:
-        _ = await self.get_bot_by_id(user_id=user_id, bot_id=bot_id)
+        await self._get_bot_model(user_id=user_id, bot_id=bot_id)
         bot = await self._bot_repo.update_bot_by_id(
             bot_id=bot_id,
             bot_data=bot_data,
@@ -99,17 +142,16 @@ class BotService:
         return BotReadSchema.model_validate(bot)
 
     async def delete_bot(self, user_id: int, bot_id: int) -> None:
-        _ = await self.get_bot_by_id(user_id=user_id, bot_id=bot_id)
+        await self._get_bot_model(user_id=user_id, bot_id=bot_id)
         await self._bot_repo.delete_bot_by_id(bot_id)
+        await self._cache_invalidator.invalidate_bot(bot_id)
 
     async def deploy_bot(
             self,
             user_id: int,
             definition_data: BotDefinitionSchema,
     ) -> None:
-        await self.get_bot_by_id(user_id, bot_id=definition_data.bot_id)
-
-        bot = await self._bot_repo.get_bot_model_by_id(definition_data.bot_id)
+        bot = await self._get_bot_model(user_id, bot_id=definition_data.bot_id)
         if bot.enabled:
             raise BotAlreadyRunningError
 
@@ -131,17 +173,18 @@ class BotService:
         if not await self._tg_manager.set_webhook(token, bot.webhook_token):
             raise FailedToSetWebhookError
 
+        # Статусы фиксируются до инвалидации, иначе другой процесс может
+        # перечитать и закэшировать прежнее состояние
         await self._bot_repo.change_bot_status_by_id(bot.id, True)
         await self._scenario_repo.change_scenario_status_by_id(scenario.id, True)
+        await self._cache_invalidator.invalidate_bot(bot.id)
 
     async def stop_bot(
             self,
             user_id: int,
             definition_data: BotDefinitionSchema,
     ) -> None:
-        await self.get_bot_by_id(user_id, bot_id=definition_data.bot_id)
-
-        bot = await self._bot_repo.get_bot_model_by_id(definition_data.bot_id)
+        bot = await self._get_bot_model(user_id, bot_id=definition_data.bot_id)
         if not bot.enabled:
             raise BotNotRunningError
 
@@ -161,5 +204,8 @@ class BotService:
         if not await self._tg_manager.delete_webhook(token):
             raise FailedToDeleteWebhookError
 
+        # Статусы фиксируются до инвалидации, иначе другой процесс может
+        # перечитать и закэшировать прежнее состояние
         await self._bot_repo.change_bot_status_by_id(bot.id, False)
         await self._scenario_repo.change_scenario_status_by_id(scenario.id, False)
+        await self._cache_invalidator.invalidate_bot(bot.id)
@@ -0,0 +1,106 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, status
+
+from app.auth.dependencies.auth_deps import UserIDFromAccessTokenDI, access_token_required
+from app.broadcasts.dependencies.services_deps import BroadcastServiceDI
+from app.broadcasts.schemas import BroadcastCreateSchema, BroadcastReadSchema
+from app.broadcasts.exceptions.services_exceptions import (
+    BroadcastNotFoundError,
+    NoPermissionForBroadcastError,
+    BroadcastAlreadyFinishedError,
+)
+from app.broadcasts.exceptions.http_exceptions import (
+    BroadcastNotFoundHTTPException,
+    NoPermissionForBroadcastHTTPException,
+    BroadcastAlreadyFinishedHTTPException,
+)
+from app.bots.exceptions.services_exceptions import (
+    BotNotFoundError,
+    NoPermissionForBotError,
+)
+from app.bots.exceptions.http_exceptions import (
+    BotNotFoundHTTPException,
+    NoPermissionForBotHTTPException,
+)
+
+router = APIRouter(
+    prefix="/broadcast",
+    tags=["Broadcasts"],
+    dependencies=[Depends(access_token_required)],
+)
+
+
+@router.post(
+    "",
+    response_model=BroadcastReadSchema,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_broadcast(
+        user_id: UserIDFromAccessTokenDI,
+        create_data: BroadcastCreateSchema,
+        broadcast_service: BroadcastServiceDI,
+):
+    try:
+        return await broadcast_service.create_broadcast(
+            user_id=user_id,
+            create_data=create_data,
+        )
+    except BotNotFoundError:
+        raise BotNotFoundHTTPException
+    except NoPermissionForBotError:
+        raise NoPermissionForBotHTTPException
+
+
+@router.get(
+    "",
+    response_model=list[BroadcastReadSchema],
+)
+async def get_broadcasts(
+        user_id: UserIDFromAccessTokenDI,
+        broadcast_service: BroadcastServiceDI,
+        bot_id: Optional[int] = None,
+):
+    return await broadcast_service.get_broadcasts(user_id=user_id, bot_id=bot_id)
+
+
+@router.get(
+    "/{broadcast_id}",
+    response_model=BroadcastReadSchema,
+)
+async def get_broadcast(
+        user_id: UserIDFromAccessTokenDI,
+        broadcast_id: int,
+        broadcast_service: BroadcastServiceDI,
+):
+    try:
+        return await broadcast_service.get_broadcast(
+            user_id=user_id,
+            broadcast_id=broadcast_id,
+        )
+    except BroadcastNotFoundError:
+        raise BroadcastNotFoundHTTPException
+    except NoPermissionForBroadcastError:
+        raise NoPermissionForBroadcastHTTPException
+
+
+@router.post(
+    "/{broadcast_id}/cancel",
+    response_model=BroadcastReadSchema,
+)
+async def cancel_broadcast(
+        user_id: UserIDFromAccessTokenDI,
+        broadcast_id: int,
+        broadcast_service: BroadcastServiceDI,
+):
+    try:
+        return await broadcast_service.cancel_broadcast(
+            user_id=user_id,
+            broadcast_id=broadcast_id,
+        )
+    except BroadcastNotFoundError:
+        raise BroadcastNotFoundHTTPException
+    except NoPermissionForBroadcastError:
+        raise NoPermissionForBroadcastHTTPException
+    except BroadcastAlreadyFinishedError:
+        raise BroadcastAlreadyFinishedHTTPException
@@ -0,0 +1,77 @@
+from typing import Iterable
+
+from app.core.dependencies.redis_deps import RedisDI
+
+SNAPSHOT_TTL = 7 * 86400  # 7 days
+CHUNK_SIZE = 10_000
+
+
+class BroadcastAudience:
+    """Аудитория ботов в Redis.
+
+    Все чаты, писавшие боту, хранятся в множестве bot:{id}:audience.
+    Перед отправкой множество копируется в отсортированный список, по
+    которому рассылка идёт пачками: позиция в нём и есть курсор прогресса.
+    Чаты, писавшие боту до появления учёта аудитории, добавляются один
+    раз, иначе заблокировавшие бота возвращались бы в каждую рассылку.
+    """
+
+    def __init__(self, redis_client, prefix: str = "bot", snapshot_prefix: str = "broadcast"):
+        self.redis = redis_client
+        self.prefix = prefix
+        self.snapshot_prefix = snapshot_prefix
+
+    def _key(self, bot_id: int) -> str:
+        return f"{self.prefix}:{bot_id}:audience"
+
+    def _backfilled_key(self, bot_id: int) -> str:
+        return f"{self.prefix}:{bot_id}:audience:backfilled"
+
+    def _snapshot_key(self, broadcast_id: int) -> str:
+        return f"{self.snapshot_prefix}:{broadcast_id}:audience"
+
+    async def add(self, bot_id: int, chat_id: int | str) -> None:
+        await self.redis.sadd(self._key(bot_id), chat_id)
+
+    async def add_many(self, bot_id: int, chat_ids: Iterable[int]) -> None:
+        chat_ids = list(chat_ids)
+        for start in range(0, len(chat_ids), CHUNK_SIZE):
+            await self.redis.sadd(self._key(bot_id), *chat_ids[start:start + CHUNK_SIZE])
+
+    async def remove_many(self, bot_id: int, chat_ids: list[int]) -> None:
+        if chat_ids:
+            await self.redis.srem(self._key(bot_id), *chat_ids)
+
+    async def is_backfilled(self, bot_id: int) -> bool:
+        """Добавлены ли в аудиторию чаты, известные по собранным данным"""
+        return bool(await self.redis.exists(self._backfilled_key(bot_id)))
+
+    async def mark_backfilled(self, bot_id: int) -> None:
+        await self.redis.set(self._backfilled_key(bot_id), 1)
+
+    async def snapshot(self, bot_id: int, broadcast_id: int) -> int:
+        """Зафиксировать аудиторию рассылки, возвращает её размер"""
+        key = self._snapshot_key(broadcast_id)
+        # SORT ... STORE заменяет прежний снимок, поэтому повтор безопасен
+        total = await self.redis.sort(self._key(bot_id), store=key)
+        if total:
+            await self.redis.expire(key, SNAPSHOT_TTL)
+        return total
+
+    async def read(self, broadcast_id: int, cursor: int, count: int) -> list[int]:
+        chat_ids = await self.redis.lrange(
+            self._snapshot_key(broadcast_id), cursor, cursor + count - 1
+        )
+        return [int(chat_id) for chat_id in chat_ids]
+
+    async def drop_snapshot(self, broadcast_id: int) -> None:
+        await self.redis.delete(self._snapshot_key(broadcast_id))
+
+
+def create_broadcast_audience(redis_client) -> BroadcastAudience:
+    return BroadcastAudience(redis_client)
+
+
+async def get_broadcast_audience(redis_client: RedisDI) -> BroadcastAudience:
+    """Получить хранилище аудитории ботов"""
+    return create_broadcast_audience(redis_client)
@@ -0,0 +1,7 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from app.broadcasts.repositories import BroadcastRepository
+
+BroadcastRepositoryDI = Annotated[BroadcastRepository, Depends(BroadcastRepository)]
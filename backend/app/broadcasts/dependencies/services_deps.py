@@ -0,0 +1,7 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from app.broadcasts.services import BroadcastService
+
+BroadcastServiceDI = Annotated[BroadcastService, Depends(BroadcastService)]
@@ -0,0 +1,10 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from app.broadcasts.audience import (
+    BroadcastAudience,
+    get_broadcast_audience,
+)
+
+BroadcastAudienceDI = Annotated[BroadcastAudience, Depends(get_broadcast_audience)]
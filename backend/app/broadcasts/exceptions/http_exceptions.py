@@ -0,0 +1,25 @@
+from fastapi import HTTPException, status
+
+
+class BroadcastNotFoundHTTPException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Broadcast does not exist",
+        )
+
+
+class NoPermissionForBroadcastHTTPException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No permission for this broadcast",
+        )
+
+
+class BroadcastAlreadyFinishedHTTPException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Broadcast is already finished",
+        )
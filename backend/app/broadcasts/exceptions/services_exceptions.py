@@ -0,0 +1,10 @@
+class BroadcastNotFoundError(Exception):
+    pass
+
+
+class NoPermissionForBroadcastError(Exception):
+    pass
+
+
+class BroadcastAlreadyFinishedError(Exception):
+    pass
@@ -0,0 +1,59 @@
+from typing import Optional
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from app.enums import BlockType
+from app.telegram.blocks.base import BlockDTO
+from app.telegram.blocks.message import MessageBlock
+from app.telegram.blocks.template import MessageTemplate
+from app.telegram.context import ScenarioContext
+
+
+class BroadcastMessage(MessageBlock):
+    """Сообщение рассылки.
+
+    Отправляется как блок сообщения, в том числе по сохранённым file_id
+    вложений, и может нести клавиатуру в формате блока меню. Ошибки Bot API
+    не перехватываются: по ним отправитель считает недоставленные сообщения.
+    """
+
+    def __init__(self, text: str, data: dict):
+        super().__init__(
+            BlockDTO(id="broadcast", type=BlockType.MESSAGE.value, data={**data, "text": text})
+        )
+        self.keyboard = self._build_keyboard(data.get("buttons", []))
+
+    @property
+    def has_attachments(self) -> bool:
+        return bool(self.message_data["attachments"])
+
+    async def send(self, context: ScenarioContext) -> None:
+        await self._send_text_message(context, self.message_data)
+
+    async def _send_message(
+        self,
+        context: ScenarioContext,
+        text: MessageTemplate,
+        keyboard: InlineKeyboardMarkup = None,
+    ) -> None:
+        await context.bot.send_message(
+            chat_id=context.chat_id,
+            text=self._render(text, context),
+            reply_markup=keyboard or self.keyboard,
+        )
+
+    @staticmethod
+    def _build_keyboard(buttons: list[dict]) -> Optional[InlineKeyboardMarkup]:
+        """Кнопки-ссылки открывают url, остальные работают как кнопки меню"""
+        if not buttons:
+            return None
+        return InlineKeyboardMarkup(
+            inline_keyboard=[
+                [
+                    InlineKeyboardButton(text=btn["text"], url=btn["url"])
+                    if btn.get("url")
+                    else InlineKeyboardButton(text=btn["text"], callback_data=btn["id"])
+                ]
+                for btn in buttons
+            ]
+        )
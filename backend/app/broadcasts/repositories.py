@@ -0,0 +1,192 @@
+import datetime
+from typing import Optional
+
+from sqlalchemy import select, update, or_, func
+
+from app.enums import BroadcastStatus
+from app.bots.models import BotModel
+from app.scenarios.models import ScenarioModel
+from app.users_data.models import UserCurrentValueModel
+from app.broadcasts.models import BroadcastModel
+from app.core.dependencies.db_deps import AsyncSessionDI
+
+ACTIVE_STATUSES = (BroadcastStatus.PENDING, BroadcastStatus.RUNNING)
+
+
+class BroadcastRepository:
+    def __init__(self, session: AsyncSessionDI):
+        self._session = session
+
+    async def add_broadcast(self, broadcast_model: BroadcastModel) -> BroadcastModel:
+        self._session.add(broadcast_model)
+        await self._session.commit()
+        await self._session.refresh(broadcast_model)
+        return broadcast_model
+
+    async def get_broadcast_model_by_id(self, broadcast_id: int) -> Optional[BroadcastModel]:
+        result = await self._session.execute(
+            select(BroadcastModel)
+            .where(BroadcastModel.id == broadcast_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_broadcasts_by_user_id(
+            self,
+            user_id: int,
+            bot_id: Optional[int] = None,
+    ) -> list[BroadcastModel]:
+        query = (
+            select(BroadcastModel)
+            .where(BroadcastModel.user_id == user_id)
+            .order_by(BroadcastModel.id.desc())
+        )
+        if bot_id is not None:
+            query = query.where(BroadcastModel.bot_id == bot_id)
+        result = await self._session.execute(query)
+        return result.scalars().all()
+
+    async def cancel_broadcast_by_id(self, broadcast_id: int) -> Optional[BroadcastModel]:
+        result = await self._session.execute(
+            update(BroadcastModel)
+            .where(
+                BroadcastModel.id == broadcast_id,
+                BroadcastModel.status.in_(ACTIVE_STATUSES),
+            )
+            .values(
+                status=BroadcastStatus.CANCELLED,
+                finished_at=func.now(),
+                lease_owner=None,
+                lease_expires_at=None,
+            )
+            .returning(BroadcastModel)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        broadcast = result.scalar_one_or_none()
+        await self._session.commit()
+        return broadcast
+
+    async def get_encrypted_token_by_bot_id(self, bot_id: int) -> Optional[str]:
+        result = await self._session.execute(
+            select(BotModel.encrypted_token)
+            .where(BotModel.id == bot_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_known_chat_ids(self, bot_id: int) -> list[int]:
+        """Пользователи, оставившие данные в сценариях бота до учёта аудитории"""
+        result = await self._session.execute(
+            select(UserCurrentValueModel.user_id)
+            .join(ScenarioModel, ScenarioModel.id == UserCurrentValueModel.scenario_id)
+            .where(ScenarioModel.bot_id == bot_id)
+            .distinct()
+        )
+        return result.scalars().all()
+
+    async def claim_broadcast(self, owner: str, lease_seconds: int) -> Optional[BroadcastModel]:
+        """Взять в аренду незавершённую рассылку без действующей аренды"""
+        candidate = (
+            select(BroadcastModel.id)
+            .where(
+                BroadcastModel.status.in_(ACTIVE_STATUSES),
+                or_(
+                    BroadcastModel.lease_expires_at.is_(None),
+                    BroadcastModel.lease_expires_at < func.now(),
+                ),
+            )
+            .order_by(BroadcastModel.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await self._session.execute(
+            update(BroadcastModel)
+            .where(BroadcastModel.id == candidate)
+            .values(
+                lease_owner=owner,
+                lease_expires_at=func.now() + datetime.timedelta(seconds=lease_seconds),
+            )
+            .returning(BroadcastModel)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        broadcast = result.scalar_one_or_none()
+        await self._session.commit()
+        return broadcast
+
+    async def start_broadcast(self, broadcast_id: int, owner: str, total: int) -> bool:
+        result = await self._session.execute(
+            update(BroadcastModel)
+            .where(
+                BroadcastModel.id == broadcast_id,
+                BroadcastModel.lease_owner == owner,
+                BroadcastModel.status == BroadcastStatus.PENDING,
+            )
+            .values(
+                status=BroadcastStatus.RUNNING,
+                total=total,
+                started_at=func.now(),
+            )
+        )
+        await self._session.commit()
+        return result.rowcount == 1
+
+    async def checkpoint_broadcast(
+            self,
+            broadcast_id: int,
+            owner: str,
+            cursor: int,
+            delivered: int,
+            blocked: int,
+            failed: int,
+            lease_seconds: int,
+    ) -> bool:
+        """Сохранить прогресс и продлить аренду.
+
+        False означает, что рассылка отменена или аренду забрал другой процесс.
+        """
+        result = await self._session.execute(
+            update(BroadcastModel)
+            .where(
+                BroadcastModel.id == broadcast_id,
+                BroadcastModel.lease_owner == owner,
+                BroadcastModel.status == BroadcastStatus.RUNNING,
+            )
+            .values(
+                cursor=cursor,
+                delivered=BroadcastModel.delivered + delivered,
+                blocked=BroadcastModel.blocked + blocked,
+                failed=BroadcastModel.failed + failed,
+                lease_expires_at=func.now() + datetime.timedelta(seconds=lease_seconds),
+            )
+        )
+        await self._session.commit()
+        return result.rowcount == 1
+
+    async def complete_broadcast(self, broadcast_id: int, owner: str) -> bool:
+        result = await self._session.execute(
+            update(BroadcastModel)
+            .where(
+                BroadcastModel.id == broadcast_id,
+                BroadcastModel.lease_owner == owner,
+                BroadcastModel.status == BroadcastStatus.RUNNING,
+            )
+            .values(
+                status=BroadcastStatus.COMPLETED,
+                finished_at=func.now(),
+                lease_owner=None,
+                lease_expires_at=None,
+            )
+        )
+        await self._session.commit()
+        return result.rowcount == 1
+
+    async def release_broadcast(self, broadcast_id: int, owner: str) -> None:
+        """Отдать аренду, чтобы рассылку сразу подхватил другой процесс"""
+        await self._session.execute(
+            update(BroadcastModel)
+            .where(
+                BroadcastModel.id == broadcast_id,
+                BroadcastModel.lease_owner == owner,
+            )
+            .values(lease_owner=None, lease_expires_at=None)
+        )
+        await self._session.commit()
@@ -0,0 +1,60 @@
+import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+from app.enums import AttachmentType, BroadcastStatus
+
+
+class BroadcastAttachmentSchema(BaseModel):
+    url: str
+    content_type: str
+    filename: str
+
+
+class BroadcastButtonSchema(BaseModel):
+    id: str = Field(..., max_length=64)
+    text: str = Field(..., max_length=64)
+    url: Optional[str] = None
+
+
+class BroadcastCreateSchema(BaseModel):
+    bot_id: int
+    text: str = Field(..., max_length=4096)
+    type: Optional[AttachmentType] = None
+    attachments: list[BroadcastAttachmentSchema] = Field(default_factory=list, max_length=10)
+    buttons: list[BroadcastButtonSchema] = Field(default_factory=list, max_length=10)
+
+    @model_validator(mode="after")
+    def validate_content(self) -> "BroadcastCreateSchema":
+        if self.attachments and self.type is None:
+            raise ValueError("Attachment type is required")
+        # Клавиатуру нельзя прикрепить к медиагруппе
+        if self.attachments and self.buttons:
+            raise ValueError("Buttons cannot be combined with attachments")
+        return self
+
+    @property
+    def block_data(self) -> dict:
+        """Данные рассылки в формате блоков сообщения и меню без текста"""
+        return self.model_dump(mode="json", include={"type", "attachments", "buttons"})
+
+
+class BroadcastReadSchema(BaseModel):
+    id: int
+    bot_id: int
+    status: BroadcastStatus
+    text: str
+    data: dict
+    total: int
+    cursor: int
+    delivered: int
+    blocked: int
+    failed: int
+    created_at: datetime.datetime
+    started_at: Optional[datetime.datetime]
+    finished_at: Optional[datetime.datetime]
+
+    model_config = {
+        "from_attributes": True,
+    }
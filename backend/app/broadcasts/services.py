@@ -0,0 +1,79 @@
+from typing import Optional
+
+from app.enums import BroadcastStatus
+from app.broadcasts.models import BroadcastModel
+from app.broadcasts.schemas import BroadcastCreateSchema, BroadcastReadSchema
+from app.broadcasts.exceptions.services_exceptions import (
+    BroadcastNotFoundError,
+    NoPermissionForBroadcastError,
+    BroadcastAlreadyFinishedError,
+)
+from app.bots.exceptions.services_exceptions import (
+    BotNotFoundError,
+    NoPermissionForBotError,
+)
+from app.broadcasts.dependencies.repositories_deps import BroadcastRepositoryDI
+from app.broadcasts.dependencies.storage_deps import BroadcastAudienceDI
+from app.bots.dependencies.repositories_deps import BotRepositoryDI
+
+
+class BroadcastService:
+    def __init__(
+            self,
+            broadcast_repository: BroadcastRepositoryDI,
+            bot_repository: BotRepositoryDI,
+            audience: BroadcastAudienceDI,
+    ):
+        self._broadcast_repo = broadcast_repository
+        self._bot_repo = bot_repository
+        self._audience = audience
+
+    async def create_broadcast(
+            self,
+            user_id: int,
+            create_data: BroadcastCreateSchema,
+    ) -> BroadcastReadSchema:
+        bot = await self._bot_repo.get_bot_model_by_id(create_data.bot_id)
+        if not bot:
+            raise BotNotFoundError
+        if bot.user_id != user_id:
+            raise NoPermissionForBotError
+
+        # Отправкой занимается фоновый обработчик рассылок
+        broadcast = await self._broadcast_repo.add_broadcast(
+            BroadcastModel(
+                user_id=user_id,
+                bot_id=create_data.bot_id,
+                text=create_data.text,
+                data=create_data.block_data,
+            )
+        )
+        return BroadcastReadSchema.model_validate(broadcast)
+
+    async def get_broadcasts(
+            self,
+            user_id: int,
+            bot_id: Optional[int] = None,
+    ) -> list[BroadcastReadSchema]:
+        broadcasts = await self._broadcast_repo.get_broadcasts_by_user_id(user_id, bot_id)
+        return [BroadcastReadSchema.model_validate(broadcast) for broadcast in broadcasts]
+
+    async def get_broadcast(self, user_id: int, broadcast_id: int) -> BroadcastReadSchema:
+        broadcast = await self._broadcast_repo.get_broadcast_model_by_id(broadcast_id)
+        if broadcast is None:
+            raise BroadcastNotFoundError
+        if broadcast.user_id != user_id:
+            raise NoPermissionForBroadcastError
+        return BroadcastReadSchema.model_validate(broadcast)
+
+    async def cancel_broadcast(self, user_id: int, broadcast_id: int) -> BroadcastReadSchema:
+        broadcast = await self.get_broadcast(user_id=user_id, broadcast_id=broadcast_id)
+        if broadcast.status not in (BroadcastStatus.PENDING, BroadcastStatus.RUNNING):
+            raise BroadcastAlreadyFinishedError
+
+        # Отправитель увидит отмену при сохранении прогресса очередной пачки
+        cancelled = await self._broadcast_repo.cancel_broadcast_by_id(broadcast_id)
+        if cancelled is None:
+            raise BroadcastAlreadyFinishedError
+        await self._audience.drop_snapshot(broadcast_id)
+        return BroadcastReadSchema.model_validate(cancelled)
@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import os
+import socket
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from uuid import uuid4
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError
+
+from app.core.database import async_session_maker
+from app.core.metrics import metrics
+from app.core.security import get_token_crypto
+from app.core.settings import settings
+from app.enums import BroadcastStatus
+from app.broadcasts.audience import BroadcastAudience, create_broadcast_audience
+from app.broadcasts.message import BroadcastMessage
+from app.broadcasts.models import BroadcastModel
+from app.broadcasts.repositories import BroadcastRepository
+from app.telegram.context import ScenarioContext
+from app.telegram.schemas.update import IncomingUpdate
+from app.telegram.services.bot_pool import bot_pool
+from app.telegram.storage.file_id_cache import FileIdCache, create_file_id_cache
+
+logger = logging.getLogger(__name__)
+
+DELIVERED = "delivered"
+BLOCKED = "blocked"
+FAILED = "failed"
+
+
+@asynccontextmanager
+async def broadcast_repository() -> AsyncIterator[BroadcastRepository]:
+    """Репозиторий рассылок с отдельной сессией БД"""
+    async with async_session_maker() as session:
+        yield BroadcastRepository(session)
+
+
+class BroadcastSender:
+    """Отправка одной рассылки, взятой в аренду.
+
+    Аудитория читается из снимка пачками, после каждой пачки курсор и
+    счётчики сохраняются в БД вместе с продлением аренды. После перезапуска
+    рассылка продолжается с сохранённого курсора, поэтому сообщения
+    последней незавершённой пачки могут быть отправлены повторно.
+    """
+
+    def __init__(
+        self,
+        broadcast: BroadcastModel,
+        owner: str,
+        audience: BroadcastAudience,
+        file_ids: FileIdCache,
+    ):
+        self.broadcast = broadcast
+        self.owner = owner
+        self.audience = audience
+        self.file_ids = file_ids
+        self.message = BroadcastMessage(broadcast.text, broadcast.data)
+
+    async def run(self) -> None:
+        try:
+            await self._run()
+        except BaseException:
+            # Аренда отдаётся сразу, чтобы рассылку продолжил другой процесс
+            async with broadcast_repository() as repository:
+                await repository.release_broadcast(self.broadcast.id, self.owner)
+            raise
+
+    async def _run(self) -> None:
+        broadcast = self.broadcast
+        async with broadcast_repository() as repository:
+            encrypted_token = await repository.get_encrypted_token_by_bot_id(broadcast.bot_id)
+        if encrypted_token is None:
+            return
+
+        bot = bot_pool.get_bot(
+            broadcast.bot_id,
+            encrypted_token,
+            decrypt=get_token_crypto().decrypt,
+        )
+
+        if broadcast.status == BroadcastStatus.PENDING and not await self._start():
+            return
+
+        cursor = broadcast.cursor
+        while True:
+            chat_ids = await self.audience.read(broadcast.id, cursor, settings.broadcast.BATCH_SIZE)
+            if not chat_ids:
+                break
+
+            results = await self._send_batch(bot, chat_ids)
+            cursor += len(chat_ids)
+
+            # Заблокировавшие бота больше не попадают в следующие рассылки
+            await self.audience.remove_many(
+                broadcast.bot_id,
+                [chat_id for chat_id, result in zip(chat_ids, results) if result == BLOCKED],
+            )
+
+            counts = Counter(results)
+            for result, count in counts.items():
+                metrics.inc("broadcast_messages_total", count, result=result)
+
+            async with broadcast_repository() as repository:
+                saved = await repository.checkpoint_broadcast(
+                    broadcast.id,
+                    self.owner,
+                    cursor=cursor,
+                    delivered=counts[DELIVERED],
+                    blocked=counts[BLOCKED],
+                    failed=counts[FAILED],
+                    lease_seconds=settings.broadcast.LEASE_SECONDS,
+                )
+            if not saved:
+                logger.info("Broadcast %s was cancelled or taken over", broadcast.id)
+                return
+
+        async with broadcast_repository() as repository:
+            await repository.complete_broadcast(broadcast.id, self.owner)
+        await self.audience.drop_snapshot(broadcast.id)
+        logger.info("Broadcast %s completed", broadcast.id)
+
+    async def _start(self) -> bool:
+        """Зафиксировать аудиторию и перевести рассылку в отправку"""
+        broadcast = self.broadcast
+        if not await self.audience.is_backfilled(broadcast.bot_id):
+            # Пользователи, писавшие боту до появления учёта аудитории; позже
+            # аудитория ведётся по апдейтам, а заблокировавшие бота из неё убираются
+            async with broadcast_repository() as repository:
+                known_chat_ids = await repository.get_known_chat_ids(broadcast.bot_id)
+            await self.audience.add_many(broadcast.bot_id, known_chat_ids)
+            await self.audience.mark_backfilled(broadcast.bot_id)
+
+        total = await self.audience.snapshot(broadcast.bot_id, broadcast.id)
+        async with broadcast_repository() as repository:
+            started = await repository.start_broadcast(broadcast.id, self.owner, total)
+        if started:
+            logger.info("Broadcast %s started for %s chats", broadcast.id, total)
+        return started
+
+    async def _send_batch(self, bot: Bot, chat_ids: list[int]) -> list[str]:
+        """Отправка пачки; темп задаёт ограничитель запросов бота"""
+        semaphore = asyncio.Semaphore(settings.broadcast.CONCURRENCY)
+
+        async def send(chat_id: int) -> str:
+            async with semaphore:
+                return await self._send(bot, chat_id)
+
+        if not self.message.has_attachments:
+            return list(await asyncio.gather(*(send(chat_id) for chat_id in chat_ids)))
+
+        # Первое сообщение загружает вложения, остальные уходят по их file_id
+        first = await self._send(bot, chat_ids[0])
+        rest = await asyncio.gather(*(send(chat_id) for chat_id in chat_ids[1:]))
+        return [first, *rest]
+
+    async def _send(self, bot: Bot, chat_id: int) -> str:
+        context = ScenarioContext(
+            update=IncomingUpdate(update_id=0, user_id=chat_id, chat_id=chat_id),
+            bot=bot,
+            user_id=str(chat_id),
+            chat_id=str(chat_id),
+            scenario_id="",
+            scenario=None,
+            bot_id=self.broadcast.bot_id,
+            file_ids=self.file_ids,
+        )
+        try:
+            await self.message.send(context)
+            return DELIVERED
+        except TelegramForbiddenError:
+            return BLOCKED
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug("Broadcast %s to %s failed: %s", self.broadcast.id, chat_id, e)
+            return FAILED
+
+
+class BroadcastRunner:
+    """Цикл отправки рассылок.
+
+    Процесс берёт в аренду одну незавершённую рассылку и отправляет её до
+    конца. Рассылку, аренда которой истекла (процесс упал или был
+    перезапущен), подхватывает любой другой процесс.
+    """
+
+    def __init__(self, redis_client):
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}"
+        self.audience = create_broadcast_audience(redis_client)
+        self.file_ids = create_file_id_cache(redis_client)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                broadcast = await self._claim()
+                if broadcast:
+                    await BroadcastSender(broadcast, self.owner, self.audience, self.file_ids).run()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to send broadcast")
+                broadcast = None
+
+            if not broadcast:
+                await asyncio.sleep(settings.broadcast.POLL_INTERVAL)
+
+    async def _claim(self) -> Optional[BroadcastModel]:
+        async with broadcast_repository() as repository:
+            return await repository.claim_broadcast(
+                self.owner,
+                lease_seconds=settings.broadcast.LEASE_SECONDS,
+            )
+
+
+def start_broadcast_runner(redis_client) -> asyncio.Task:
+    """Запуск отправки рассылок в текущем event loop"""
+    return asyncio.create_task(BroadcastRunner(redis_client).run())
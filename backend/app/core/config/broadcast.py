@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class BroadcastSettings(BaseModel):
+    IN_PROCESS: bool = True
+    POLL_INTERVAL: float = 5.0
+    BATCH_SIZE: int = 200
+    # Сколько сообщений одновременно ждут ответа Bot API;
+    # темп отправки задаёт ограничитель запросов бота
+    CONCURRENCY: int = 30
+    # Аренда продлевается после каждой пачки, поэтому должна быть
+    # заметно больше времени отправки пачки (BATCH_SIZE / TELEGRAM_BOT_RATE)
+    LEASE_SECONDS: int = 120
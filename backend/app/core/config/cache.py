@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class ScenarioCacheSettings(BaseModel):
+    MAX_ENTRIES: int = 10_000
+    MAX_BYTES: int = 64 * 1024 * 1024
+    TTL: int = 300
+    CHANNEL: str = "telegram:scenario-cache"
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+
+class DedupSettings(BaseModel):
+    ENABLED: bool = True
+    KEY: str = "telegram:updates"
+    # Сколько секунд помнить обработанный update_id
+    TTL: int = 3600
+    # Апдейты, отстающие от самого нового апдейта бота больше чем на окно,
+    # считаются повторами даже после истечения TTL; 0 отключает проверку
+    HIGH_WATER_WINDOW: int = 1000
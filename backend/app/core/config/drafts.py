@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+
+class DraftSettings(BaseModel):
+    # Автосохранения черновиков копятся в Redis и пишутся в БД периодически
+    BUFFERED: bool = False
+    KEY: str = "scenarios:drafts"
+    IN_PROCESS: bool = True
+    FLUSH_INTERVAL: float = 5.0
+    # Черновик, взятый на запись и не записанный за это время, возвращается в буфер
+    CLAIM_TIMEOUT: float = 30.0
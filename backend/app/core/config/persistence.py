@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+
+class PersistenceSettings(BaseModel):
+    # Значения пользователей копятся в Redis и пишутся в БД пачками
+    WRITE_BEHIND: bool = False
+    BUFFER_KEY: str = "users_data:buffer"
+    IN_PROCESS: bool = True
+    FLUSH_INTERVAL: float = 1.0
+    FLUSH_SIZE: int = 1000
+    # Пачка, не записанная за FLUSH_RETRIES попыток, пишется по одному значению;
+    # значения, которые отклоняет БД, переносятся в DEAD_LETTER_KEY
+    FLUSH_RETRIES: int = 3
+    DEAD_LETTER_KEY: str = "users_data:dead"
+    # Пачка обработчика, который не отмечался CLAIM_TIMEOUT секунд, возвращается в буфер
+    CLAIM_TIMEOUT: float = 60.0
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+
+
+class QueueSettings(BaseModel):
+    ENABLED: bool = False
+    STREAM: str = "telegram:updates"
+    GROUP: str = "update-workers"
+    # Ограничение длины только для потока необработанных: дорожки очищаются
+    # от подтверждённых апдейтов раз в TRIM_INTERVAL секунд
+    MAX_LEN: int = 100_000
+    TRIM_INTERVAL: float = 60.0
+    LANES: int = 16
+    LANE_LEASE_MS: int = 30000
+
+    IN_PROCESS: bool = True
+    BATCH_SIZE: int = 10
+    BLOCK_MS: int = 5000
+    REBALANCE_INTERVAL: float = 5.0
+
+    # Апдейт, не обработанный за MAX_DELIVERIES попыток, уходит в DEAD_LETTER_STREAM
+    MAX_DELIVERIES: int = 5
+    RETRY_DELAY: float = 1.0
+    DEAD_LETTER_STREAM: str = "telegram:updates:dead"
@@ -1,20 +1,12 @@
 from pydantic import BaseModel
 
-from redis.asyncio import Redis
-
 
 class RedisSettings(BaseModel):
     HOST: str
     PORT: int
     PASSWORD: str
     DB: int
-
-    @property
-    def client(self) -> Redis:
-        return Redis(
-            host=self.HOST,
-            port=self.PORT,
-            password=self.PASSWORD,
-            db=self.DB,
-            decode_responses=True,
-        )
+    # Блокирующие чтения очереди и pub/sub держат соединение постоянно,
+    # поэтому пул должен быть больше числа дорожек очереди
+    MAX_CONNECTIONS: int = 64
+    POOL_TIMEOUT: float = 5
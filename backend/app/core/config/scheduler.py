@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+
+class SchedulerSettings(BaseModel):
+    KEY: str = "telegram:timers"
+    IN_PROCESS: bool = True
+    POLL_INTERVAL: float = 1.0
+    BATCH_SIZE: int = 500
+    VISIBILITY_TIMEOUT: int = 300
+    # Сколько таймеров пачки срабатывают одновременно; без очереди каждый
+    # занимает соединение пула БД, поэтому значение меньше размера пула
+    CONCURRENCY: int = 5
+    # Неудавшееся продолжение повторяется через RETRY_DELAY * 2^(попытка - 1) секунд,
+    # после MAX_ATTEMPTS попыток таймер переносится в DEAD_LETTER_KEY
+    MAX_ATTEMPTS: int = 5
+    RETRY_DELAY: float = 30.0
+    DEAD_LETTER_KEY: str = "telegram:timers:dead"
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+
+class TelegramSettings(BaseModel):
+    CONNECTION_LIMIT: int = 100
+    LIMIT_PER_HOST: int = 100
+    KEEPALIVE_TIMEOUT: float = 60
+    DNS_CACHE_TTL: int = 3600
+    POOL_IDLE_TTL: int = 600
+    POOL_SWEEP_INTERVAL: int = 60
+    RATE_LIMIT_ENABLED: bool = True
+    BOT_RATE: float = 30
+    BOT_BURST: int = 30
+    CHAT_RATE: float = 1
+    CHAT_BURST: int = 3
+    RETRY_AFTER_ATTEMPTS: int = 3
@@ -0,0 +1,12 @@
+from typing import Annotated
+
+from fastapi import Depends
+from fastapi.requests import Request
+from redis.asyncio import Redis
+
+
+def get_redis(request: Request) -> Redis:
+    return request.state.redis
+
+
+RedisDI = Annotated[Redis, Depends(get_redis)]
@@ -0,0 +1,83 @@
+from collections import defaultdict
+from typing import Awaitable, Callable
+
+
+Labels = tuple[tuple[str, str], ...]
+Sample = tuple[str, dict[str, str], float]
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format(name: str, labels: Labels, value: float) -> str:
+    if not labels:
+        return f"{name} {value}"
+    rendered = ",".join(f'{key}="{val}"' for key, val in labels)
+    return f"{name}{{{rendered}}} {value}"
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса в формате Prometheus"""
+
+    def __init__(self):
+        self._counters: dict[str, dict[Labels, float]] = defaultdict(dict)
+        self._gauges: dict[str, dict[Labels, float]] = defaultdict(dict)
+        self._collectors: list[Callable[[], Awaitable[list[Sample]]]] = []
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Увеличить счётчик"""
+        series = self._counters[name]
+        key = _labels(labels)
+        series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        """Установить значение датчика"""
+        self._gauges[name][_labels(labels)] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Учесть наблюдение (сумма и количество)"""
+        self.inc(f"{name}_sum", value, **labels)
+        self.inc(f"{name}_count", 1, **labels)
+
+    def get(self, name: str, **labels) -> float:
+        """Текущее значение счётчика или датчика"""
+        key = _labels(labels)
+        if key in self._counters.get(name, {}):
+            return self._counters[name][key]
+        return self._gauges.get(name, {}).get(key, 0)
+
+    def register_collector(
+        self,
+        collector: Callable[[], Awaitable[list[Sample]]],
+    ) -> None:
+        """Зарегистрировать функцию, собирающую метрики в момент запроса"""
+        self._collectors.append(collector)
+
+    def unregister_collector(
+        self,
+        collector: Callable[[], Awaitable[list[Sample]]],
+    ) -> None:
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    async def render(self) -> str:
+        """Выгрузка метрик в текстовом формате Prometheus"""
+        lines = []
+        for kind, metrics in (("counter", self._counters), ("gauge", self._gauges)):
+            for name, series in sorted(metrics.items()):
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(_format(name, key, value) for key, value in series.items())
+
+        for collector in self._collectors:
+            collected: dict[str, list[str]] = defaultdict(list)
+            for name, labels, value in await collector():
+                collected[name].append(_format(name, _labels(labels), value))
+            for name, samples in collected.items():
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(samples)
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,50 @@
+import time
+
+from redis.asyncio import Redis, BlockingConnectionPool
+from redis.exceptions import ConnectionError, TimeoutError
+
+from app.core.metrics import metrics, Sample
+from app.core.settings import settings
+
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    """Пул соединений Redis с метриками ожидания и ошибок"""
+
+    async def get_connection(self, command_name=None, *keys, **options):
+        started = time.monotonic()
+        try:
+            connection = await super().get_connection()
+        except (ConnectionError, TimeoutError, OSError):
+            metrics.inc("redis_pool_connection_errors_total")
+            raise
+        finally:
+            metrics.observe("redis_pool_wait_seconds", time.monotonic() - started)
+        return connection
+
+    def make_connection(self):
+        metrics.inc("redis_pool_connections_created_total")
+        return super().make_connection()
+
+    async def collect_metrics(self) -> list[Sample]:
+        """Заполненность пула в момент запроса метрик"""
+        in_use = len(self._in_use_connections)
+        return [
+            ("redis_pool_connections_in_use", {}, in_use),
+            ("redis_pool_connections_available", {}, len(self._available_connections)),
+            ("redis_pool_max_connections", {}, self.max_connections),
+            ("redis_pool_utilization", {}, in_use / self.max_connections),
+        ]
+
+
+def create_redis_client() -> Redis:
+    """Клиент Redis с общим на процесс пулом соединений"""
+    pool = InstrumentedConnectionPool(
+        host=settings.redis.HOST,
+        port=settings.redis.PORT,
+        password=settings.redis.PASSWORD,
+        db=settings.redis.DB,
+        decode_responses=True,
+        max_connections=settings.redis.MAX_CONNECTIONS,
+        timeout=settings.redis.POOL_TIMEOUT,
+    )
+    return Redis.from_pool(pool)
@@ -5,6 +5,8 @@ from app.auth.api import router as auth_router
 from app.users.api import router as users_router
 from app.bots.api import router as bots_router
 from app.scenarios.api import router as scenarios_router
+from app.broadcasts.api import router as broadcasts_router
+from app.metrics.api import router as metrics_router
 
 
 def get_app_routers() -> APIRouter:
@@ -16,6 +18,8 @@ def get_app_routers() -> APIRouter:
         users_router,
         bots_router,
         scenarios_router,
+        broadcasts_router,
+        metrics_router,
     )
 
     for router in routers:
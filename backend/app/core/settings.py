@@ -2,6 +2,7 @@ import os
 from dotenv import load_dotenv
 
 from pathlib import Path
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from app.core.config.app import AppSettings
@@ -9,6 +10,14 @@ from app.core.config.db import DBSettings
 from app.core.config.jwt import JWTSettings
 from app.core.config.s3 import S3Settings
 from app.core.config.redis import RedisSettings
+from app.core.config.queue import QueueSettings
+from app.core.config.scheduler import SchedulerSettings
+from app.core.config.cache import ScenarioCacheSettings
+from app.core.config.telegram import TelegramSettings
+from app.core.config.broadcast import BroadcastSettings
+from app.core.config.dedup import DedupSettings
+from app.core.config.persistence import PersistenceSettings
+from app.core.config.drafts import DraftSettings
 
 # ENV_PATH = os.environ.get("ENV_FILE", str(Path(__file__).parent.parent.parent.parent / ".env"))
 
@@ -25,6 +34,14 @@ class Settings(BaseSettings):
     jwt: JWTSettings
     s3: S3Settings
     redis: RedisSettings
+    queue: QueueSettings = Field(default_factory=QueueSettings)
+    scheduler: SchedulerSettings = Field(default_factory=SchedulerSettings)
+    cache: ScenarioCacheSettings = Field(default_factory=ScenarioCacheSettings)
+    telegram: TelegramSettings = Field(default_factory=TelegramSettings)
+    broadcast: BroadcastSettings = Field(default_factory=BroadcastSettings)
+    dedup: DedupSettings = Field(default_factory=DedupSettings)
+    persistence: PersistenceSettings = Field(default_factory=PersistenceSettings)
+    drafts: DraftSettings = Field(default_factory=DraftSettings)
 
     model_config = SettingsConfigDict(
         env_file=None,
@@ -75,6 +75,16 @@ class BlockType(enum.Enum):
     DELAY = "delay"
 
 
+class UpdateKind(enum.Enum):
+    MESSAGE = "message"
+    CALLBACK_QUERY = "callback_query"
+
+
+class QueueItemType(enum.Enum):
+    UPDATE = "update"
+    TIMER = "timer"
+
+
 class HTTPMethod(enum.Enum):
     GET = "GET"
     POST = "POST"
@@ -95,3 +105,10 @@ class AiohttpSessionMethod(enum.Enum):
     CONNECT = "ws_connect"
     HEAD = "head"
     OPTIONS = "options"
+
+
+class BroadcastStatus(enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
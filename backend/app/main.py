@@ -13,6 +13,21 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.settings import settings
 from app.core.routers import get_app_routers
+from app.core.metrics import metrics
+from app.core.redis import create_redis_client
+from app.telegram.services.bot_pool import bot_pool
+from app.telegram.services.rate_limiter import create_rate_limiter
+from app.telegram.storage.update_queue import create_update_queue
+from app.telegram.workers import (
+    start_update_workers,
+    start_delay_scheduler,
+    start_cache_invalidation_listener,
+    stop_background_task,
+    lane_metrics_collector,
+)
+from app.broadcasts.workers import start_broadcast_runner
+from app.users_data.workers import start_user_data_flusher
+from app.scenarios.workers import start_draft_flusher
 
 
 @asynccontextmanager
@@ -20,7 +35,37 @@ async def lifespan(app: FastAPI):
     auth_security = AuthX(config=settings.jwt.auth_config)
     auth_security.handle_errors(app)
 
-    yield {"auth_security": auth_security}
+    redis_client = create_redis_client()
+    pool_collector = redis_client.connection_pool.collect_metrics
+    metrics.register_collector(pool_collector)
+    if settings.telegram.RATE_LIMIT_ENABLED:
+        bot_pool.add_request_middleware(create_rate_limiter(redis_client))
+
+    background_tasks = [start_cache_invalidation_listener(redis_client)]
+    lanes_collector = None
+    if settings.queue.ENABLED:
+        lanes_collector = lane_metrics_collector(create_update_queue(redis_client))
+        metrics.register_collector(lanes_collector)
+        if settings.queue.IN_PROCESS:
+            background_tasks.append(start_update_workers(redis_client))
+    if settings.scheduler.IN_PROCESS:
+        background_tasks.append(start_delay_scheduler(redis_client))
+    if settings.broadcast.IN_PROCESS:
+        background_tasks.append(start_broadcast_runner(redis_client))
+    if settings.persistence.WRITE_BEHIND and settings.persistence.IN_PROCESS:
+        background_tasks.append(start_user_data_flusher(redis_client))
+    if settings.drafts.BUFFERED and settings.drafts.IN_PROCESS:
+        background_tasks.append(start_draft_flusher(redis_client))
+
+    yield {"auth_security": auth_security, "redis": redis_client}
+
+    for task in background_tasks:
+        await stop_background_task(task)
+    if lanes_collector:
+        metrics.unregister_collector(lanes_collector)
+    await bot_pool.close()
+    metrics.unregister_collector(pool_collector)
+    await redis_client.aclose()
 
 
 app = FastAPI(title="ChatBot Constructor", lifespan=lifespan)
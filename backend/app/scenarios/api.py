@@ -1,18 +1,25 @@
-from fastapi import APIRouter, Depends, status, UploadFile, File
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, status, UploadFile, File
 
 from app.auth.dependencies.auth_deps import UserIDFromAccessTokenDI, access_token_required
 from app.scenarios.dependencies.services_deps import ScenarioServiceDI
+from app.users_data.dependencies.services_deps import UserDataServiceDI
 from app.scenarios.exceptions.http_exceptions import (
     ScenarioNotFoundHTTPException,
     NoPermissionForScenarioHTTPException,
     EmptyFileHTTPException,
     FileTooLargeHTTPException,
+    DraftRevisionConflictHTTPException,
+    InvalidDraftPatchHTTPException,
 )
 from app.scenarios.exceptions.services_exceptions import (
     ScenarioNotFoundError,
     NoPermissionForScenarioError,
     EmptyFileError,
     FileTooLargeError,
+    DraftRevisionConflictError,
+    InvalidDraftPatchError,
 )
 from app.bots.exceptions.http_exceptions import (
     BotNotFoundHTTPException,
@@ -22,11 +29,17 @@ from app.bots.exceptions.services_exceptions import (
     BotNotFoundError,
     NoPermissionForBotError,
 )
+from app.users_data.exceptions.http_exceptions import InvalidCursorHTTPException
+from app.users_data.exceptions.services_exceptions import InvalidCursorError
+from app.users_data.schemas import UserValuePageSchema, UserValueHistoryPageSchema
 from app.scenarios.schemas.scenario import (
     ScenarioReadSchema,
+    ScenarioPageSchema,
     ScenarioCreateSchema,
     ScenarioPatchSchema,
     ScenarioLinkSchema,
+    ScenarioDraftPatchSchema,
+    ScenarioDraftRevisionSchema,
 )
 
 router = APIRouter(
@@ -80,13 +93,19 @@ async def link_scenario_to_bot(
 
 @router.get(
     "",
-    response_model=list[ScenarioReadSchema],
+    response_model=ScenarioPageSchema,
 )
 async def get_scenarios(
         user_id: UserIDFromAccessTokenDI,
         scenario_service: ScenarioServiceDI,
+        cursor: Optional[int] = None,
+        limit: int = Query(default=50, ge=1, le=200),
 ):
-    return await scenario_service.get_scenarios(user_id)
+    return await scenario_service.get_scenarios(
+        user_id=user_id,
+        cursor=cursor,
+        limit=limit,
+    )
 
 
 @router.get(
@@ -109,6 +128,64 @@ async def get_scenario(
         raise NoPermissionForScenarioHTTPException
 
 
+@router.get(
+    "/{scenario_id}/values",
+    response_model=UserValuePageSchema,
+)
+async def get_scenario_values(
+        user_id: UserIDFromAccessTokenDI,
+        scenario_service: ScenarioServiceDI,
+        user_data_service: UserDataServiceDI,
+        scenario_id: int,
+        cursor: Optional[str] = None,
+        limit: int = Query(default=100, ge=1, le=500),
+):
+    try:
+        await scenario_service.check_owner(
+            user_id=user_id,
+            scenario_id=scenario_id,
+        )
+        return await user_data_service.get_scenario_values(
+            scenario_id=scenario_id,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ScenarioNotFoundError:
+        raise ScenarioNotFoundHTTPException
+    except NoPermissionForScenarioError:
+        raise NoPermissionForScenarioHTTPException
+    except InvalidCursorError:
+        raise InvalidCursorHTTPException
+
+
+@router.get(
+    "/{scenario_id}/values/history",
+    response_model=UserValueHistoryPageSchema,
+)
+async def get_scenario_values_history(
+        user_id: UserIDFromAccessTokenDI,
+        scenario_service: ScenarioServiceDI,
+        user_data_service: UserDataServiceDI,
+        scenario_id: int,
+        cursor: Optional[int] = None,
+        limit: int = Query(default=100, ge=1, le=500),
+):
+    try:
+        await scenario_service.check_owner(
+            user_id=user_id,
+            scenario_id=scenario_id,
+        )
+        return await user_data_service.get_scenario_history(
+            scenario_id=scenario_id,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ScenarioNotFoundError:
+        raise ScenarioNotFoundHTTPException
+    except NoPermissionForScenarioError:
+        raise NoPermissionForScenarioHTTPException
+
+
 @router.patch(
     "/{scenario_id}",
     response_model=ScenarioReadSchema,
@@ -173,6 +250,32 @@ async def upload_user_file(
         await file.close()
 
 
+@router.patch(
+    "/{scenario_id}/draft",
+    response_model=ScenarioDraftRevisionSchema,
+)
+async def patch_draft(
+        user_id: UserIDFromAccessTokenDI,
+        scenario_service: ScenarioServiceDI,
+        scenario_id: int,
+        patch: ScenarioDraftPatchSchema,
+):
+    try:
+        return await scenario_service.patch_draft(
+            user_id=user_id,
+            scenario_id=scenario_id,
+            patch=patch,
+        )
+    except ScenarioNotFoundError:
+        raise ScenarioNotFoundHTTPException
+    except NoPermissionForScenarioError:
+        raise NoPermissionForScenarioHTTPException
+    except DraftRevisionConflictError:
+        raise DraftRevisionConflictHTTPException
+    except InvalidDraftPatchError:
+        raise InvalidDraftPatchHTTPException
+
+
 @router.post(
     "/{scenario_id}/draft/apply",
     response_model=ScenarioReadSchema,
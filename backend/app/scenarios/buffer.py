@@ -0,0 +1,144 @@
+import json
+import time
+from typing import Optional
+
+from app.core.settings import settings
+from app.core.dependencies.redis_deps import RedisDI
+
+# Возврат зависших черновиков и перенос свободных в хеш записываемых.
+# Черновик сценария не берётся, пока предыдущий ещё записывается,
+# чтобы старый черновик не перезаписал в БД новый
+CLAIM_SCRIPT = """
+local claims = redis.call('HGETALL', KEYS[3])
+for i = 1, #claims, 2 do
+    if tonumber(claims[i + 1]) < tonumber(ARGV[1]) - tonumber(ARGV[2]) then
+        local payload = redis.call('HGET', KEYS[2], claims[i])
+        redis.call('HDEL', KEYS[2], claims[i])
+        redis.call('HDEL', KEYS[3], claims[i])
+        if payload and redis.call('HEXISTS', KEYS[1], claims[i]) == 0 then
+            redis.call('HSET', KEYS[1], claims[i], payload)
+        end
+    end
+end
+
+local ids = {}
+for i = 3, #ARGV do
+    ids[#ids + 1] = ARGV[i]
+end
+if #ids == 0 then
+    ids = redis.call('HKEYS', KEYS[1])
+end
+
+local claimed = {}
+for _, id in ipairs(ids) do
+    local payload = redis.call('HGET', KEYS[1], id)
+    if payload and redis.call('HEXISTS', KEYS[2], id) == 0 then
+        redis.call('HDEL', KEYS[1], id)
+        redis.call('HSET', KEYS[2], id, payload)
+        redis.call('HSET', KEYS[3], id, ARGV[1])
+        claimed[#claimed + 1] = id
+        claimed[#claimed + 1] = payload
+    end
+end
+return claimed
+"""
+
+# Снятие записанного черновика, если его не вернули в буфер по таймауту
+COMPLETE_SCRIPT = """
+if redis.call('HGET', KEYS[1], ARGV[1]) == ARGV[2] then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    redis.call('HDEL', KEYS[2], ARGV[1])
+end
+return 0
+"""
+
+# Возврат незаписанного черновика, если редактор не прислал новый
+RELEASE_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) == ARGV[2] then
+    redis.call('HDEL', KEYS[2], ARGV[1])
+    redis.call('HDEL', KEYS[3], ARGV[1])
+    if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 0 then
+        redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    end
+end
+return 0
+"""
+
+
+class DraftBuffer:
+    """Буфер автосохранений черновиков сценариев.
+
+    Черновики лежат в хеше Redis по id сценария: каждое сохранение
+    перезаписывает предыдущее, и в БД попадает только последнее.
+    Перед записью черновик атомарно переносится в хеш записываемых,
+    поэтому два обработчика не запишут один черновик дважды. После
+    записи он снимается, при ошибке возвращается в буфер, а взятый
+    обработчиком, который не закончил запись за CLAIM_TIMEOUT, снова
+    становится доступен для записи.
+    """
+
+    def __init__(self, redis_client, key: str):
+        self.redis = redis_client
+        self.key = key
+        self.processing_key = f"{key}:processing"
+        self.claimed_at_key = f"{key}:claimed_at"
+
+    async def put(self, scenario_id: int, draft: Optional[dict]) -> None:
+        await self.redis.hset(self.key, str(scenario_id), json.dumps(draft))
+
+    async def get(self, scenario_id: int) -> list[str]:
+        """Ещё не записанные черновики в порядке записи, последний — актуальный"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hget(self.processing_key, str(scenario_id))
+            pipe.hget(self.key, str(scenario_id))
+            payloads = await pipe.execute()
+        return [payload for payload in payloads if payload is not None]
+
+    async def claim(self, scenario_id: Optional[int] = None) -> dict[int, str]:
+        """Взять на запись черновик сценария или, без scenario_id, все свободные"""
+        ids = [] if scenario_id is None else [str(scenario_id)]
+        claimed = await self.redis.eval(
+            CLAIM_SCRIPT,
+            3,
+            self.key,
+            self.processing_key,
+            self.claimed_at_key,
+            time.time(),
+            settings.drafts.CLAIM_TIMEOUT,
+            *ids,
+        )
+        return {int(claimed[i]): claimed[i + 1] for i in range(0, len(claimed), 2)}
+
+    async def complete(self, scenario_id: int, payload: str) -> None:
+        """Снять записанный в БД черновик"""
+        await self.redis.eval(
+            COMPLETE_SCRIPT, 2, self.processing_key, self.claimed_at_key, str(scenario_id), payload
+        )
+
+    async def release(self, scenario_id: int, payload: str) -> None:
+        """Вернуть в буфер черновик, который не удалось записать"""
+        await self.redis.eval(
+            RELEASE_SCRIPT,
+            3,
+            self.key,
+            self.processing_key,
+            self.claimed_at_key,
+            str(scenario_id),
+            payload,
+        )
+
+    async def delete(self, scenario_id: int) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hdel(self.key, str(scenario_id))
+            pipe.hdel(self.processing_key, str(scenario_id))
+            pipe.hdel(self.claimed_at_key, str(scenario_id))
+            await pipe.execute()
+
+
+def create_draft_buffer(redis_client) -> DraftBuffer:
+    return DraftBuffer(redis_client, settings.drafts.KEY)
+
+
+async def get_draft_buffer(redis_client: RedisDI) -> DraftBuffer:
+    """Получить буфер черновиков сценариев"""
+    return create_draft_buffer(redis_client)
@@ -0,0 +1,7 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from app.scenarios.buffer import DraftBuffer, get_draft_buffer
+
+DraftBufferDI = Annotated[DraftBuffer, Depends(get_draft_buffer)]
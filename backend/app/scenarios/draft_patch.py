@@ -0,0 +1,162 @@
+"""JSON Patch (RFC 6902) для черновиков сценариев.
+
+Операции add, remove и replace переводятся в выражения jsonb_set,
+jsonb_insert и #-, и патч применяется в БД без передачи черновика.
+Патчи с move, copy, test или операциями над корнем применяются в Python.
+"""
+import copy
+from typing import Any
+
+from sqlalchemy import ColumnElement, Text, and_, case, func, literal, true
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+
+from app.scenarios.exceptions.services_exceptions import InvalidDraftPatchError
+
+SQL_OPERATIONS = {"add", "remove", "replace"}
+
+
+def parse_pointer(pointer: str) -> list[str]:
+    """Разбор JSON Pointer (RFC 6901) в список ключей"""
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise InvalidDraftPatchError
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def is_sql_patch(operations: list[dict]) -> bool:
+    """Можно ли применить патч выражениями над jsonb"""
+    return all(
+        operation["op"] in SQL_OPERATIONS and parse_pointer(operation["path"])
+        for operation in operations
+    )
+
+
+def sql_patch_step(document: ColumnElement, operation: dict) -> tuple[ColumnElement, ColumnElement]:
+    """Документ после одной операции и условие, при котором операция применима"""
+    tokens = parse_pointer(operation["path"])
+    path = literal(tokens, ARRAY(Text))
+    parent_path = literal(tokens[:-1], ARRAY(Text))
+    parent = document.op("#>")(parent_path)
+    is_array = func.jsonb_typeof(parent) == "array"
+    key = tokens[-1]
+    # Postgres понимает и отрицательные индексы, RFC 6901 — только такие
+    is_index = key.isdigit() and (key == "0" or not key.startswith("0"))
+
+    if operation["op"] in ("remove", "replace"):
+        guard = document.op("#>")(path).is_not(None)
+        if not is_index:
+            guard = and_(guard, ~is_array)
+        if operation["op"] == "remove":
+            return document.op("#-")(path), guard
+        value = literal(operation["value"], JSONB)
+        return func.jsonb_set(document, path, value, False), guard
+
+    value = literal(operation["value"], JSONB)
+    if key == "-":
+        in_array = func.jsonb_set(document, parent_path, parent.op("||")(func.jsonb_build_array(value)))
+        array_guard = true()
+    elif is_index:
+        in_array = func.jsonb_insert(document, path, value)
+        array_guard = func.jsonb_array_length(parent) >= int(key)
+    else:
+        in_array = document
+        array_guard = literal(False)
+
+    patched = case(
+        (is_array, in_array),
+        else_=func.jsonb_set(document, path, value, True),
+    )
+    guard = and_(
+        func.jsonb_typeof(parent).in_(["object", "array"]),
+        case((is_array, array_guard), else_=true()),
+    )
+    return patched, guard
+
+
+def apply_patch(document: Any, operations: list[dict]) -> Any:
+    """Применение патча к документу в памяти"""
+    document = copy.deepcopy(document)
+    for operation in operations:
+        document = _apply_operation(document, operation)
+    return document
+
+
+def _apply_operation(document: Any, operation: dict) -> Any:
+    op = operation["op"]
+    tokens = parse_pointer(operation["path"])
+
+    if op == "test":
+        if _get(document, tokens) != operation["value"]:
+            raise InvalidDraftPatchError
+        return document
+    if op == "remove":
+        return _remove(document, tokens)
+    if op == "replace":
+        # Замена корня подменяет весь документ (RFC 6902, раздел 4.3)
+        if not tokens:
+            return copy.deepcopy(operation["value"])
+        _get(document, tokens)
+        return _add(_remove(document, tokens), tokens, copy.deepcopy(operation["value"]), replace=True)
+    if op == "add":
+        return _add(document, tokens, copy.deepcopy(operation["value"]))
+
+    from_tokens = parse_pointer(operation["from"])
+    value = copy.deepcopy(_get(document, from_tokens))
+    if op == "move":
+        # Нельзя переместить значение внутрь самого себя
+        if tokens[:len(from_tokens)] == from_tokens and tokens != from_tokens:
+            raise InvalidDraftPatchError
+        document = _remove(document, from_tokens)
+    return _add(document, tokens, value)
+
+
+def _index(array: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(array)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise InvalidDraftPatchError
+    index = int(token)
+    if index > len(array) or (index == len(array) and not allow_end):
+        raise InvalidDraftPatchError
+    return index
+
+
+def _get(document: Any, tokens: list[str]) -> Any:
+    for token in tokens:
+        if isinstance(document, dict) and token in document:
+            document = document[token]
+        elif isinstance(document, list):
+            document = document[_index(document, token)]
+        else:
+            raise InvalidDraftPatchError
+    return document
+
+
+def _add(document: Any, tokens: list[str], value: Any, replace: bool = False) -> Any:
+    if not tokens:
+        return value
+    parent, key = _get(document, tokens[:-1]), tokens[-1]
+    if isinstance(parent, dict):
+        parent[key] = value
+    elif isinstance(parent, list):
+        index = _index(parent, key, allow_end=not replace or key != "-")
+        parent.insert(index, value)
+    else:
+        raise InvalidDraftPatchError
+    return document
+
+
+def _remove(document: Any, tokens: list[str]) -> Any:
+    if not tokens:
+        raise InvalidDraftPatchError
+    parent, key = _get(document, tokens[:-1]), tokens[-1]
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise InvalidDraftPatchError
+        del parent[key]
+    elif isinstance(parent, list):
+        del parent[_index(parent, key)]
+    else:
+        raise InvalidDraftPatchError
+    return document
@@ -55,3 +55,19 @@ class FileTooLargeHTTPException(HTTPException):
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail="File is too large",
         )
+
+
+class DraftRevisionConflictHTTPException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Draft has been changed since this revision",
+        )
+
+
+class InvalidDraftPatchHTTPException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Draft patch cannot be applied",
+        )
@@ -24,3 +24,11 @@ class ScenarioNotRunningError(Exception):
 
 class FileTooLargeError(Exception):
     pass
+
+
+class DraftRevisionConflictError(Exception):
+    pass
+
+
+class InvalidDraftPatchError(Exception):
+    pass
@@ -1,7 +1,7 @@
 import datetime
 
-from sqlalchemy import DateTime, func, String, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import DateTime, func, String, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship, query_expression
 from sqlalchemy.dialects.postgresql import JSONB
 
 from app.enums import TriggerType
@@ -27,37 +27,52 @@ class TriggerModel(Base):
 
 class ScenarioModel(Base):
     __tablename__ = "scenarios"
+    __table_args__ = (
+        # Включённый сценарий бота ищется на каждом апдейте
+        Index("ix_scenarios_bot_id_enabled", "bot_id", "enabled"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(245))
     enabled: Mapped[bool] = mapped_column(default=False)
 
+    # Тело активной версии; копия хранится здесь, чтобы апдейт обходился одним запросом
     data: Mapped[dict | None] = mapped_column(JSONB)
     draft: Mapped[dict | None] = mapped_column(JSONB, default=None)
+    # Растёт при каждом сохранении черновика, по нему отсекаются устаревшие патчи
+    draft_revision: Mapped[int] = mapped_column(default=0, server_default="0")
+    # Число собранных значений, обновляется вместе с user_current_values
+    values_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    version_id: Mapped[int | None] = mapped_column(
+        ForeignKey("scenario_versions.id", ondelete="SET NULL", use_alter=True),
+        nullable=True,
+    )
 
     bot_id: Mapped[int] = mapped_column(
         ForeignKey("bots.id", ondelete="CASCADE"),
         nullable=True,
     )
+    # Связи загружаются только явно, опциями запроса в репозитории
     bot: Mapped["BotModel"] = relationship(
         back_populates="scenarios",
-        lazy="selectin",
+        lazy="raise",
     )
 
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
+        index=True,
     )
     user: Mapped["UserModel"] = relationship(back_populates="scenarios")
 
     triggers: Mapped[list["TriggerModel"]] = relationship(
         back_populates="scenario",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise",
     )
     fields: Mapped[list[UserFieldModel]] = relationship(
         back_populates="scenario",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise",
     )
 
     created_at: Mapped[datetime.datetime] = mapped_column(
@@ -69,3 +84,27 @@ class ScenarioModel(Base):
         server_default=func.now(),
         onupdate=func.now(),
     )
+
+    # Заполняется только запросом списка сценариев
+    fields_count: Mapped[int] = query_expression()
+
+
+class ScenarioVersionModel(Base):
+    """Опубликованное тело сценария, не меняется после создания"""
+
+    __tablename__ = "scenario_versions"
+    __table_args__ = (
+        UniqueConstraint("scenario_id", "hash", name="uq_scenario_versions_scenario_id_hash"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    scenario_id: Mapped[int] = mapped_column(
+        ForeignKey("scenarios.id", ondelete="CASCADE"),
+    )
+    hash: Mapped[str] = mapped_column(String(64))
+    data: Mapped[dict] = mapped_column(JSONB)
+
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
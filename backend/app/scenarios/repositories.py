@@ -1,11 +1,22 @@
 from typing import Optional
 
-from sqlalchemy import select, delete, update
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, delete, update, func, Row, and_, case, true, bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import selectinload, load_only, raiseload, with_expression
 
 from app.core.dependencies.db_deps import AsyncSessionDI
-from app.scenarios.models import ScenarioModel, TriggerModel
+from app.scenarios.models import ScenarioModel, ScenarioVersionModel, TriggerModel
+from app.scenarios.schemas.trigger import TriggerSyncSchema
+from app.scenarios.draft_patch import sql_patch_step
 from app.bots.models import BotModel
+from app.users_data.models import UserFieldModel
+
+# Число полей сценария, коррелированный подзапрос по индексу user_fields
+FIELDS_COUNT = (
+    select(func.count())
+    .where(UserFieldModel.scenario_id == ScenarioModel.id)
+    .scalar_subquery()
+)
 
 
 class ScenarioRepository:
@@ -16,19 +27,50 @@ class ScenarioRepository:
         self._session.add(scenario_model)
         await self._session.commit()
         await self._session.refresh(scenario_model)
-        
+        # Связи не загружаются сами, а схема ответа читает их у нового сценария
+        await self._session.refresh(scenario_model, ["bot", "triggers", "fields"])
+
         return scenario_model
 
-    async def get_scenarios_by_user_id(self, user_id: int) -> list[ScenarioModel]:
-        scenarios = await self._session.execute(
+    async def get_scenario_summaries_by_user_id(
+            self,
+            user_id: int,
+            after_id: Optional[int],
+            limit: int,
+    ) -> list[ScenarioModel]:
+        """Страница сценариев без тел и собранных данных, по возрастанию id"""
+        query = (
             select(ScenarioModel)
             .options(
-                selectinload(ScenarioModel.bot),
+                load_only(
+                    ScenarioModel.id,
+                    ScenarioModel.name,
+                    ScenarioModel.enabled,
+                    ScenarioModel.bot_id,
+                    ScenarioModel.updated_at,
+                    ScenarioModel.values_count,
+                ),
+                with_expression(ScenarioModel.fields_count, FIELDS_COUNT),
+                selectinload(ScenarioModel.bot).options(
+                    load_only(
+                        BotModel.id,
+                        BotModel.first_name,
+                        BotModel.enabled,
+                        BotModel.username,
+                    ),
+                    raiseload("*"),
+                ),
                 selectinload(ScenarioModel.triggers),
-                selectinload(ScenarioModel.fields),
+                raiseload("*"),
             )
             .where(ScenarioModel.user_id == user_id)
+            .order_by(ScenarioModel.id)
+            .limit(limit)
         )
+        if after_id is not None:
+            query = query.where(ScenarioModel.id > after_id)
+
+        scenarios = await self._session.execute(query)
         return scenarios.scalars().all()
 
     async def get_scenario_model_by_id(self, scenario_id: int) -> Optional[ScenarioModel]:
@@ -53,6 +95,7 @@ class ScenarioRepository:
             .options(
                 selectinload(ScenarioModel.bot),
                 selectinload(ScenarioModel.triggers),
+                selectinload(ScenarioModel.fields),
             )
             .where(
                 BotModel.webhook_token == webhook_token,
@@ -61,6 +104,167 @@ class ScenarioRepository:
         )
         return scenario.scalar_one_or_none()
 
+    async def get_runtime_by_webhook_token(self, webhook_token: str) -> Optional[Row]:
+        """Только то, что нужно для выполнения сценария, одним запросом без ORM-объектов"""
+        result = await self._session.execute(
+            select(
+                ScenarioModel.id,
+                ScenarioModel.data,
+                ScenarioModel.version_id,
+                ScenarioModel.updated_at,
+                BotModel.id.label("bot_id"),
+                BotModel.encrypted_token,
+            )
+            .join(BotModel, BotModel.id == ScenarioModel.bot_id)
+            .where(
+                BotModel.webhook_token == webhook_token,
+                ScenarioModel.enabled,
+            )
+        )
+        return result.one_or_none()
+
+    async def get_active_version_hash(self, scenario_id: int) -> Optional[str]:
+        result = await self._session.execute(
+            select(ScenarioVersionModel.hash)
+            .join(ScenarioModel, ScenarioModel.version_id == ScenarioVersionModel.id)
+            .where(ScenarioModel.id == scenario_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def add_version(self, scenario_id: int, content_hash: str, data: dict) -> int:
+        """id версии с таким телом; тело сохраняется один раз.
+
+        Транзакция не фиксируется: версия становится активной вместе с данными сценария.
+        """
+        stmt = pg_insert(ScenarioVersionModel).values(
+            scenario_id=scenario_id,
+            hash=content_hash,
+            data=data,
+        )
+        result = await self._session.execute(
+            # Пустое обновление нужно, чтобы RETURNING вернул и существующую версию
+            stmt.on_conflict_do_update(
+                constraint="uq_scenario_versions_scenario_id_hash",
+                set_={"hash": stmt.excluded.hash},
+            )
+            .returning(ScenarioVersionModel.id)
+        )
+        return result.scalar_one()
+
+    async def get_scenario_owner_id(self, scenario_id: int) -> Optional[int]:
+        result = await self._session.execute(
+            select(ScenarioModel.user_id)
+            .where(ScenarioModel.id == scenario_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_draft_revision(self, scenario_id: int) -> Optional[int]:
+        result = await self._session.execute(
+            select(ScenarioModel.draft_revision)
+            .where(ScenarioModel.id == scenario_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def patch_draft(
+            self,
+            scenario_id: int,
+            revision: int,
+            operations: list[dict],
+    ) -> Optional[int]:
+        """Применить патч к черновику одним UPDATE; новая ревизия или None.
+
+        Каждая операция — отдельный CTE над документом предыдущей. Если
+        операция неприменима или ревизия устарела, строка не обновляется.
+        """
+        step = (
+            select(
+                func.coalesce(
+                    ScenarioModel.draft,
+                    func.jsonb_build_object("data", ScenarioModel.data),
+                ).label("doc"),
+                true().label("ok"),
+            )
+            .where(
+                ScenarioModel.id == scenario_id,
+                ScenarioModel.draft_revision == revision,
+            )
+            .cte("step0")
+        )
+        for number, operation in enumerate(operations, start=1):
+            patched, guard = sql_patch_step(step.c.doc, operation)
+            ok = func.coalesce(and_(step.c.ok, guard), False)
+            step = (
+                select(
+                    case((ok, patched), else_=step.c.doc).label("doc"),
+                    ok.label("ok"),
+                )
+                .cte(f"step{number}")
+            )
+
+        result = await self._session.execute(
+            update(ScenarioModel)
+            .where(
+                ScenarioModel.id == scenario_id,
+                ScenarioModel.draft_revision == revision,
+                step.c.ok,
+            )
+            .values(draft=step.c.doc, draft_revision=ScenarioModel.draft_revision + 1)
+            .returning(ScenarioModel.draft_revision)
+            .execution_options(synchronize_session=False)
+        )
+        new_revision = result.scalar_one_or_none()
+        await self._session.commit()
+        return new_revision
+
+    async def get_draft_for_update(self, scenario_id: int, revision: int) -> Optional[dict]:
+        """Черновик указанной ревизии, заблокированный до конца транзакции"""
+        result = await self._session.execute(
+            select(
+                func.coalesce(
+                    ScenarioModel.draft,
+                    func.jsonb_build_object("data", ScenarioModel.data),
+                )
+            )
+            .where(
+                ScenarioModel.id == scenario_id,
+                ScenarioModel.draft_revision == revision,
+            )
+            .with_for_update()
+        )
+        return result.scalar_one_or_none()
+
+    async def replace_draft(self, scenario_id: int, revision: int, draft: dict) -> Optional[int]:
+        result = await self._session.execute(
+            update(ScenarioModel)
+            .where(
+                ScenarioModel.id == scenario_id,
+                ScenarioModel.draft_revision == revision,
+            )
+            .values(draft=draft, draft_revision=ScenarioModel.draft_revision + 1)
+            .returning(ScenarioModel.draft_revision)
+            .execution_options(synchronize_session=False)
+        )
+        new_revision = result.scalar_one_or_none()
+        await self._session.commit()
+        return new_revision
+
+    async def save_drafts(self, drafts: dict[int, Optional[dict]]) -> None:
+        """Записать черновики нескольких сценариев одним executemany"""
+        scenarios = ScenarioModel.__table__
+        await self._session.execute(
+            update(scenarios)
+            .where(scenarios.c.id == bindparam("scenario_id"))
+            .values(
+                draft=bindparam("scenario_draft", type_=scenarios.c.draft.type),
+                draft_revision=scenarios.c.draft_revision + 1,
+            ),
+            [
+                {"scenario_id": scenario_id, "scenario_draft": draft}
+                for scenario_id, draft in drafts.items()
+            ],
+        )
+        await self._session.commit()
+
     async def delete_scenario_by_id(self, scenario_id: int) -> None:
         await self._session.execute(
             delete(ScenarioModel)
@@ -89,14 +293,17 @@ class ScenarioRepository:
             .where(ScenarioModel.id == scenario_id)
             .values(enabled=status)
         )
+        await self._session.commit()
 
     async def get_scenario_for_bot(
             self,
             scenario_id: int,
             bot_id: int,
     ) -> ScenarioModel:
+        """Сценарий бота с триггерами: без них сценарий не запускается"""
         result = await self._session.execute(
             select(ScenarioModel)
+            .options(selectinload(ScenarioModel.triggers))
             .where(
                 ScenarioModel.id == scenario_id,
                 ScenarioModel.bot_id == bot_id,
@@ -144,3 +351,38 @@ class TriggerRepository:
             .where(TriggerModel.id == trigger_id)
         )
         await self._session.commit()
+
+    async def get_triggers_by_scenario_id(self, scenario_id: int) -> list[TriggerModel]:
+        triggers = await self._session.execute(
+            select(TriggerModel)
+            .where(TriggerModel.scenario_id == scenario_id)
+            .order_by(TriggerModel.id)
+        )
+        return triggers.scalars().all()
+
+    async def sync_triggers(self, scenario_id: int, changes: TriggerSyncSchema) -> None:
+        """Применить изменения триггеров — не больше одного запроса на вид изменения.
+
+        Транзакция не фиксируется: триггеры сохраняются вместе с данными сценария.
+        """
+        if changes.delete:
+            await self._session.execute(
+                delete(TriggerModel)
+                .where(TriggerModel.id.in_(changes.delete))
+            )
+        if changes.update:
+            await self._session.execute(
+                update(TriggerModel),
+                [
+                    {"id": trigger_id, **patch.model_dump(exclude_none=True)}
+                    for trigger_id, patch in changes.update.items()
+                ],
+            )
+        if changes.create:
+            await self._session.execute(
+                insert(TriggerModel)
+                .values([
+                    {"scenario_id": scenario_id, **trigger.model_dump()}
+                    for trigger in changes.create
+                ])
+            )
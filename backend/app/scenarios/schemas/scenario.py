@@ -1,7 +1,7 @@
 import datetime
-from typing import Optional
+from typing import Any, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from app.scenarios.schemas.trigger import TriggerReadSchema
 from app.users_data.schemas import UserFieldReadSchema
@@ -13,6 +13,7 @@ class ScenarioReadSchema(BaseModel):
     enabled: bool
     data: Optional[dict]
     draft: Optional[dict]
+    draft_revision: int
     bot: Optional["BotShortReadSchema"]
     triggers: list[TriggerReadSchema]
     fields: list[UserFieldReadSchema]
@@ -24,6 +25,26 @@ class ScenarioReadSchema(BaseModel):
     }
 
 
+class ScenarioSummarySchema(BaseModel):
+    id: int
+    name: str
+    enabled: bool
+    bot: Optional["BotShortReadSchema"]
+    triggers: list[TriggerReadSchema]
+    fields_count: int
+    values_count: int
+    updated_at: datetime.datetime
+
+    model_config = {
+        "from_attributes": True,
+    }
+
+
+class ScenarioPageSchema(BaseModel):
+    items: list[ScenarioSummarySchema]
+    next_cursor: Optional[int]
+
+
 class ScenarioCreateSchema(BaseModel):
     name: str = Field(..., max_length=245)
     data: dict
@@ -48,6 +69,40 @@ class ScenarioDraftSchema(ScenarioUpdateSchema):
     draft: Optional[None] = None
 
 
+
+# --- Draft patch schemas
+class JsonPatchOperationSchema(BaseModel):
+    """Операция JSON Patch (RFC 6902)"""
+
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    value: Any = None
+    from_: Optional[str] = Field(None, alias="from")
+
+    model_config = {
+        "populate_by_name": True,
+    }
+
+    @model_validator(mode="after")
+    def check_arguments(self) -> "JsonPatchOperationSchema":
+        if self.op in ("add", "replace", "test") and "value" not in self.model_fields_set:
+            raise ValueError(f"'{self.op}' operation requires 'value'")
+        if self.op in ("move", "copy") and self.from_ is None:
+            raise ValueError(f"'{self.op}' operation requires 'from'")
+        return self
+
+
+class ScenarioDraftPatchSchema(BaseModel):
+    revision: int
+    operations: list[JsonPatchOperationSchema] = Field(..., min_length=1)
+
+
+class ScenarioDraftRevisionSchema(BaseModel):
+    revision: int
+
+
 from app.bots.schemas import BotShortReadSchema
 
 ScenarioReadSchema.model_rebuild()
+ScenarioSummarySchema.model_rebuild()
+ScenarioPageSchema.model_rebuild()
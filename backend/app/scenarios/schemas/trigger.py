@@ -25,3 +25,9 @@ class TriggerPatchSchema(BaseModel):
     enabled: Optional[bool] = None
     data: Optional[dict] = None
 
+
+class TriggerSyncSchema(BaseModel):
+    """Изменения триггеров сценария при публикации черновика"""
+    create: list[TriggerCreateSchema] = []
+    update: dict[int, TriggerPatchSchema] = {}
+    delete: list[int] = []
@@ -1,29 +1,53 @@
+import asyncio
+import json
 from pathlib import Path
+from typing import Optional
 from slugify import slugify
 from uuid import uuid4
 
+from sqlalchemy import Row
+
+from app.core.settings import settings
 from app.core.dependencies.s3_deps import S3ClientDI
 from app.bots.dependencies.repositories_deps import BotRepositoryDI
 from app.scenarios.dependencies.repositories_deps import ScenarioRepositoryDI, TriggerRepositoryDI
+from app.scenarios.dependencies.buffer_deps import DraftBufferDI
+from app.telegram.dependencies.cache_deps import ScenarioCacheInvalidatorDI
 from app.scenarios.models import ScenarioModel, TriggerModel
+from app.scenarios.utils import content_hash
+from app.scenarios.draft_patch import apply_patch, is_sql_patch
 from app.scenarios.schemas.scenario import (
     ScenarioCreateSchema,
     ScenarioPatchSchema,
     ScenarioLinkSchema,
     ScenarioReadSchema, 
     ScenarioDraftSchema,
+    ScenarioSummarySchema,
+    ScenarioPageSchema,
+    ScenarioDraftPatchSchema,
+    ScenarioDraftRevisionSchema,
+)
+from app.scenarios.schemas.trigger import (
+    TriggerCreateSchema,
+    TriggerPatchSchema,
+    TriggerSyncSchema,
 )
 from app.scenarios.exceptions.services_exceptions import (
     ScenarioNotFoundError,
     NoPermissionForScenarioError,
     EmptyFileError,
     FileTooLargeError,
+    DraftRevisionConflictError,
+    InvalidDraftPatchError,
 )
 from app.bots.exceptions.services_exceptions import (
     BotNotFoundError,
     NoPermissionForBotError,
 )
 
+# Пауза, пока черновик сценария записывает другой обработчик
+DRAFT_CLAIM_WAIT = 0.1
+
 
 class ScenarioService:
     def __init__(
@@ -32,11 +56,15 @@ class ScenarioService:
             trigger_repository: TriggerRepositoryDI,
             bot_repository: BotRepositoryDI,
             client: S3ClientDI,
+            cache_invalidator: ScenarioCacheInvalidatorDI,
+            draft_buffer: DraftBufferDI,
     ):
         self._scenario_repo = scenario_repository
         self._trigger_repo = trigger_repository
         self._bot_repo = bot_repository
         self._client = client
+        self._cache_invalidator = cache_invalidator
+        self._draft_buffer = draft_buffer
 
     async def create_scenario(
             self,
@@ -52,15 +80,36 @@ class ScenarioService:
 
         return ScenarioReadSchema.model_validate(created_scenario)
 
-    async def get_scenarios(self, user_id: int) -> list[ScenarioReadSchema]:
-        scenarios = await self._scenario_repo.get_scenarios_by_user_id(user_id)
-        return [ScenarioReadSchema.model_validate(scenario) for scenario in scenarios]
+    async def get_scenarios(
+            self,
+            user_id: int,
+            cursor: Optional[int],
+            limit: int,
+    ) -> ScenarioPageSchema:
+        # Лишняя запись показывает, есть ли следующая страница
+        scenarios = await self._scenario_repo.get_scenario_summaries_by_user_id(
+            user_id=user_id,
+            after_id=cursor,
+            limit=limit + 1,
+        )
+        items = [ScenarioSummarySchema.model_validate(scenario) for scenario in scenarios[:limit]]
+        next_cursor = items[-1].id if len(scenarios) > limit else None
+        return ScenarioPageSchema(items=items, next_cursor=next_cursor)
 
     async def get_scenario(
             self,
             user_id: int,
             scenario_id: int,
     ) -> ScenarioReadSchema:
+        scenario = await self._get_scenario(user_id=user_id, scenario_id=scenario_id)
+        return await self._with_buffered_draft(scenario)
+
+    async def _get_scenario(
+            self,
+            user_id: int,
+            scenario_id: int,
+    ) -> ScenarioReadSchema:
+        """Сценарий в том виде, в каком он хранится в БД"""
         scenario = await self._scenario_repo.get_scenario_model_by_id(scenario_id)
         if scenario is None:
             raise ScenarioNotFoundError
@@ -68,6 +117,48 @@ class ScenarioService:
             raise NoPermissionForScenarioError
         return ScenarioReadSchema.model_validate(scenario)
 
+    async def check_owner(self, user_id: int, scenario_id: int) -> None:
+        """Проверка владельца сценария без загрузки самого сценария"""
+        owner_id = await self._scenario_repo.get_scenario_owner_id(scenario_id)
+        if owner_id is None:
+            raise ScenarioNotFoundError
+        if owner_id != user_id:
+            raise NoPermissionForScenarioError
+
+    async def _with_buffered_draft(self, scenario: ScenarioReadSchema) -> ScenarioReadSchema:
+        """Подстановка черновика, ещё не записанного из буфера в БД"""
+        if not settings.drafts.BUFFERED:
+            return scenario
+        payloads = await self._draft_buffer.get(scenario.id)
+        if not payloads:
+            return scenario
+        # Каждая запись черновика из буфера увеличит ревизию на единицу
+        return scenario.model_copy(update={
+            "draft": json.loads(payloads[-1]),
+            "draft_revision": scenario.draft_revision + len(payloads),
+        })
+
+    async def flush_draft(self, scenario_id: int) -> None:
+        """Записать в БД черновики сценария из буфера автосохранений.
+
+        Черновик, который уже записывает другой обработчик, не пишется
+        повторно: запись дожидается, пока он закончит.
+        """
+        if not settings.drafts.BUFFERED:
+            return
+        while await self._draft_buffer.get(scenario_id):
+            claimed = await self._draft_buffer.claim(scenario_id)
+            if not claimed:
+                await asyncio.sleep(DRAFT_CLAIM_WAIT)
+                continue
+            payload = claimed[scenario_id]
+            try:
+                await self._scenario_repo.save_drafts({scenario_id: json.loads(payload)})
+            except BaseException:
+                await self._draft_buffer.release(scenario_id, payload)
+                raise
+            await self._draft_buffer.complete(scenario_id, payload)
+
     async def get_scenario_by_webhook_token(
             self,
             webhook_token: str,
@@ -77,9 +168,19 @@ class ScenarioService:
             raise ScenarioNotFoundError
         return ScenarioReadSchema.model_validate(scenario)
 
+    async def get_runtime_by_webhook_token(self, webhook_token: str) -> Row:
+        """id, data, version_id, updated_at сценария и bot_id, encrypted_token его бота"""
+        runtime = await self._scenario_repo.get_runtime_by_webhook_token(webhook_token)
+        if runtime is None:
+            raise ScenarioNotFoundError
+        return runtime
+
     async def delete_scenario(self, user_id: int, scenario_id: int) -> None:
-        _ = await self.get_scenario(user_id=user_id, scenario_id=scenario_id)
+        await self.check_owner(user_id=user_id, scenario_id=scenario_id)
         await self._scenario_repo.delete_scenario_by_id(scenario_id)
+        if settings.drafts.BUFFERED:
+            await self._draft_buffer.delete(scenario_id)
+        await self._cache_invalidator.invalidate_scenario(scenario_id)
 
     async def patch_scenario(
             self,
@@ -87,14 +188,68 @@ class ScenarioService:
             scenario_id: int,
             patch_data: ScenarioPatchSchema,
     ) -> ScenarioReadSchema:
-        _ = await self.get_scenario(user_id=user_id, scenario_id=scenario_id)
+        scenario = await self._get_scenario(user_id=user_id, scenario_id=scenario_id)
 
         update_data = patch_data.dict(exclude_unset=True)
-        scenario = await self._scenario_repo.update_scenario_by_id(
+        if "draft" in update_data and settings.drafts.BUFFERED:
+            # Автосохранение редактора попадает в БД при следующей записи буфера
+            draft = update_data.pop("draft")
+            await self._draft_buffer.put(scenario_id, draft)
+            if not update_data:
+                return await self._with_buffered_draft(scenario)
+        elif "draft" in update_data:
+            # Патчи, отправленные к прежнему черновику, больше не применятся
+            update_data["draft_revision"] = ScenarioModel.draft_revision + 1
+
+        upd_scenario = await self._scenario_repo.update_scenario_by_id(
             scenario_id=scenario_id,
             scenario_data=update_data,
         )
-        return ScenarioReadSchema.model_validate(scenario)
+        return await self._with_buffered_draft(ScenarioReadSchema.model_validate(upd_scenario))
+
+    async def patch_draft(
+            self,
+            user_id: int,
+            scenario_id: int,
+            patch: ScenarioDraftPatchSchema,
+    ) -> ScenarioDraftRevisionSchema:
+        await self.check_owner(user_id=user_id, scenario_id=scenario_id)
+        # Патч применяется к последнему сохранённому черновику
+        await self.flush_draft(scenario_id)
+
+        operations = [
+            operation.model_dump(by_alias=True, exclude_unset=True)
+            for operation in patch.operations
+        ]
+        if is_sql_patch(operations):
+            revision = await self._scenario_repo.patch_draft(
+                scenario_id=scenario_id,
+                revision=patch.revision,
+                operations=operations,
+            )
+        else:
+            revision = await self._patch_draft_in_memory(scenario_id, patch.revision, operations)
+
+        if revision is None:
+            if await self._scenario_repo.get_draft_revision(scenario_id) != patch.revision:
+                raise DraftRevisionConflictError
+            raise InvalidDraftPatchError
+        return ScenarioDraftRevisionSchema(revision=revision)
+
+    async def _patch_draft_in_memory(
+            self,
+            scenario_id: int,
+            revision: int,
+            operations: list[dict],
+    ) -> Optional[int]:
+        """move, copy, test и операции над корнем применяются в Python"""
+        draft = await self._scenario_repo.get_draft_for_update(scenario_id, revision)
+        if draft is None:
+            return None
+        draft = apply_patch(draft, operations)
+        if not isinstance(draft, dict):
+            raise InvalidDraftPatchError
+        return await self._scenario_repo.replace_draft(scenario_id, revision, draft)
 
     async def link_scenario_to_bot(
             self,
@@ -102,7 +257,7 @@ class ScenarioService:
             scenario_id: int,
             link_data: ScenarioLinkSchema,
     ) -> ScenarioReadSchema:
-        _ = await self.get_scenario(user_id=user_id, scenario_id=scenario_id)
+        await self.check_owner(user_id=user_id, scenario_id=scenario_id)
 
         bot = await self._bot_repo.get_bot_model_by_id(bot_id=link_data.bot_id)
         if not bot:
@@ -115,45 +270,112 @@ class ScenarioService:
             scenario_id=scenario_id,
             scenario_data=update_data,
         )
-        return ScenarioReadSchema.model_validate(scenario)
+        await self._cache_invalidator.invalidate_scenario(scenario_id)
+        return await self._with_buffered_draft(ScenarioReadSchema.model_validate(scenario))
 
     async def apply_draft(
             self,
             user_id: int,
             scenario_id: int,
     ) -> ScenarioReadSchema:
-        scenario = await self.get_scenario(user_id=user_id, scenario_id=scenario_id)
+        await self.check_owner(user_id=user_id, scenario_id=scenario_id)
+        # Публикуется последний черновик, даже если он ещё в буфере
+        await self.flush_draft(scenario_id)
+        scenario = await self._get_scenario(user_id=user_id, scenario_id=scenario_id)
 
         draft_data = ScenarioDraftSchema(data=scenario.draft)
+        scenario_data = draft_data.data or {}
+
+        data = scenario_data.get("data", scenario.data)
+        version_hash = content_hash(data) if data is not None else None
+
+        # Повторная публикация того же тела ничего не меняет
+        if version_hash is not None and (
+            version_hash == await self._scenario_repo.get_active_version_hash(scenario_id)
+        ):
+            return scenario
+
+        # Триггеры, версия и данные сценария сохраняются одной транзакцией
+        triggers = self._get_start_triggers(data)
+        if triggers is not None:
+            stored_triggers = await self._trigger_repo.get_triggers_by_scenario_id(scenario_id)
+            await self._trigger_repo.sync_triggers(
+                scenario_id=scenario_id,
+                changes=self.diff_triggers(stored_triggers, triggers),
+            )
+
+        if version_hash is not None:
+            scenario_data = {
+                **scenario_data,
+                "version_id": await self._scenario_repo.add_version(
+                    scenario_id=scenario_id,
+                    content_hash=version_hash,
+                    data=data,
+                ),
+            }
 
         upd_scenario = await self._scenario_repo.update_scenario_by_id(
             scenario_id=scenario_id,
-            scenario_data=draft_data.data
+            scenario_data=scenario_data,
         )
 
-        if upd_scenario.data and "blocks" in upd_scenario.data:
-            blocks = upd_scenario.data["blocks"]
+        await self._cache_invalidator.invalidate_scenario(scenario_id)
+        return ScenarioReadSchema.model_validate(upd_scenario)
 
-            for block in blocks:
-                if block["type"] == "start" and "triggers" in block["data"]:
-                    start_block = block
+    @staticmethod
+    def _get_start_triggers(data: Optional[dict]) -> Optional[list[dict]]:
+        """Триггеры стартового блока; None, если блока с триггерами нет"""
+        if not data or "blocks" not in data:
+            return None
+        for block in data["blocks"]:
+            if block["type"] == "start" and "triggers" in block["data"]:
+                return block["data"]["triggers"]
+        return None
 
-                    for trigger in upd_scenario.triggers:
-                        await self._trigger_repo.delete_trigger_by_id(trigger.id)
+    @staticmethod
+    def diff_triggers(
+            stored_triggers: list[TriggerModel],
+            triggers: list[dict],
+    ) -> TriggerSyncSchema:
+        """Изменения, после которых у сценария останутся только включённые триггеры блока.
 
-                    for trigger in start_block["data"]["triggers"]:
-                        if trigger["enabled"] == True:
-                            trigger_model = TriggerModel(
-                                scenario_id=scenario_id,
-                                type=trigger["type"],
-                                data=trigger["data"],
-                                enabled=True
-                            )
-                            await self._trigger_repo.create_trigger(trigger_model)
+        Совпадающие триггеры не трогаются, изменённые обновляются на месте
+        с тем же типом, остальные удаляются или создаются.
+        """
+        wanted = [
+            TriggerCreateSchema(type=trigger["type"], data=trigger["data"], enabled=True)
+            for trigger in triggers
+            if trigger["enabled"] == True
+        ]
+        unmatched = list(stored_triggers)
 
-                    break
+        changed = []
+        for trigger in wanted:
+            same = next(
+                (
+                    stored for stored in unmatched
+                    if stored.type == trigger.type
+                    and stored.data == trigger.data
+                    and stored.enabled
+                ),
+                None,
+            )
+            if same is None:
+                changed.append(trigger)
+            else:
+                unmatched.remove(same)
 
-        return ScenarioReadSchema.model_validate(upd_scenario)
+        changes = TriggerSyncSchema()
+        for trigger in changed:
+            reused = next((stored for stored in unmatched if stored.type == trigger.type), None)
+            if reused is None:
+                changes.create.append(trigger)
+            else:
+                unmatched.remove(reused)
+                changes.update[reused.id] = TriggerPatchSchema(data=trigger.data, enabled=True)
+
+        changes.delete = [stored.id for stored in unmatched]
+        return changes
 
     async def upload_user_file(
             self,
@@ -0,0 +1,8 @@
+import hashlib
+import json
+
+
+def content_hash(data: dict) -> str:
+    """Хеш тела сценария, не зависящий от порядка ключей"""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
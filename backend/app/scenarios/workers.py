@@ -0,0 +1,69 @@
+import asyncio
+import json
+import logging
+
+from app.core.database import async_session_maker
+from app.core.metrics import metrics
+from app.core.settings import settings
+from app.scenarios.buffer import DraftBuffer, create_draft_buffer
+from app.scenarios.repositories import ScenarioRepository
+
+logger = logging.getLogger(__name__)
+
+
+class DraftFlusher:
+    """Периодическая запись черновиков из буфера автосохранений в БД.
+
+    Все свободные черновики берутся на запись и записываются одной
+    транзакцией. Взятый черновик не запишет другой обработчик, а при
+    ошибке записи он возвращается в буфер, поэтому ревизия черновика
+    растёт ровно один раз на каждую запись. При остановке буфер
+    записывается ещё раз, чтобы последние правки не ждали следующего
+    запуска.
+    """
+
+    def __init__(self, buffer: DraftBuffer):
+        self.buffer = buffer
+
+    async def run(self) -> None:
+        try:
+            while True:
+                await asyncio.sleep(settings.drafts.FLUSH_INTERVAL)
+                try:
+                    await self.flush()
+                except Exception:
+                    logger.exception("Failed to flush scenario drafts")
+        except asyncio.CancelledError:
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush scenario drafts on shutdown")
+            raise
+
+    async def flush(self) -> int:
+        """Записать все свободные черновики буфера; возвращает их число"""
+        payloads = await self.buffer.claim()
+        if not payloads:
+            return 0
+
+        try:
+            async with async_session_maker() as session:
+                await ScenarioRepository(session).save_drafts({
+                    scenario_id: json.loads(payload)
+                    for scenario_id, payload in payloads.items()
+                })
+        except BaseException:
+            metrics.inc("scenario_drafts_flush_errors_total")
+            for scenario_id, payload in payloads.items():
+                await self.buffer.release(scenario_id, payload)
+            raise
+
+        for scenario_id, payload in payloads.items():
+            await self.buffer.complete(scenario_id, payload)
+        metrics.inc("scenario_drafts_flushed_total", len(payloads))
+        return len(payloads)
+
+
+def start_draft_flusher(redis_client) -> asyncio.Task:
+    """Запуск записи буфера черновиков в текущем event loop"""
+    return asyncio.create_task(DraftFlusher(create_draft_buffer(redis_client)).run())
@@ -1,4 +1,3 @@
-import re
 from typing import Optional, Any
 
 from abc import ABC, abstractmethod
@@ -8,7 +7,7 @@ from aiogram.types import InlineKeyboardMarkup, Message
 from aiogram.exceptions import TelegramAPIError
 
 from app.telegram.context import ScenarioContext
-from app.telegram.utils import clean_telegram_html
+from app.telegram.blocks.template import MessageTemplate
 
 
 @dataclass
@@ -26,37 +25,24 @@ class BaseBlock(ABC):
         self.type = block_data.type
         self.data = block_data.data
 
-    def _clean_text(self, text: str) -> str:
-        """Очистка текста (может быть переопределена в дочерних классах)"""
-        return clean_telegram_html(text)
+    def _compile_template(self, text: str) -> MessageTemplate:
+        """Разбор текста блока (может быть переопределён в дочерних классах)"""
+        return MessageTemplate.compile(text)
 
-    def _replace_variables(self, text: str, context: ScenarioContext) -> str:
-        """Заменяет переменные в тексте на их значения из контекста"""
-
-        def replace_var(match):
-            var_name = match.group(1)
-            # Ищем значение переменной в сохраненных данных пользователя
-            for scenario_id, data in context.user_input.items():
-                if (
-                    isinstance(data, dict)
-                    and context.scenario_id == scenario_id
-                    and data.get(var_name, None)
-                ):
-                    return str(data[var_name].get("field_value", ""))
-            return match.group(0)  # Если переменная не найдена, оставляем как есть
-
-        return re.sub(r"{{(.*?)}}", replace_var, text)
+    def _render(self, template: MessageTemplate, context: ScenarioContext) -> str:
+        """Подстановка переменных текущего сценария пользователя"""
+        return template.render(context.user_input.get(context.scenario_id))
 
     async def _send_message(
         self,
         context: ScenarioContext,
-        text: str,
+        text: MessageTemplate,
         keyboard: InlineKeyboardMarkup = None,
     ) -> None:
         try:
             message = await context.bot.send_message(
                 chat_id=context.chat_id,
-                text=self._replace_variables(self._clean_text(text), context),
+                text=self._render(text, context),
                 reply_markup=keyboard,
             )
             if keyboard:
@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 from app.telegram.blocks.base import BaseBlock, BlockDTO
+from app.telegram.blocks.template import MessageTemplate
 
 
 @dataclass
@@ -14,7 +15,7 @@ class MenuButton:
 
 @dataclass
 class ContentData:
-    text: str
+    text: MessageTemplate
     buttons: list[MenuButton]
 
 
@@ -34,7 +35,7 @@ class ContentBlock(BaseBlock):
     def _prepare_content(self, dto: BlockDTO) -> ContentData:
         """Общая подготовка контента для всех блоков"""
         return ContentData(
-            text=self._clean_text(dto.data.get("text", self.DEFAULT_TEXT)),
+            text=self._compile_template(dto.data.get("text", self.DEFAULT_TEXT)),
             buttons=self._prepare_buttons(dto.data.get("buttons", [])),
         )
 
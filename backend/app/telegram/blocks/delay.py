@@ -1,4 +1,3 @@
-import asyncio
 from typing import Optional
 
 from app.telegram.blocks.base import BaseBlock
@@ -27,9 +26,12 @@ class DelayBlock(BaseBlock):
                 return None
 
             total_seconds = duration * multiplier
-            await asyncio.sleep(total_seconds)
+            if total_seconds == 0:
+                return BlockConnectionPoint.NEXT.value
 
-            return BlockConnectionPoint.NEXT.value
+            # Сценарий продолжится с блока после задержки по таймеру
+            context.suspend(total_seconds)
+            return None
 
         except (ValueError, TypeError) as e:
             return None
@@ -5,6 +5,7 @@ from typing import Any, Optional
 from dataclasses import dataclass
 
 from app.telegram.blocks.content import ContentBlock
+from app.telegram.blocks.template import MessageTemplate
 from app.telegram.context import ScenarioContext
 from app.enums import FieldType, BlockConnectionPoint
 
@@ -14,7 +15,7 @@ class InputData:
     field_name: str
     field_type: str
     variable_name: str
-    validation_failed_text: str
+    validation_failed_text: MessageTemplate
 
 
 class InputDataBlock(ContentBlock):
@@ -27,29 +28,30 @@ class InputDataBlock(ContentBlock):
             field_name=block_data.data["field_name"],
             field_type=block_data.data["field_type"],
             variable_name=block_data.data["variable_name"],
-            validation_failed_text=block_data.data["validation_failed_text"],
+            validation_failed_text=self._compile_template(
+                block_data.data["validation_failed_text"]
+            ),
         )
 
     async def execute(self, context: ScenarioContext) -> Optional[str]:
         """Выполняет блок ввода данных"""
-        message = context.update.message
-        callback = context.update.callback_query
+        update = context.update
         self.get_state(context)
 
         # Если данные уже введены — переходим дальше
         if self.is_already_filled(context):
             return BlockConnectionPoint.COMPLETED.value
 
-        if self.is_waiting(context) and callback:
+        if self.is_waiting(context) and update.is_callback:
             # Отмена ввода данных (нажата кнопка в блоке)
             self.reset_waiting_flag(context)
             return None
 
-        if self.is_waiting(context) and message:
+        if self.is_waiting(context) and update.is_message:
             # Если данных нет — обрабатываем ввод
             is_valid = await self.handle_input(
                 context,
-                message.text,
+                update.text,
             )
             return BlockConnectionPoint.COMPLETED.value if is_valid else None
 
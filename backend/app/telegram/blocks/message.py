@@ -1,14 +1,16 @@
-from typing import Optional, Type, Callable, Any
+from typing import Optional, Type, Callable, Any, Awaitable
 from dataclasses import dataclass
 import aiohttp
 
 from aiogram.types import BufferedInputFile
 from aiogram.types import InputMediaPhoto, InputMediaVideo, InputMediaDocument, Message
 from aiogram.methods import SendPhoto, SendVideo, SendDocument
-from aiogram.exceptions import TelegramAPIError
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest
 
+from app.core.metrics import metrics
 from app.enums import AttachmentType, BlockConnectionPoint
-from app.telegram.blocks.base import BaseBlock
+from app.telegram.blocks.base import BaseBlock, BlockDTO
+from app.telegram.blocks.template import MessageTemplate
 from app.telegram.context import ScenarioContext
 
 
@@ -36,22 +38,40 @@ class MessageBlock(BaseBlock):
         InputMediaDocument: SendDocument,
     }
 
+    # Ошибки Bot API, означающие, что сохранённый file_id больше не действителен
+    FILE_ID_ERRORS = (
+        "wrong file identifier",
+        "wrong remote file identifier",
+        "file reference expired",
+        "file_reference_expired",
+    )
+
+    # Поле метода отправки, оно же тип медиа в кэше file_id
+    MEDIA_FIELD_MAPPING: dict[Type, str] = {
+        InputMediaPhoto: "photo",
+        InputMediaVideo: "video",
+        InputMediaDocument: "document",
+    }
+
+    def __init__(self, block_data: BlockDTO):
+        super().__init__(block_data)
+        self.message_data = self._prepare_message_data()
+
     async def execute(self, context: ScenarioContext) -> Optional[str]:
         return BlockConnectionPoint.NEXT.value
     
     async def on_entry(self, context: ScenarioContext) -> None:
         try:
-            message_data = self._prepare_message_data()
-            await self._send_text_message(context, message_data)
+            await self._send_text_message(context, self.message_data)
             return None
         except TelegramAPIError as e:
             await self._handle_error(context, e)
             return None
 
     def _prepare_message_data(self) -> dict[str, Any]:
-        """Подготовка данных сообщения"""
+        """Подготовка данных сообщения при компиляции сценария"""
         return {
-            "text": self._clean_text(self.data.get("text", "Сообщение")),
+            "text": self._compile_template(self.data.get("text", "Сообщение")),
             "type": self.data.get("type", ""),
             "attachments": [
                 Attachment(url=att["url"], type=att["content_type"], filename=att["filename"])
@@ -63,50 +83,147 @@ class MessageBlock(BaseBlock):
         self, context: ScenarioContext, message_data: dict[str, Any]
     ) -> None:
         """Отправка сообщения в зависимости от типа"""
+        template: MessageTemplate = message_data["text"]
         if not message_data["attachments"]:
-            await self._send_message(context, message_data["text"])
+            await self._send_message(context, template)
             return
         elif message_data["type"] == AttachmentType.MEDIA.value:
             await self._handle_media_attachments(
-                context, message_data["text"], message_data["attachments"]
+                context, self._render(template, context), message_data["attachments"]
             )
         elif message_data["type"] == AttachmentType.DOCUMENT.value:
             await self._handle_document_attachments(
-                context, message_data["text"], message_data["attachments"]
+                context, self._render(template, context), message_data["attachments"]
             )
 
     async def _handle_media_attachments(
         self, context: ScenarioContext, text: str, attachments: list[Attachment]
-    ) -> Message:
+    ) -> list[Message]:
         """Обработка медиавложений (фото/видео)"""
+        media_classes = [self._get_media_type(att) for att in attachments]
+
         if len(attachments) > 1:
-            media_group = await self._create_media_group(text, attachments)
-            return await context.bot.send_media_group(
-                chat_id=context.chat_id, media=media_group
-            )
-        return await self._send_single_media(context, text, attachments[0])
+            async def send(media: list) -> list[Message]:
+                # Описание только у первого элемента медиагруппы
+                return await context.bot.send_media_group(
+                    chat_id=context.chat_id,
+                    media=[
+                        media_class(media=item, caption=text if i == 0 else None)
+                        for i, (media_class, item) in enumerate(zip(media_classes, media))
+                    ],
+                )
+        else:
+            send_method = self.SEND_METHOD_MAPPING[media_classes[0]]
+
+            async def send(media: list) -> list[Message]:
+                message = await context.bot(
+                    send_method(
+                        chat_id=context.chat_id,
+                        **{self.MEDIA_FIELD_MAPPING[media_classes[0]]: media[0]},
+                        caption=text
+                    )
+                )
+                return [message]
+
+        return await self._send_cached_media(context, attachments, media_classes, send)
 
     async def _handle_document_attachments(
         self, context: ScenarioContext, text: str, attachments: list[Attachment]
-    ) -> Message:
+    ) -> list[Message]:
         """Обработка вложений документов"""
+        media_classes = [InputMediaDocument] * len(attachments)
+
         if len(attachments) > 1:
-            media_group = [
-                InputMediaDocument(media=await self._download_media_from_url(att.url, att.filename), caption=text) for att in attachments
-            ]
-            return await context.bot.send_media_group(
-                chat_id=context.chat_id, media=media_group
+            async def send(media: list) -> list[Message]:
+                return await context.bot.send_media_group(
+                    chat_id=context.chat_id,
+                    media=[InputMediaDocument(media=item, caption=text) for item in media],
+                )
+
+            return await self._send_cached_media(context, attachments, media_classes, send)
+
+        async def send(media: list) -> list[Message]:
+            message = await context.bot.send_document(
+                chat_id=context.chat_id, document=media[0], caption=text
             )
-        return await context.bot.send_document(
-            chat_id=context.chat_id, document=attachments[0].url, caption=text
+            return [message]
+
+        # Одиночный документ Telegram скачивает по ссылке сам
+        return await self._send_cached_media(
+            context, attachments, media_classes, send, upload=self._attachment_url
         )
 
-    async def _create_media_group(self, text: str, attachments: list[Attachment]) -> list:
-        """Создание медиагруппы с описанием для первого элемента"""
-        return [
-            self._get_media_type(att)(media=await self._download_media_from_url(att.url, att.filename), caption=text if i == 0 else None)
-            for i, att in enumerate(attachments)
-        ]
+    async def _send_cached_media(
+        self,
+        context: ScenarioContext,
+        attachments: list[Attachment],
+        media_classes: list[Type],
+        send: Callable[[list], Awaitable[list[Message]]],
+        upload: Optional[Callable[[Attachment], Awaitable[Any]]] = None,
+    ) -> list[Message]:
+        """Отправка вложений по сохранённым file_id, остальные загружаются.
+
+        Если Telegram отклонил сохранённый file_id, он удаляется из кэша,
+        а вложения загружаются заново.
+        """
+        upload = upload or self._download_attachment
+        cache = context.file_ids
+        fields = []
+        if cache is not None and context.bot_id is not None:
+            fields = [
+                cache.field(att.url, self.MEDIA_FIELD_MAPPING[media_class])
+                for att, media_class in zip(attachments, media_classes)
+            ]
+        cached = await cache.get_many(context.bot_id, fields) if fields else []
+        cached = cached or [None] * len(attachments)
+
+        hits = sum(1 for file_id in cached if file_id)
+        metrics.inc("telegram_file_id_cache_hits_total", hits)
+        metrics.inc("telegram_file_id_cache_misses_total", len(attachments) - hits)
+
+        media = [file_id or await upload(att) for file_id, att in zip(cached, attachments)]
+        try:
+            messages = await send(media)
+        except TelegramBadRequest as e:
+            stale = [field for field, file_id in zip(fields, cached) if file_id]
+            # Ошибки подписи, разметки или чата не связаны с file_id: кэш не трогаем
+            if not stale or not self._is_file_id_error(e):
+                raise
+            metrics.inc("telegram_file_id_cache_stale_total", len(stale))
+            await cache.delete(context.bot_id, stale)
+
+            media = [
+                await upload(att) if file_id else item
+                for file_id, att, item in zip(cached, attachments, media)
+            ]
+            cached = [None] * len(attachments)
+            messages = await send(media)
+
+        if fields:
+            await cache.set_many(
+                context.bot_id,
+                {
+                    field: file_id
+                    for field, cached_id, message in zip(fields, cached, messages)
+                    if not cached_id and (file_id := self._extract_file_id(message))
+                },
+            )
+        return messages
+
+    @classmethod
+    def _is_file_id_error(cls, error: TelegramBadRequest) -> bool:
+        error_message = str(error).lower()
+        return any(msg in error_message for msg in cls.FILE_ID_ERRORS)
+
+    @staticmethod
+    def _extract_file_id(message: Message) -> Optional[str]:
+        """file_id файла, загруженного вместе с сообщением"""
+        if message.photo:
+            return message.photo[-1].file_id
+        for media in (message.video, message.animation, message.document, message.audio):
+            if media:
+                return media.file_id
+        return None
 
     def _get_media_type(self, attachment: Attachment) -> Type:
         """Определение типа медиа по MIME-типу"""
@@ -115,6 +232,13 @@ class MessageBlock(BaseBlock):
                 return media_class
         return InputMediaDocument
 
+    async def _download_attachment(self, attachment: Attachment) -> BufferedInputFile:
+        return await self._download_media_from_url(attachment.url, attachment.filename)
+
+    @staticmethod
+    async def _attachment_url(attachment: Attachment) -> str:
+        return attachment.url
+
     @staticmethod
     async def _download_media_from_url(media_url, filename):
         async with aiohttp.ClientSession() as session:
@@ -124,21 +248,3 @@ class MessageBlock(BaseBlock):
                 media_bytes = await resp.read()
                 media = BufferedInputFile(media_bytes, filename=filename)
                 return media
-
-
-    async def _send_single_media(
-        self, context: ScenarioContext, text: str, attachment: Attachment
-    ) -> Message:
-        """Отправка одиночного медиафайла"""
-        media_class = self._get_media_type(attachment)
-        send_method = self.SEND_METHOD_MAPPING[media_class]
-
-        media = await self._download_media_from_url(attachment.url, attachment.filename)
-
-        return await context.bot(
-            send_method(
-                chat_id=context.chat_id,
-                **{send_method.__name__.lower().split("send")[-1]: media},
-                caption=text
-            )
-        )
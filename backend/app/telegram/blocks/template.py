@@ -0,0 +1,52 @@
+import re
+from typing import Any, Optional
+from dataclasses import dataclass
+
+from app.telegram.utils import clean_telegram_html
+
+VARIABLE_PATTERN = re.compile(r"{{(.*?)}}")
+
+
+@dataclass(frozen=True)
+class MessageTemplate:
+    """Текст блока, разобранный при компиляции сценария.
+
+    Статические части уже очищены от неразрешённых тегов, между ними
+    стоят переменные, поэтому отрисовка сводится к склейке строк.
+    """
+
+    segments: tuple[str, ...]
+    # Имя переменной и исходный плейсхолдер, который остаётся, если значения нет
+    variables: tuple[tuple[str, str], ...] = ()
+
+    @classmethod
+    def compile(cls, text: str) -> "MessageTemplate":
+        cleaned = clean_telegram_html(text)
+
+        segments, variables = [], []
+        position = 0
+        for match in VARIABLE_PATTERN.finditer(cleaned):
+            segments.append(cleaned[position:match.start()])
+            variables.append((match.group(1), match.group(0)))
+            position = match.end()
+        segments.append(cleaned[position:])
+
+        return cls(segments=tuple(segments), variables=tuple(variables))
+
+    def render(self, values: Optional[dict[str, Any]]) -> str:
+        """Подстановка значений переменных сценария"""
+        if not self.variables:
+            return self.segments[0]
+
+        if not isinstance(values, dict):
+            values = {}
+
+        parts = [self.segments[0]]
+        for (name, placeholder), segment in zip(self.variables, self.segments[1:]):
+            value = values.get(name)
+            if value and isinstance(value, dict):
+                parts.append(str(value.get("field_value", "")))
+            else:
+                parts.append(placeholder)
+            parts.append(segment)
+        return "".join(parts)
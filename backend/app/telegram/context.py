@@ -1,52 +1,64 @@
 from dataclasses import dataclass, field
 from aiogram import Bot
-from aiogram.types import Update
-from typing import Optional, Any
+from typing import Optional, Any, TYPE_CHECKING
+
+from app.telegram.schemas.update import IncomingUpdate
+
+if TYPE_CHECKING:
+    from app.telegram.services.compiler import CompiledScenario
+    from app.telegram.storage.file_id_cache import FileIdCache
 
 
 @dataclass
 class ScenarioContext:
     """Контекст выполнения сценария с явными данными."""
     
-    update: Update
+    update: IncomingUpdate
     bot: Bot
     user_id: str
     chat_id: str
     scenario_id: str
-    scenario_data: dict[str, Any]
+    scenario: "CompiledScenario"
     username: Optional[str] = None
     current_block_id: Optional[str] = None
     user_input: dict[str, Any] = field(default_factory=dict)
     user_history: set[str] = field(default_factory=set)
     entry_point: Optional[str] = None
     db_data_loaded: dict[str, Any] = field(default_factory=dict)
+    timer_id: Optional[str] = None
+    delay_seconds: Optional[int] = None
+    bot_id: Optional[int] = None
+    file_ids: Optional["FileIdCache"] = None
+
+    def suspend(self, delay_seconds: int) -> None:
+        """Приостановить сценарий на текущем блоке до срабатывания таймера"""
+        self.delay_seconds = delay_seconds
+
+    @property
+    def is_suspended(self) -> bool:
+        return self.delay_seconds is not None
 
     @classmethod
     async def create(
         cls,
-        update: Update,
+        update: IncomingUpdate,
         bot: Bot,
-        scenario_id: int,
-        scenario_data: dict[str, Any],
+        scenario: "CompiledScenario",
+        bot_id: Optional[int] = None,
+        file_ids: Optional["FileIdCache"] = None,
     ) -> "ScenarioContext":
-        """Создает контекст с проверкой типа Update."""
-        if message_update := update.message:
-            user_id = message_update.from_user.id
-            username = message_update.from_user.username
-            chat_id = message_update.chat.id
-        elif callback_update := update.callback_query:
-            user_id = callback_update.from_user.id
-            username = callback_update.from_user.username
-            chat_id = callback_update.message.chat.id
-        else:
+        """Создает контекст входящего апдейта."""
+        if update.kind is None:
             raise ValueError("Unsupported Update type. Must be Message or CallbackQuery.")
-        
+
         return cls(
             update=update,
             bot=bot,
-            user_id=str(user_id),
-            username=username,
-            chat_id=str(chat_id),
-            scenario_id=str(scenario_id),
-            scenario_data=scenario_data,
+            user_id=str(update.user_id),
+            username=update.username,
+            chat_id=str(update.chat_id),
+            scenario_id=str(scenario.scenario_id),
+            scenario=scenario,
+            bot_id=bot_id,
+            file_ids=file_ids,
         )
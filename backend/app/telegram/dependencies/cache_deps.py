@@ -0,0 +1,16 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from app.telegram.services.scenario_cache import (
+    ScenarioCache,
+    ScenarioCacheInvalidator,
+    get_scenario_cache,
+    get_scenario_cache_invalidator,
+)
+
+ScenarioCacheDI = Annotated[ScenarioCache, Depends(get_scenario_cache)]
+ScenarioCacheInvalidatorDI = Annotated[
+    ScenarioCacheInvalidator,
+    Depends(get_scenario_cache_invalidator),
+]
@@ -3,5 +3,7 @@ from typing import Annotated
 from fastapi import Depends
 
 from app.telegram.services.bot_manager import get_tg_bot_manager, TelegramBotManager
+from app.telegram.services.bot_pool import get_bot_pool, BotPool
 
 TgBotManagerDI = Annotated[TelegramBotManager, Depends(get_tg_bot_manager)]
+BotPoolDI = Annotated[BotPool, Depends(get_bot_pool)]
@@ -0,0 +1,7 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from app.telegram.services.update_processor import UpdateProcessor
+
+UpdateProcessorDI = Annotated[UpdateProcessor, Depends(UpdateProcessor)]
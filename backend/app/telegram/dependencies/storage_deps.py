@@ -6,5 +6,25 @@ from app.telegram.storage.state_storage import (
     BaseStateStorage,
     get_state_storage,
 )
+from app.telegram.storage.update_queue import (
+    UpdateQueue,
+    get_update_queue,
+)
+from app.telegram.storage.update_dedup import (
+    UpdateDeduplicator,
+    get_update_deduplicator,
+)
+from app.telegram.storage.file_id_cache import (
+    FileIdCache,
+    get_file_id_cache,
+)
+from app.telegram.storage.timer_storage import (
+    DelayTimerStorage,
+    get_delay_timer_storage,
+)
 
 StateStorageDI = Annotated[BaseStateStorage, Depends(get_state_storage)]
+UpdateQueueDI = Annotated[UpdateQueue, Depends(get_update_queue)]
+UpdateDeduplicatorDI = Annotated[UpdateDeduplicator, Depends(get_update_deduplicator)]
+DelayTimerStorageDI = Annotated[DelayTimerStorage, Depends(get_delay_timer_storage)]
+FileIdCacheDI = Annotated[FileIdCache, Depends(get_file_id_cache)]
@@ -15,3 +15,11 @@ class FailedToDeleteWebhookHTTPException(HTTPException):
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail="Failed to delete webhook with Telegram",
         )
+
+
+class InvalidUpdateHTTPException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body is not a Telegram update",
+        )
@@ -0,0 +1,140 @@
+from collections import deque
+from typing import Iterable, Iterator
+
+
+def normalize(text: str, casefold: bool) -> str:
+    """Приведение регистра для сравнения"""
+    return text.casefold() if casefold else text.lower()
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    return (start == 0 or not _is_word_char(text[start - 1])) and (
+        end == len(text) or not _is_word_char(text[end])
+    )
+
+
+class KeywordMatcher:
+    """Поиск ключевых слов в тексте автоматом Ахо–Корасик.
+
+    Автомат строится один раз, после чего все вхождения всех ключевых
+    слов находятся за один проход по тексту, независимо от их количества.
+    Для небольшого набора слов поиск подстроки по каждому слову быстрее
+    прохода автомата на Python, поэтому там используется он.
+    """
+
+    # Порог выбран по benchmarks/bench_keyword_matcher.py
+    AUTOMATON_THRESHOLD = 200
+
+    def __init__(
+        self,
+        keywords: Iterable[str],
+        whole_word: bool = False,
+        casefold: bool = False,
+    ):
+        self.whole_word = whole_word
+        self.casefold = casefold
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # Длины ключевых слов, заканчивающихся в состоянии (с учётом суффиксных ссылок)
+        self._out: list[tuple[int, ...]] = [()]
+        self._alphabet: frozenset[str] = frozenset()
+
+        self.keywords = tuple(dict.fromkeys(normalize(kw, casefold) for kw in keywords))
+        self.match_all = "" in self.keywords
+        self.use_automaton = len(self.keywords) > self.AUTOMATON_THRESHOLD
+
+        if self.use_automaton:
+            for keyword in self.keywords:
+                self._add(keyword)
+            self._build_links()
+            self._alphabet = frozenset(char for keyword in self.keywords for char in keyword)
+
+    def _add(self, keyword: str) -> None:
+        if not keyword:
+            return
+
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+        if len(keyword) not in self._out[state]:
+            self._out[state] += (len(keyword),)
+
+    def _build_links(self) -> None:
+        """Суффиксные ссылки обходом в ширину"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._out[next_state] += self._out[self._fail[next_state]]
+
+    def _scan(self, text: str) -> Iterator[tuple[int, int]]:
+        """Все вхождения в виде (начало, конец) в нормализованном тексте"""
+        goto, fail, out, alphabet = self._goto, self._fail, self._out, self._alphabet
+        state = 0
+        for index, char in enumerate(text):
+            if char not in alphabet:
+                state = 0
+                continue
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length in out[state]:
+                yield index + 1 - length, index + 1
+
+    def _contains(self, text: str) -> bool:
+        """Есть ли хоть одно вхождение, без учёта границ слов"""
+        goto, fail, out, alphabet = self._goto, self._fail, self._out, self._alphabet
+        state = 0
+        for char in text:
+            if char not in alphabet:
+                state = 0
+                continue
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                return True
+        return False
+
+    def _find_whole_word(self, text: str) -> bool:
+        """Поиск слов целиком без автомата"""
+        for keyword in self.keywords:
+            start = text.find(keyword)
+            while start != -1:
+                if _is_whole_word(text, start, start + len(keyword)):
+                    return True
+                start = text.find(keyword, start + 1)
+        return False
+
+    def search(self, text: str) -> bool:
+        """Есть ли в тексте хотя бы одно ключевое слово"""
+        # Пустое ключевое слово, как и раньше, совпадает с любым текстом
+        if self.match_all:
+            return True
+
+        text = normalize(text, self.casefold)
+        if not self.use_automaton:
+            if self.whole_word:
+                return self._find_whole_word(text)
+            return any(keyword in text for keyword in self.keywords)
+
+        if not self.whole_word:
+            return self._contains(text)
+        return any(_is_whole_word(text, start, end) for start, end in self._scan(text))
@@ -1,8 +1,6 @@
 from typing import Optional
 from dataclasses import dataclass
 from app.telegram.context import ScenarioContext
-from app.telegram.handlers.start.triggers import check_active_triggers
-from app.enums import BlockType
 
 
 @dataclass
@@ -19,9 +17,7 @@ class StartHandler:
 
     def __init__(self, context: ScenarioContext):
         self.context = context
-        self.message_text = (
-            context.update.message.text if context.update.message else None
-        )
+        self.message_text = context.update.text if context.update.is_message else None
 
     async def handle(self) -> bool:
         """Обработка стартового блока"""
@@ -38,16 +34,15 @@ class StartHandler:
 
     def _find_start_block(self) -> Optional[StartBlock]:
         """Поиск стартового блока"""
-        for block in self.context.scenario_data["blocks"]:
-            if block["type"] == BlockType.START.value:
-                return StartBlock(
-                    id=block["id"], type=block["type"], data=block["data"]
-                )
-        return None
+        block = self.context.scenario.start_block
+        if block is None:
+            return None
+        return StartBlock(id=block["id"], type=block["type"], data=block["data"])
 
     async def _check_triggers(self, start_block: StartBlock) -> bool:
         """Проверка триггеров"""
-        return await check_active_triggers(start_block.__dict__, self.message_text)
+        triggers = self.context.scenario.triggers
+        return triggers is not None and await triggers.check_triggers(self.message_text)
 
     async def _update_context(self, start_block: StartBlock) -> None:
         """Обновление контекста"""
@@ -1,6 +1,7 @@
 from typing import Optional
 from dataclasses import dataclass
 from app.enums import TriggerType
+from app.telegram.handlers.start.keyword_matcher import KeywordMatcher
 
 
 @dataclass
@@ -20,43 +21,49 @@ class StartBlock:
 
 
 class TriggerHandler:
-    """Обработчик триггеров"""
+    """Обработчик триггеров.
+
+    Создаётся один раз при компиляции сценария: ключевые слова активных
+    триггеров собираются в автоматы поиска по их настройкам сравнения.
+    """
     def __init__(self, start_block: dict):
         self.start_block = StartBlock(
             id=start_block["id"], type=start_block["type"], data=start_block["data"]
         )
         self.active_triggers = [
             Trigger(type=t["type"], enabled=t["enabled"], data=t.get("data", {}))
-            for t in start_block["data"]["triggers"]
+            for t in start_block["data"].get("triggers", [])
             if t["enabled"]
         ]
+        self.has_start_trigger = any(
+            trigger.type == TriggerType.START.value for trigger in self.active_triggers
+        )
+        self.keyword_matchers = self._build_keyword_matchers()
+
+    def _build_keyword_matchers(self) -> list[KeywordMatcher]:
+        """Один автомат на каждое сочетание настроек whole_word и casefold"""
+        keywords: dict[tuple[bool, bool], list[str]] = {}
+        for trigger in self.active_triggers:
+            if trigger.type != TriggerType.KEY_WORD.value:
+                continue
+            options = (
+                bool(trigger.data.get("whole_word", False)),
+                bool(trigger.data.get("casefold", False)),
+            )
+            keywords.setdefault(options, []).extend(trigger.data.get("key_words", []))
+
+        return [
+            KeywordMatcher(words, whole_word=whole_word, casefold=casefold)
+            for (whole_word, casefold), words in keywords.items()
+            if words
+        ]
 
     async def check_triggers(self, message_text: Optional[str]) -> bool:
         """Проверка выполнения хотя бы одного активного триггера"""
         if not message_text:
             return False
 
-        message_text = message_text.lower()
-
-        for trigger in self.active_triggers:
-            if await self._check_trigger(trigger, message_text):
-                return True
-
-        return False
-
-    async def _check_trigger(self, trigger: Trigger, message_text: str) -> bool:
-        """Проверка конкретного триггера"""
-        if trigger.type == TriggerType.START.value:
-            return message_text == "/start"
-
-        if trigger.type == TriggerType.KEY_WORD.value:
-            keywords = trigger.data.get("key_words", [])
-            return any(kw.lower() in message_text for kw in keywords)
-
-        return False
-
+        if self.has_start_trigger and message_text.lower() == "/start":
+            return True
 
-async def check_active_triggers(start_block: dict, message_text: Optional[str]) -> bool:
-    """Публичный интерфейс для проверки триггеров"""
-    handler = TriggerHandler(start_block)
-    return await handler.check_triggers(message_text)
+        return any(matcher.search(message_text) for matcher in self.keyword_matchers)
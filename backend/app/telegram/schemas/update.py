@@ -0,0 +1,87 @@
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Optional
+
+import orjson
+from aiogram.types import Update
+
+from app.enums import UpdateKind
+
+
+@dataclass(frozen=True)
+class IncomingUpdate:
+    """Входящий апдейт: только поля, которые использует обработка сценария.
+
+    Из тела запроса достаются нужные значения без построения дерева
+    моделей aiogram. Полная модель Update собирается по требованию.
+    """
+
+    update_id: int
+    user_id: int
+    chat_id: int
+    kind: Optional[UpdateKind] = None
+    username: Optional[str] = None
+    text: Optional[str] = None
+    callback_id: Optional[str] = None
+    callback_data: Optional[str] = None
+    raw: dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    @property
+    def is_message(self) -> bool:
+        return self.kind == UpdateKind.MESSAGE
+
+    @property
+    def is_callback(self) -> bool:
+        return self.kind == UpdateKind.CALLBACK_QUERY
+
+    @cached_property
+    def update(self) -> Update:
+        """Полная модель апдейта aiogram"""
+        return Update.model_validate(self.raw)
+
+    @classmethod
+    def parse(cls, body: bytes | str) -> Optional["IncomingUpdate"]:
+        """Разбор тела вебхука; None для апдейтов, которые сценарии не обрабатывают.
+
+        ValueError, если тело не является апдейтом Telegram.
+        """
+        raw = orjson.loads(body)
+        if not isinstance(raw, dict) or not isinstance(raw.get("update_id"), int):
+            raise ValueError("Not a Telegram update")
+        return cls.from_raw(raw)
+
+    @classmethod
+    def from_raw(cls, raw: dict[str, Any]) -> Optional["IncomingUpdate"]:
+        if message := raw.get("message"):
+            sender = message.get("from")
+            chat = message.get("chat")
+            if not sender or not chat:
+                return None
+            return cls(
+                update_id=raw["update_id"],
+                kind=UpdateKind.MESSAGE,
+                user_id=sender["id"],
+                chat_id=chat["id"],
+                username=sender.get("username"),
+                text=message.get("text"),
+                raw=raw,
+            )
+
+        if callback := raw.get("callback_query"):
+            sender = callback.get("from")
+            # Нажатия в inline-сообщениях приходят без сообщения и чата
+            chat = (callback.get("message") or {}).get("chat")
+            if not sender or not chat:
+                return None
+            return cls(
+                update_id=raw["update_id"],
+                kind=UpdateKind.CALLBACK_QUERY,
+                user_id=sender["id"],
+                chat_id=chat["id"],
+                username=sender.get("username"),
+                callback_id=callback["id"],
+                callback_data=callback.get("data"),
+                raw=raw,
+            )
+
+        return None
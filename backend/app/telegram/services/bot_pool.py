@@ -0,0 +1,128 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from aiogram import Bot
+from aiogram.client.bot import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.enums import ParseMode
+
+from app.core.metrics import metrics
+from app.core.settings import settings
+
+
+def create_telegram_session() -> AiohttpSession:
+    """HTTP-сессия к Bot API с переиспользованием соединений"""
+    session = AiohttpSession(limit=settings.telegram.CONNECTION_LIMIT)
+    session._connector_init.update(
+        limit_per_host=settings.telegram.LIMIT_PER_HOST,
+        keepalive_timeout=settings.telegram.KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=settings.telegram.DNS_CACHE_TTL,
+    )
+    return session
+
+
+@dataclass
+class PooledBot:
+    bot: Bot
+    encrypted_token: str
+    last_used: float
+
+
+class BotPool:
+    """Долгоживущие экземпляры Bot по id бота.
+
+    Все боты работают через одну HTTP-сессию, поэтому соединения к Bot API
+    не устанавливаются заново на каждый апдейт. Неиспользуемые боты
+    вытесняются при очередном обращении к пулу.
+    """
+
+    def __init__(self, idle_ttl: int, sweep_interval: int):
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self._session: Optional[AiohttpSession] = None
+        self._request_middlewares: list[BaseRequestMiddleware] = []
+        self._bots: dict[int, PooledBot] = {}
+        self._last_sweep = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._bots)
+
+    @property
+    def session(self) -> AiohttpSession:
+        if self._session is None:
+            self._session = create_telegram_session()
+            for middleware in self._request_middlewares:
+                self._session.middleware(middleware)
+        return self._session
+
+    def add_request_middleware(self, middleware: BaseRequestMiddleware) -> None:
+        """Middleware для всех запросов ботов пула"""
+        self._request_middlewares.append(middleware)
+        if self._session is not None:
+            self._session.middleware(middleware)
+
+    def get_bot(
+        self,
+        bot_id: int,
+        encrypted_token: str,
+        decrypt: Callable[[str], str],
+    ) -> Bot:
+        """Бот из пула; токен расшифровывается только при создании бота"""
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        pooled = self._bots.get(bot_id)
+        # Смена токена бота равносильна промаху
+        if pooled and pooled.encrypted_token == encrypted_token:
+            pooled.last_used = now
+            metrics.inc("telegram_bot_pool_hits_total")
+            return pooled.bot
+
+        bot = Bot(
+            token=decrypt(encrypted_token),
+            session=self.session,
+            default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+        )
+        self._bots[bot_id] = PooledBot(bot=bot, encrypted_token=encrypted_token, last_used=now)
+        metrics.inc("telegram_bot_pool_misses_total")
+        metrics.set("telegram_bot_pool_size", len(self._bots))
+        return bot
+
+    def discard(self, bot_id: int) -> None:
+        self._bots.pop(bot_id, None)
+        metrics.set("telegram_bot_pool_size", len(self._bots))
+
+    async def close(self) -> None:
+        """Закрыть общую HTTP-сессию"""
+        self._bots.clear()
+        self._request_middlewares.clear()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _evict_idle(self, now: float) -> None:
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+
+        deadline = now - self.idle_ttl
+        idle = [bot_id for bot_id, pooled in self._bots.items() if pooled.last_used < deadline]
+        for bot_id in idle:
+            # Бот не владеет ресурсами: сессия общая, достаточно забыть ссылку
+            del self._bots[bot_id]
+        if idle:
+            metrics.inc("telegram_bot_pool_evictions_total", len(idle))
+            metrics.set("telegram_bot_pool_size", len(self._bots))
+
+
+bot_pool = BotPool(
+    idle_ttl=settings.telegram.POOL_IDLE_TTL,
+    sweep_interval=settings.telegram.POOL_SWEEP_INTERVAL,
+)
+
+
+async def get_bot_pool() -> BotPool:
+    """Получить пул ботов процесса"""
+    return bot_pool
@@ -0,0 +1,127 @@
+from typing import Any, Optional
+from dataclasses import dataclass
+
+from app.telegram.blocks.base import BaseBlock, BlockDTO
+from app.telegram.blocks.start import StartBlock
+from app.telegram.blocks.message import MessageBlock
+from app.telegram.blocks.menu import MenuBlock
+from app.telegram.blocks.delay import DelayBlock
+from app.telegram.blocks.input_data import InputDataBlock
+from app.telegram.handlers.start.triggers import TriggerHandler
+from app.enums import BlockType
+
+Edge = tuple[str, str]
+
+
+@dataclass(frozen=True)
+class CompiledScenario:
+    """Сценарий, подготовленный к выполнению.
+
+    Собирается один раз на опубликованную версию: блоки уже созданы,
+    а переходы между ними разложены по хеш-индексам.
+    """
+
+    scenario_id: int
+    version: str
+    blocks: dict[str, BaseBlock]
+    # (block_id, point) -> (to_block_id, to_point)
+    edges: dict[Edge, Edge]
+    # (block_id, button_id) -> (to_block_id, to_point)
+    menu_edges: dict[Edge, Edge]
+    # block_id -> идентификаторы кнопок блока
+    buttons: dict[str, frozenset[str]]
+    # Стартовый блок в исходном виде: из него читаются триггеры
+    start_block: Optional[dict[str, Any]] = None
+    # Триггеры стартового блока с заранее построенными автоматами ключевых слов
+    triggers: Optional[TriggerHandler] = None
+
+    @property
+    def start_block_id(self) -> Optional[str]:
+        return self.start_block["id"] if self.start_block else None
+
+    def get_block(self, block_id: Optional[str]) -> Optional[BaseBlock]:
+        return self.blocks.get(block_id)
+
+    def get_next_block(self, block_id: str, point: str) -> Optional[Edge]:
+        """Следующий блок по точке выхода"""
+        return self.edges.get((block_id, point))
+
+    def get_menu_edge(self, block_id: str, button_id: str) -> Optional[Edge]:
+        """Переход по нажатию кнопки меню"""
+        return self.menu_edges.get((block_id, button_id))
+
+    def has_button(self, block_id: Optional[str], button_id: Optional[str]) -> bool:
+        return button_id in self.buttons.get(block_id, ())
+
+
+class ScenarioCompiler:
+    """Компиляция сырых данных сценария в CompiledScenario"""
+
+    BLOCK_TYPE_MAPPING = {
+        BlockType.START.value: StartBlock,
+        BlockType.MESSAGE.value: MessageBlock,
+        BlockType.MENU.value: MenuBlock,
+        BlockType.DELAY.value: DelayBlock,
+        BlockType.INPUT_DATA.value: InputDataBlock,
+    }
+
+    def compile(
+        self,
+        scenario_id: int,
+        version: str,
+        scenario_data: dict,
+    ) -> CompiledScenario:
+        raw_blocks = scenario_data.get("blocks", [])
+        blocks = self._parse_blocks(raw_blocks)
+        edges = self._parse_edges(scenario_data.get("connections", []))
+        buttons = {
+            block["id"]: frozenset(
+                btn["id"] for btn in block["data"].get("buttons", []) if "id" in btn
+            )
+            for block in raw_blocks
+        }
+
+        menu_edges = {
+            (block_id, button_id): edges[(block_id, button_id)]
+            for block_id, block in blocks.items()
+            if isinstance(block, MenuBlock)
+            for button_id in buttons.get(block_id, ())
+            if (block_id, button_id) in edges
+        }
+
+        start_block = next(
+            (block for block in raw_blocks if block["type"] == BlockType.START.value),
+            None,
+        )
+
+        return CompiledScenario(
+            scenario_id=scenario_id,
+            version=version,
+            blocks=blocks,
+            edges=edges,
+            menu_edges=menu_edges,
+            buttons=buttons,
+            start_block=start_block,
+            triggers=TriggerHandler(start_block) if start_block else None,
+        )
+
+    def _parse_blocks(self, blocks_data: list[dict]) -> dict[str, BaseBlock]:
+        """Парсинг блоков сценария"""
+        parsed_blocks = {}
+        for block_data in blocks_data:
+            dto = BlockDTO(**block_data)
+            block_class = self.BLOCK_TYPE_MAPPING.get(dto.type, None)
+            if block_class:
+                parsed_blocks[dto.id] = block_class(dto)
+        return parsed_blocks
+
+    @staticmethod
+    def _parse_edges(connections: list[dict]) -> dict[Edge, Edge]:
+        """Индекс соединений по точке выхода блока"""
+        edges = {}
+        for conn in connections:
+            key = (conn["from"]["block_id"], conn["from"]["point"])
+            # При дублях, как и раньше, действует первое соединение
+            edges.setdefault(key, (conn["to"]["block_id"], conn["to"]["point"]))
+        return edges
+
@@ -1,63 +1,19 @@
-from typing import Optional, Dict, List
-from dataclasses import dataclass
+from typing import Optional
 
 from aiogram.exceptions import TelegramBadRequest
 
-from app.telegram.blocks.base import BaseBlock, BlockDTO
-from app.telegram.blocks.start import StartBlock
-from app.telegram.blocks.message import MessageBlock
+from app.telegram.blocks.base import BaseBlock
 from app.telegram.blocks.menu import MenuBlock
-from app.telegram.blocks.delay import DelayBlock
-from app.telegram.blocks.input_data import InputDataBlock
 from app.telegram.context import ScenarioContext
-from app.enums import BlockType, BlockConnectionPoint
-
-
-@dataclass
-class Connection:
-    """Модель соединения между блоками"""
-
-    from_block_id: str
-    from_point: str
-    to_block_id: str
-    to_point: str
-
-    @classmethod
-    def from_dict(cls, data: dict) -> "Connection":
-        return cls(
-            from_block_id=data["from"]["block_id"],
-            from_point=data["from"]["point"],
-            to_block_id=data["to"]["block_id"],
-            to_point=data["to"]["point"],
-        )
+from app.telegram.services.compiler import CompiledScenario
+from app.enums import BlockConnectionPoint
 
 
 class ScenarioInterpreter:
     """Интерпретатор сценария для выполнения блоков"""
 
-    BLOCK_TYPE_MAPPING = {
-        BlockType.START.value: StartBlock,
-        BlockType.MESSAGE.value: MessageBlock,
-        BlockType.MENU.value: MenuBlock,
-        BlockType.DELAY.value: DelayBlock,
-        BlockType.INPUT_DATA.value: InputDataBlock,
-    }
-
-    def __init__(self, scenario_data: dict):
-        self.blocks: Dict[str, BaseBlock] = self._parse_blocks(scenario_data["blocks"])
-        self.connections: List[Connection] = [
-            Connection.from_dict(conn) for conn in scenario_data["connections"]
-        ]
-
-    def _parse_blocks(self, blocks_data: list[dict]) -> Dict[str, BaseBlock]:
-        """Парсинг блоков сценария"""
-        parsed_blocks = {}
-        for block_data in blocks_data:
-            dto = BlockDTO(**block_data)
-            block_class = self.BLOCK_TYPE_MAPPING.get(dto.type, None)
-            if block_class:
-                parsed_blocks[dto.id] = block_class(dto)
-        return parsed_blocks
+    def __init__(self, scenario: CompiledScenario):
+        self.scenario = scenario
 
     def get_next_block(
         self,
@@ -65,13 +21,7 @@ class ScenarioInterpreter:
         connection_point: str,
     ) -> Optional[tuple[str, str]]:
         """Получение следующего блока по соединению"""
-        for connection in self.connections:
-            if (
-                connection.from_block_id == current_block_id
-                and connection.from_point == connection_point
-            ):
-                return connection.to_block_id, connection.to_point
-        return None
+        return self.scenario.get_next_block(current_block_id, connection_point)
 
     async def _process_block(
         self,
@@ -80,7 +30,7 @@ class ScenarioInterpreter:
     ) -> Optional[str]:
         """Обработка текущего блока"""
         if isinstance(current_block, MenuBlock) and context.entry_point:
-            result = self.get_next_block(
+            result = self.scenario.get_menu_edge(
                 current_block.id,
                 context.entry_point,
             )
@@ -92,6 +42,10 @@ class ScenarioInterpreter:
         # Получаем точку выхода из блока
         exit_point = await current_block.execute(context)
 
+        # Блок приостановил сценарий до срабатывания таймера
+        if context.is_suspended:
+            return None
+
         # Если блок не вернул точку выхода, используем entry_point или "next"
         if not exit_point:
             exit_point = context.entry_point or BlockConnectionPoint.NEXT.value
@@ -131,15 +85,24 @@ class ScenarioInterpreter:
                 raise
         context.user_history.clear()
 
+    async def resume(self, context: ScenarioContext, block_id: str) -> None:
+        """Продолжение сценария с блока, следующего за блоком задержки"""
+        result = self.get_next_block(block_id, BlockConnectionPoint.NEXT.value)
+        if not result:
+            return
+
+        context.current_block_id, context.entry_point = result
+        await self.execute(context)
+
     async def execute(self, context: ScenarioContext) -> None:
         """Выполнение сценария"""
         try:
-            current_block = self.blocks.get(context.current_block_id)
+            current_block = self.scenario.get_block(context.current_block_id)
             if not current_block:
                 return
 
             # Удаляем все клавиатуры в контексте
-            if context.update.callback_query:
+            if context.update.is_callback:
                 await self.delete_all_keyboards_in_context(context)
 
             while True:
@@ -153,7 +116,7 @@ class ScenarioInterpreter:
 
                 # Обновляем контекст для следующего блока
                 context.current_block_id = next_block_id
-                current_block = self.blocks.get(next_block_id)
+                current_block = self.scenario.get_block(next_block_id)
 
         except TelegramBadRequest as e:
             print(f"⚠️ Ошибка при выполнении сценария: {e}")
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+from weakref import WeakValueDictionary
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+
+from app.core.metrics import metrics
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Резервирование токена сразу в двух корзинах (бота и чата). Токены
+# уходят в минус, а вызывающий ждёт, пока долг не погасится: так
+# запросы выстраиваются в очередь без повторных обращений к Redis.
+RESERVE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local function reserve(key, rate, burst)
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + (now - ts) * rate / 1000) - 1
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil((burst - tokens) / rate * 1000) + 1000)
+    if tokens >= 0 then
+        return 0
+    end
+    return math.ceil(-tokens / rate * 1000)
+end
+
+return math.max(
+    reserve(KEYS[1], tonumber(ARGV[1]), tonumber(ARGV[2])),
+    reserve(KEYS[2], tonumber(ARGV[3]), tonumber(ARGV[4]))
+)
+"""
+
+
+class OutboundRateLimiter(BaseRequestMiddleware):
+    """Планировщик исходящих запросов к Bot API.
+
+    Подключается к общей HTTP-сессии пула ботов, поэтому через него
+    проходят все отправки блоков. Запросы в чат ограничиваются общими
+    для всех процессов корзинами токенов на бота и на чат, внутри
+    процесса сообщения в один чат уходят строго по очереди.
+    """
+
+    def __init__(self, redis_client, prefix: str = "telegram:ratelimit"):
+        self.redis = redis_client
+        self.prefix = prefix
+        self._chat_locks: WeakValueDictionary[tuple[int, str], asyncio.Lock] = (
+            WeakValueDictionary()
+        )
+        self._queued = 0
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod,
+    ):
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await self._request(make_request, bot, method)
+
+        key = (bot.id, str(chat_id))
+        lock = self._chat_locks.get(key)
+        if lock is None:
+            lock = self._chat_locks[key] = asyncio.Lock()
+
+        started = time.monotonic()
+        self._set_queued(1)
+        queued = True
+        try:
+            async with lock:
+                wait_ms = await self._reserve(bot.id, str(chat_id))
+                if wait_ms:
+                    await asyncio.sleep(wait_ms / 1000)
+
+                self._set_queued(-1)
+                queued = False
+                metrics.observe("telegram_outbound_wait_seconds", time.monotonic() - started)
+                return await self._request(make_request, bot, method)
+        finally:
+            if queued:
+                self._set_queued(-1)
+
+    async def _request(self, make_request: NextRequestMiddlewareType, bot: Bot, method):
+        """Запрос с повтором после ответа 429"""
+        attempt = 1
+        while True:
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt >= settings.telegram.RETRY_AFTER_ATTEMPTS:
+                    raise
+                metrics.inc("telegram_outbound_retry_after_total")
+                logger.warning("Bot API flood control, retrying in %s s", e.retry_after)
+                await asyncio.sleep(e.retry_after)
+                attempt += 1
+
+    async def _reserve(self, bot_id: int, chat_id: str) -> int:
+        """Сколько миллисекунд ждать до отправки"""
+        try:
+            return await self.redis.eval(
+                RESERVE_SCRIPT,
+                2,
+                f"{self.prefix}:bot:{bot_id}",
+                f"{self.prefix}:chat:{bot_id}:{chat_id}",
+                settings.telegram.BOT_RATE,
+                settings.telegram.BOT_BURST,
+                settings.telegram.CHAT_RATE,
+                settings.telegram.CHAT_BURST,
+            )
+        except Exception:
+            # Без Redis сообщения отправляются без ограничения, Telegram ответит 429
+            metrics.inc("telegram_outbound_limiter_errors_total")
+            logger.exception("Failed to reserve outbound rate limit")
+            return 0
+
+    def _set_queued(self, delta: int) -> None:
+        self._queued += delta
+        metrics.set("telegram_outbound_queue_depth", self._queued)
+
+
+def create_rate_limiter(redis_client) -> OutboundRateLimiter:
+    return OutboundRateLimiter(redis_client)
@@ -0,0 +1,196 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.metrics import metrics
+from app.core.settings import settings
+from app.core.dependencies.redis_deps import RedisDI
+from app.telegram.services.compiler import CompiledScenario
+
+logger = logging.getLogger(__name__)
+
+# Во сколько раз скомпилированный сценарий в памяти больше своего JSON
+COMPILED_SIZE_FACTOR = 4
+
+
+@dataclass(frozen=True)
+class RuntimeScenario:
+    """Всё, что нужно для обработки апдейта бота, без обращений к БД"""
+
+    webhook_token: str
+    bot_id: int
+    # Токен хранится зашифрованным и расшифровывается при создании бота
+    encrypted_token: str
+    scenario: CompiledScenario
+    size: int
+    expires_at: float
+
+    @classmethod
+    def build(
+        cls,
+        webhook_token: str,
+        bot_id: int,
+        encrypted_token: str,
+        scenario: CompiledScenario,
+        scenario_data: dict,
+    ) -> "RuntimeScenario":
+        size = len(json.dumps(scenario_data, ensure_ascii=False)) * COMPILED_SIZE_FACTOR
+        return cls(
+            webhook_token=webhook_token,
+            bot_id=bot_id,
+            encrypted_token=encrypted_token,
+            scenario=scenario,
+            size=size + len(webhook_token) + len(encrypted_token),
+            expires_at=time.monotonic() + settings.cache.TTL,
+        )
+
+
+class ScenarioCache:
+    """LRU-кэш сценариев по webhook-токену с ограничением по памяти.
+
+    TTL записей страхует от пропущенных сообщений об инвалидации,
+    а счётчик поколений не даёт сохранить данные, прочитанные из БД
+    до инвалидации, которая произошла во время чтения.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.generation = 0
+        self._entries: OrderedDict[str, RuntimeScenario] = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, webhook_token: str) -> Optional[RuntimeScenario]:
+        entry = self._entries.get(webhook_token)
+        if entry is None:
+            metrics.inc("telegram_scenario_cache_misses_total")
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._remove(webhook_token)
+            metrics.inc("telegram_scenario_cache_misses_total")
+            return None
+
+        self._entries.move_to_end(webhook_token)
+        metrics.inc("telegram_scenario_cache_hits_total")
+        return entry
+
+    def put(self, entry: RuntimeScenario, generation: int) -> None:
+        """Сохранить запись, если с начала её загрузки не было инвалидаций"""
+        if generation != self.generation or entry.size > self.max_bytes:
+            return
+
+        self._remove(entry.webhook_token)
+        self._entries[entry.webhook_token] = entry
+        self._size += entry.size
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._size > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+            metrics.inc("telegram_scenario_cache_evictions_total")
+
+    def invalidate_bot(self, bot_id: int) -> None:
+        self._invalidate(lambda entry: entry.bot_id == bot_id)
+
+    def invalidate_scenario(self, scenario_id: int) -> None:
+        self._invalidate(lambda entry: entry.scenario.scenario_id == scenario_id)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+        self._size = 0
+
+    def apply(self, message: dict) -> None:
+        """Применить сообщение об инвалидации"""
+        if message.get("bot_id") is not None:
+            self.invalidate_bot(int(message["bot_id"]))
+        if message.get("scenario_id") is not None:
+            self.invalidate_scenario(int(message["scenario_id"]))
+
+    def _invalidate(self, predicate) -> None:
+        self.generation += 1
+        for token in [token for token, entry in self._entries.items() if predicate(entry)]:
+            self._remove(token)
+
+    def _remove(self, webhook_token: str) -> None:
+        entry = self._entries.pop(webhook_token, None)
+        if entry is not None:
+            self._size -= entry.size
+
+
+class ScenarioCacheInvalidator:
+    """Инвалидация кэша сценариев во всех процессах через Redis pub/sub"""
+
+    def __init__(self, redis_client, cache: ScenarioCache, channel: str):
+        self.redis = redis_client
+        self.cache = cache
+        self.channel = channel
+
+    async def invalidate_bot(self, bot_id: int) -> None:
+        await self._publish({"bot_id": bot_id})
+
+    async def invalidate_scenario(self, scenario_id: int) -> None:
+        await self._publish({"scenario_id": scenario_id})
+
+    async def _publish(self, message: dict) -> None:
+        # Локальный кэш сбрасывается сразу, не дожидаясь своего же сообщения
+        self.cache.apply(message)
+        try:
+            await self.redis.publish(self.channel, json.dumps(message))
+        except Exception:
+            # Изменения уже сохранены, остальные процессы догонят по TTL
+            logger.exception("Failed to publish scenario cache invalidation")
+
+    async def listen(self) -> None:
+        """Приём сообщений об инвалидации от других процессов"""
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    # Пока подписки не было, сообщения могли быть пропущены
+                    self.cache.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        try:
+                            self.cache.apply(json.loads(message["data"]))
+                        except (ValueError, TypeError):
+                            logger.warning("Malformed cache invalidation: %r", message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Scenario cache invalidation listener failed")
+                await asyncio.sleep(1)
+
+
+scenario_cache = ScenarioCache(
+    max_entries=settings.cache.MAX_ENTRIES,
+    max_bytes=settings.cache.MAX_BYTES,
+)
+
+
+def create_scenario_cache_invalidator(redis_client) -> ScenarioCacheInvalidator:
+    return ScenarioCacheInvalidator(redis_client, scenario_cache, settings.cache.CHANNEL)
+
+
+async def get_scenario_cache() -> ScenarioCache:
+    """Получить кэш сценариев процесса"""
+    return scenario_cache
+
+
+async def get_scenario_cache_invalidator(redis_client: RedisDI) -> ScenarioCacheInvalidator:
+    """Получить инвалидатор кэша сценариев"""
+    return create_scenario_cache_invalidator(redis_client)
@@ -0,0 +1,282 @@
+from app.telegram.dependencies.manager_deps import BotPoolDI
+from app.telegram.dependencies.storage_deps import (
+    StateStorageDI,
+    DelayTimerStorageDI,
+    FileIdCacheDI,
+)
+from app.telegram.dependencies.cache_deps import ScenarioCacheDI
+from app.broadcasts.dependencies.storage_deps import BroadcastAudienceDI
+from app.scenarios.dependencies.services_deps import ScenarioServiceDI
+from app.bots.dependencies.services_deps import BotServiceDI
+from app.users_data.dependencies.services_deps import UserDataServiceDI
+from app.telegram.context import ScenarioContext
+from app.telegram.schemas.update import IncomingUpdate
+from app.telegram.services.interpreter import ScenarioInterpreter
+from app.telegram.services.compiler import ScenarioCompiler
+from app.telegram.services.scenario_cache import RuntimeScenario
+from app.telegram.storage.user_state import UserState
+from app.telegram.storage.state_storage import STATE_TTL
+from app.telegram.storage.delay_timer import DelayTimer
+from app.telegram.handlers.start.start import handle_start
+from app.telegram.handlers.callback import handle_callback
+from app.users_data.schemas import UserFieldSchema
+
+
+class UpdateProcessor:
+    """Обработчик входящих апдейтов: восстановление → обработка → выполнение → сохранение"""
+
+    def __init__(
+        self,
+        scenario_service: ScenarioServiceDI,
+        user_data_service: UserDataServiceDI,
+        bot_service: BotServiceDI,
+        bot_pool: BotPoolDI,
+        state_storage: StateStorageDI,
+        delay_timers: DelayTimerStorageDI,
+        scenario_cache: ScenarioCacheDI,
+        file_ids: FileIdCacheDI,
+        audience: BroadcastAudienceDI,
+    ):
+        self._scenario_service = scenario_service
+        self._user_data_service = user_data_service
+        self._bot_service = bot_service
+        self._bot_pool = bot_pool
+        self._state_storage = state_storage
+        self._delay_timers = delay_timers
+        self._scenario_cache = scenario_cache
+        self._file_ids = file_ids
+        self._audience = audience
+
+    async def process(self, webhook_token: str, update: IncomingUpdate) -> None:
+        """Полная обработка апдейта"""
+        # Получение данных сценария
+        runtime = await self._get_runtime(webhook_token)
+
+        # Создание бота и контекста
+        bot = self._bot_pool.get_bot(
+            runtime.bot_id,
+            runtime.encrypted_token,
+            decrypt=self._bot_service.decrypt_token,
+        )
+        context = await ScenarioContext.create(
+            update=update,
+            bot=bot,
+            scenario=runtime.scenario,
+            bot_id=runtime.bot_id,
+            file_ids=self._file_ids,
+        )
+        # 1. Восстанавливаем состояние
+        restored = await self._restore_user_state(context)
+        if not restored:
+            # Чат попадает в аудиторию рассылок бота вместе с созданием состояния
+            await self._audience.add(runtime.bot_id, context.chat_id)
+
+        # 2. Обработка входящего апдейта
+        should_process = await self._handle_update(context, update)
+        if not should_process:
+            return
+
+        # Пользователь ушёл с блока задержки: отложенное продолжение отменяется
+        if context.timer_id:
+            await self._delay_timers.cancel(context.timer_id)
+            context.timer_id = None
+
+        # 3. Выполнение сценария
+        interpreter = ScenarioInterpreter(context.scenario)
+        await interpreter.execute(context)
+
+        await self._finish(context, webhook_token)
+
+    async def resume(self, timer: DelayTimer) -> None:
+        """Продолжение сценария пользователя после срабатывания таймера задержки"""
+        runtime = await self._get_runtime(timer.webhook_token)
+        scenario = runtime.scenario
+        if scenario.scenario_id != timer.scenario_id:
+            return
+
+        bot = self._bot_pool.get_bot(
+            runtime.bot_id,
+            runtime.encrypted_token,
+            decrypt=self._bot_service.decrypt_token,
+        )
+        context = ScenarioContext(
+            update=IncomingUpdate(update_id=0, user_id=timer.user_id, chat_id=timer.chat_id),
+            bot=bot,
+            user_id=str(timer.user_id),
+            username=timer.username,
+            chat_id=str(timer.chat_id),
+            scenario_id=str(scenario.scenario_id),
+            scenario=scenario,
+            bot_id=runtime.bot_id,
+            file_ids=self._file_ids,
+        )
+        await self._restore_user_state(context)
+
+        # Пользователь уже ушёл с блока задержки (например, перезапустил сценарий)
+        if context.timer_id != timer.id:
+            return
+        context.timer_id = None
+
+        interpreter = ScenarioInterpreter(context.scenario)
+        await interpreter.resume(context, timer.block_id)
+
+        await self._finish(context, timer.webhook_token)
+
+    async def _get_runtime(self, webhook_token: str) -> RuntimeScenario:
+        """Сценарий бота из кэша процесса, при промахе — из БД"""
+        runtime = self._scenario_cache.get(webhook_token)
+        if runtime:
+            return runtime
+
+        generation = self._scenario_cache.generation
+        row = await self._scenario_service.get_runtime_by_webhook_token(webhook_token)
+        runtime = RuntimeScenario.build(
+            webhook_token=webhook_token,
+            bot_id=row.bot_id,
+            encrypted_token=row.encrypted_token,
+            scenario=ScenarioCompiler().compile(
+                scenario_id=row.id,
+                # Сценарии, ни разу не опубликованные, версии не имеют
+                version=str(row.version_id) if row.version_id else row.updated_at.isoformat(),
+                scenario_data=row.data,
+            ),
+            scenario_data=row.data,
+        )
+        self._scenario_cache.put(runtime, generation)
+        return runtime
+
+    async def _finish(self, context: ScenarioContext, webhook_token: str) -> None:
+        """Планирование задержки и сохранение результатов выполнения"""
+        # 4. Планирование продолжения после блока задержки
+        if context.is_suspended:
+            timer = DelayTimer(
+                webhook_token=webhook_token,
+                scenario_id=int(context.scenario_id),
+                block_id=context.current_block_id,
+                user_id=int(context.user_id),
+                chat_id=int(context.chat_id),
+                username=context.username,
+            )
+            await self._delay_timers.schedule(timer, context.delay_seconds)
+            context.timer_id = timer.id
+
+        # 5. Сохранение данных
+        await self._save_user_data(context)
+
+        # 6. Сохранение состояния
+        await self._save_user_state(context)
+
+    async def _restore_user_state(self, context: ScenarioContext) -> bool:
+        """Восстановление состояния пользователя.
+
+        Возвращает False, если состояния пользователя в этом сценарии ещё нет.
+        """
+        user_state = await self._state_storage.get_state(context.user_id)
+        restored = bool(user_state) and str(user_state.scenario_id) == context.scenario_id
+        if user_state:
+            context.current_block_id = user_state.current_block_id
+            context.user_history = user_state.user_history
+            context.timer_id = user_state.timer_id
+            context.db_data_loaded = user_state.db_data_loaded
+
+            if user_state.variables:
+                context.user_input = user_state.variables
+                return restored
+
+        # Состояние истекло или пустое: сохранённые значения берутся из БД
+        if context.scenario_id not in context.db_data_loaded:
+            values = await self._user_data_service.get_latest_values(
+                int(context.scenario_id),
+                int(context.user_id),
+            )
+            if values:
+                context.user_input = {
+                    context.scenario_id: {
+                        value.variable: {
+                            "field_name": value.name,
+                            "field_type": value.type,
+                            "field_value": value.value,
+                            "saved": True,
+                        }
+                        for value in values
+                    }
+                }
+            context.db_data_loaded[context.scenario_id] = True
+        return restored
+
+    async def _save_user_state(self, context: ScenarioContext) -> None:
+        """Сохранение состояния пользователя"""
+        await self._state_storage.set_state(
+            UserState(
+                user_id=context.user_id,
+                scenario_id=context.scenario_id,
+                current_block_id=context.current_block_id,
+                variables=context.user_input,
+                user_history=context.user_history,
+                db_data_loaded=context.db_data_loaded,
+                timer_id=context.timer_id,
+            ),
+            # Состояние должно дожить до срабатывания таймера задержки
+            ttl=STATE_TTL + (context.delay_seconds or 0),
+        )
+
+    async def _save_user_data(self, context: ScenarioContext) -> None:
+        """Сохранение данных пользователя"""
+        user_inputs = context.user_input.get(context.scenario_id, {})
+        unsaved = {
+            variable: data
+            for variable, data in user_inputs.items()
+            if isinstance(data, dict) and data.get("field_name") and not data.get("saved")
+        }
+        if not unsaved:
+            return
+
+        # Все значения апдейта сохраняются одной записью
+        await self._user_data_service.save_user_data([
+            UserFieldSchema(
+                name=data["field_name"],
+                type=data["field_type"],
+                value=data["field_value"],
+                scenario_id=int(context.scenario_id),
+                user_id=int(context.user_id),
+                username=context.username,
+                variable=variable,
+            )
+            for variable, data in unsaved.items()
+        ])
+        # Отмечаем, что данные сохранены
+        for data in unsaved.values():
+            data["saved"] = True
+
+    async def _handle_update(self, context: ScenarioContext, update: IncomingUpdate) -> bool:
+        """Обработка входящего апдейта"""
+        if update.is_message:
+            return await self._handle_message_update(context)
+        elif update.is_callback:
+            return await self._handle_callback_update(context)
+        return False
+
+    async def _handle_message_update(self, context: ScenarioContext) -> bool:
+        """Обработка текстового сообщения"""
+        # Проверяем, ожидаем ли мы ввод данных
+        if context.scenario_id in context.user_input and context.user_input[
+            context.scenario_id
+        ].get("waiting", False):
+            return True
+
+        # Стандартная обработка
+        restarted = await handle_start(context)
+        if restarted:
+            return True
+
+        # Пока сценарий ждёт таймер задержки, сообщения игнорируются
+        if context.timer_id:
+            return False
+
+        # Если сообщение не является триггером и нет текущего блока,
+        # то игнорируем его
+        return not bool(context.current_block_id)
+
+    async def _handle_callback_update(self, context: ScenarioContext) -> bool:
+        """Обработка callback-запроса"""
+        return await handle_callback(context)
@@ -0,0 +1,15 @@
+from typing import Optional
+from uuid import uuid4
+
+from pydantic import BaseModel, Field
+
+
+class DelayTimer(BaseModel):
+    """Отложенное продолжение сценария после блока задержки"""
+    id: str = Field(default_factory=lambda: uuid4().hex)
+    webhook_token: str
+    scenario_id: int
+    block_id: str
+    user_id: int
+    chat_id: int
+    username: Optional[str] = None
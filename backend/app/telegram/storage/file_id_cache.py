@@ -0,0 +1,53 @@
+import hashlib
+from typing import Optional
+
+from app.core.dependencies.redis_deps import RedisDI
+
+FILE_ID_TTL = 30 * 86400  # 30 days
+
+
+class FileIdCache:
+    """Кэш file_id загруженных в Telegram вложений.
+
+    file_id действителен только для бота, который загрузил файл, поэтому
+    идентификаторы хранятся в отдельном hash на каждого бота.
+    """
+
+    def __init__(self, redis_client, prefix: str = "telegram:file_ids"):
+        self.redis = redis_client
+        self.prefix = prefix
+
+    def _key(self, bot_id: int) -> str:
+        return f"{self.prefix}:{bot_id}"
+
+    @staticmethod
+    def field(url: str, media_type: str) -> str:
+        """Поле вложения: один и тот же файл как фото и как документ имеет разные file_id"""
+        return f"{media_type}:{hashlib.sha1(url.encode()).hexdigest()}"
+
+    async def get_many(self, bot_id: int, fields: list[str]) -> list[Optional[str]]:
+        if not fields:
+            return []
+        return await self.redis.hmget(self._key(bot_id), fields)
+
+    async def set_many(self, bot_id: int, file_ids: dict[str, str]) -> None:
+        if not file_ids:
+            return
+        key = self._key(bot_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping=file_ids)
+            pipe.expire(key, FILE_ID_TTL)
+            await pipe.execute()
+
+    async def delete(self, bot_id: int, fields: list[str]) -> None:
+        if fields:
+            await self.redis.hdel(self._key(bot_id), *fields)
+
+
+def create_file_id_cache(redis_client) -> FileIdCache:
+    return FileIdCache(redis_client)
+
+
+async def get_file_id_cache(redis_client: RedisDI) -> FileIdCache:
+    """Получить кэш file_id вложений"""
+    return create_file_id_cache(redis_client)
@@ -2,7 +2,9 @@ from abc import ABC, abstractmethod
 from typing import Optional
 
 from app.telegram.storage.user_state import UserState
-from app.core.settings import settings
+from app.core.dependencies.redis_deps import RedisDI
+
+STATE_TTL = 86400  # 1 day
 
 
 class BaseStateStorage(ABC):
@@ -14,7 +16,7 @@ class BaseStateStorage(ABC):
         pass
 
     @abstractmethod
-    async def set_state(self, state: UserState) -> None:
+    async def set_state(self, state: UserState, ttl: int = STATE_TTL) -> None:
         """Установить состояние пользователя"""
         pass
     
@@ -35,12 +37,12 @@ class RedisStateStorage(BaseStateStorage):
         state = await self.redis.get(f"user:{user_id}:state")
         return UserState.model_validate_json(state) if state else None
 
-    async def set_state(self, state: UserState) -> None:
+    async def set_state(self, state: UserState, ttl: int = STATE_TTL) -> None:
         """Установить состояние пользователя"""
         await self.redis.set(
             f"user:{state.user_id}:state",
             state.model_dump_json(),
-            ex=86400,  # 1 day
+            ex=ttl,
         )
 
     async def delete_state(self, user_id: int) -> None:
@@ -48,6 +50,6 @@ class RedisStateStorage(BaseStateStorage):
         await self.redis.delete(f"user:{user_id}:state")
 
 
-async def get_state_storage() -> BaseStateStorage:
+async def get_state_storage(redis_client: RedisDI) -> BaseStateStorage:
     """Получить хранилище состояний пользователей"""
-    return RedisStateStorage(settings.redis.client)
+    return RedisStateStorage(redis_client)
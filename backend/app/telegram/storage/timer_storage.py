@@ -0,0 +1,114 @@
+import time
+
+from app.telegram.storage.delay_timer import DelayTimer
+from app.core.settings import settings
+from app.core.dependencies.redis_deps import RedisDI
+
+
+# Выдача наступивших таймеров: таймер не удаляется, а откладывается на время
+# видимости, чтобы при падении обработчика он сработал повторно
+CLAIM_DUE_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #ids == 0 then
+    return {}
+end
+local retry_at = tonumber(ARGV[1]) + tonumber(ARGV[3])
+local payloads = redis.call('HMGET', KEYS[2], unpack(ids))
+local result = {}
+for i, id in ipairs(ids) do
+    if payloads[i] then
+        redis.call('ZADD', KEYS[1], retry_at, id)
+        table.insert(result, payloads[i])
+    else
+        redis.call('ZREM', KEYS[1], id)
+    end
+end
+return result
+"""
+
+
+class DelayTimerStorage:
+    """Хранилище таймеров задержки в Redis.
+
+    Время срабатывания хранится в sorted set, данные таймера — в hash,
+    поэтому добавление и выборка наступивших таймеров стоят O(log n).
+    Число неудачных срабатываний таймера хранится в отдельном hash.
+    """
+
+    def __init__(self, redis_client, key: str, dead_letter_key: str):
+        self.redis = redis_client
+        self.due_key = f"{key}:due"
+        self.payload_key = f"{key}:payload"
+        self.attempts_key = f"{key}:attempts"
+        self.dead_letter_key = dead_letter_key
+
+    async def schedule(self, timer: DelayTimer, delay_seconds: float) -> None:
+        """Запланировать таймер"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.payload_key, timer.id, timer.model_dump_json())
+            pipe.zadd(self.due_key, {timer.id: time.time() + delay_seconds})
+            await pipe.execute()
+
+    async def claim_due(self, limit: int, visibility_timeout: int) -> list[DelayTimer]:
+        """Забрать наступившие таймеры"""
+        payloads = await self.redis.eval(
+            CLAIM_DUE_SCRIPT,
+            2,
+            self.due_key,
+            self.payload_key,
+            time.time(),
+            limit,
+            visibility_timeout,
+        )
+        return [DelayTimer.model_validate_json(payload) for payload in payloads]
+
+    async def complete(self, timer_id: str) -> None:
+        """Удалить отработавший таймер"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.due_key, timer_id)
+            pipe.hdel(self.payload_key, timer_id)
+            pipe.hdel(self.attempts_key, timer_id)
+            await pipe.execute()
+
+    async def retry(self, timer_id: str, delay_seconds: float) -> int:
+        """Отложить неудавшийся таймер; возвращает число неудачных попыток"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(self.attempts_key, timer_id, 1)
+            pipe.zadd(self.due_key, {timer_id: time.time() + delay_seconds}, xx=True, ch=True)
+            attempts, rescheduled = await pipe.execute()
+        if not rescheduled:
+            # Таймер отменили, пока он срабатывал
+            await self.redis.hdel(self.attempts_key, timer_id)
+        return attempts
+
+    async def failed_attempts(self, timer_id: str) -> int:
+        return int(await self.redis.hget(self.attempts_key, timer_id) or 0)
+
+    async def dead_letter(self, timer: DelayTimer) -> None:
+        """Перенести таймер, попытки которого исчерпаны, в отдельный список"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(self.dead_letter_key, timer.model_dump_json())
+            pipe.zrem(self.due_key, timer.id)
+            pipe.hdel(self.payload_key, timer.id)
+            pipe.hdel(self.attempts_key, timer.id)
+            await pipe.execute()
+
+    async def cancel(self, timer_id: str) -> None:
+        """Отменить таймер, который ещё не сработал"""
+        await self.complete(timer_id)
+
+    async def pending_count(self) -> int:
+        return await self.redis.zcard(self.due_key)
+
+
+def create_delay_timer_storage(redis_client) -> DelayTimerStorage:
+    return DelayTimerStorage(
+        redis_client,
+        key=settings.scheduler.KEY,
+        dead_letter_key=settings.scheduler.DEAD_LETTER_KEY,
+    )
+
+
+async def get_delay_timer_storage(redis_client: RedisDI) -> DelayTimerStorage:
+    """Получить хранилище таймеров задержки"""
+    return create_delay_timer_storage(redis_client)
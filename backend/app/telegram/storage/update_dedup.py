@@ -0,0 +1,93 @@
+import logging
+
+from app.core.metrics import metrics
+from app.core.settings import settings
+from app.core.dependencies.redis_deps import RedisDI
+
+logger = logging.getLogger(__name__)
+
+
+# Отметка апдейта как принятого. 0 — повтор: update_id уже встречался
+# или отстаёт от самого нового апдейта бота больше чем на окно
+MARK_SEEN_SCRIPT = """
+local update_id = tonumber(ARGV[1])
+local window = tonumber(ARGV[3])
+local high_water = tonumber(redis.call('GET', KEYS[2]))
+
+if window > 0 and high_water and update_id <= high_water - window then
+    return 0
+end
+if not redis.call('SET', KEYS[1], 1, 'NX', 'EX', ARGV[2]) then
+    return 0
+end
+if window > 0 and (not high_water or update_id > high_water) then
+    redis.call('SET', KEYS[2], update_id, 'EX', ARGV[4])
+end
+return 1
+"""
+
+# Отметка о самом новом апдейте живёт дольше отметок отдельных апдейтов
+HIGH_WATER_TTL = 7 * 86400  # 7 days
+
+
+class UpdateDeduplicator:
+    """Отсев повторно доставленных апдейтов.
+
+    Telegram повторяет доставку, если вебхук ответил медленно или с
+    ошибкой. Апдейт бота принимается один раз: проверка и отметка
+    выполняются одним скриптом, то есть за одно обращение к Redis.
+    Бот определяется webhook-токеном, который однозначно ему соответствует.
+    """
+
+    def __init__(self, redis_client, prefix: str, ttl: int, high_water_window: int):
+        self.redis = redis_client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.high_water_window = high_water_window
+
+    def _seen_key(self, webhook_token: str, update_id: int) -> str:
+        return f"{self.prefix}:seen:{webhook_token}:{update_id}"
+
+    def _high_water_key(self, webhook_token: str) -> str:
+        return f"{self.prefix}:high_water:{webhook_token}"
+
+    async def is_new(self, webhook_token: str, update_id: int) -> bool:
+        """Отметить апдейт; False, если он уже был принят"""
+        try:
+            accepted = await self.redis.eval(
+                MARK_SEEN_SCRIPT,
+                2,
+                self._seen_key(webhook_token, update_id),
+                self._high_water_key(webhook_token),
+                update_id,
+                self.ttl,
+                self.high_water_window,
+                HIGH_WATER_TTL,
+            )
+        except Exception:
+            # Без Redis лучше обработать апдейт дважды, чем потерять его
+            metrics.inc("telegram_update_dedup_errors_total")
+            logger.exception("Failed to check update %s for duplicates", update_id)
+            return True
+
+        if not accepted:
+            metrics.inc("telegram_updates_duplicate_total")
+        return bool(accepted)
+
+    async def forget(self, webhook_token: str, update_id: int) -> None:
+        """Снять отметку, чтобы повторная доставка после ошибки была обработана"""
+        await self.redis.delete(self._seen_key(webhook_token, update_id))
+
+
+def create_update_deduplicator(redis_client) -> UpdateDeduplicator:
+    return UpdateDeduplicator(
+        redis_client,
+        prefix=settings.dedup.KEY,
+        ttl=settings.dedup.TTL,
+        high_water_window=settings.dedup.HIGH_WATER_WINDOW,
+    )
+
+
+async def get_update_deduplicator(redis_client: RedisDI) -> UpdateDeduplicator:
+    """Получить фильтр повторных апдейтов"""
+    return create_update_deduplicator(redis_client)
@@ -0,0 +1,275 @@
+import logging
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+from redis.exceptions import ResponseError
+
+from app.core.metrics import metrics
+from app.core.settings import settings
+from app.core.dependencies.redis_deps import RedisDI
+from app.enums import QueueItemType
+
+logger = logging.getLogger(__name__)
+
+# Продление аренды дорожки, только если она всё ещё принадлежит владельцу
+RENEW_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Освобождение аренды дорожки её владельцем
+RELEASE_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass
+class QueuedUpdate:
+    """Апдейт, прочитанный из очереди"""
+
+    message_id: str
+    webhook_token: str
+    payload: str
+    type: QueueItemType = QueueItemType.UPDATE
+
+
+@dataclass
+class LaneStats:
+    """Состояние дорожки очереди"""
+
+    lane: int
+    depth: int
+    lag_seconds: float
+
+
+class UpdateQueue:
+    """Очередь входящих апдейтов в Redis Streams, разбитая на дорожки.
+
+    Апдейты одного пользователя бота всегда попадают в одну дорожку,
+    а каждую дорожку в любой момент времени обрабатывает один потребитель,
+    поэтому они выполняются строго по порядку. Дорожки не ограничены по
+    длине: из них удаляются только подтверждённые апдейты (trim), чтобы
+    при простое обработчиков апдейты и таймеры задержек не терялись.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        stream: str,
+        group: str,
+        max_len: int,
+        lanes: int,
+        dead_letter_stream: str,
+    ):
+        self.redis = redis_client
+        self.stream = stream
+        self.group = group
+        self.max_len = max_len
+        self.lanes = lanes
+        self.dead_letter_stream = dead_letter_stream
+
+    def lane_for(self, webhook_token: str, user_id: Optional[int]) -> int:
+        """Номер дорожки для пары (бот, пользователь)"""
+        key = f"{webhook_token}:{user_id or 0}".encode()
+        return zlib.crc32(key) % self.lanes
+
+    def lane_stream(self, lane: int) -> str:
+        return f"{self.stream}:{lane}"
+
+    def lane_consumer(self, lane: int) -> str:
+        # Имя потребителя привязано к дорожке, а не к процессу: новый владелец
+        # аренды дочитает неподтверждённые апдейты предыдущего
+        return f"lane-{lane}"
+
+    def lane_lease_key(self, lane: int) -> str:
+        return f"{self.stream}:{lane}:lease"
+
+    async def ensure_group(self, lane: int) -> None:
+        """Создать группу потребителей дорожки, если её ещё нет"""
+        try:
+            await self.redis.xgroup_create(
+                self.lane_stream(lane), self.group, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def put(
+        self,
+        webhook_token: str,
+        user_id: Optional[int],
+        payload: str,
+        item_type: QueueItemType = QueueItemType.UPDATE,
+    ) -> str:
+        """Добавить апдейт в дорожку пользователя"""
+        lane = self.lane_for(webhook_token, user_id)
+        return await self.redis.xadd(
+            self.lane_stream(lane),
+            {"token": webhook_token, "type": item_type.value, "payload": payload},
+        )
+
+    async def read(
+        self,
+        lane: int,
+        count: int,
+        block_ms: Optional[int] = None,
+        pending: bool = False,
+    ) -> list[QueuedUpdate]:
+        """Прочитать апдейты дорожки.
+
+        При pending=True возвращаются выданные, но не подтверждённые апдейты.
+        """
+        response = await self.redis.xreadgroup(
+            self.group,
+            self.lane_consumer(lane),
+            {self.lane_stream(lane): "0" if pending else ">"},
+            count=count,
+            block=None if pending else block_ms,
+        )
+        if not response:
+            return []
+        _, entries = response[0]
+
+        # Записи, удалённые из потока в обход trim, больше не прочитать
+        trimmed = [message_id for message_id, fields in entries if not fields]
+        if trimmed:
+            await self.redis.xack(self.lane_stream(lane), self.group, *trimmed)
+            metrics.inc("telegram_updates_lost_total", len(trimmed), lane=str(lane))
+            logger.error("Lane %s lost %s unprocessed updates: %s", lane, len(trimmed), trimmed)
+
+        return self._to_updates(entries)
+
+    async def ack(self, lane: int, message_id: str) -> None:
+        """Подтвердить обработку апдейта"""
+        await self.redis.xack(self.lane_stream(lane), self.group, message_id)
+
+    async def trim(self, lane: int) -> int:
+        """Удалить из дорожки подтверждённые апдейты; возвращает число удалённых.
+
+        Граница — самый старый неподтверждённый апдейт, а если таких нет,
+        последний выданный группе: всё до неё обработано.
+        """
+        stream = self.lane_stream(lane)
+        groups = await self.redis.xinfo_groups(stream)
+        group = next((g for g in groups if g["name"] == self.group), None)
+        if group is None:
+            return 0
+
+        min_id = group["last-delivered-id"]
+        if group.get("pending"):
+            summary = await self.redis.xpending(stream, self.group)
+            min_id = summary["min"]
+        if min_id == "0-0":
+            return 0
+        return await self.redis.xtrim(stream, minid=min_id, approximate=True)
+
+    async def delivery_count(self, lane: int, message_id: str) -> int:
+        """Сколько раз апдейт выдавался потребителю дорожки"""
+        entries = await self.redis.xpending_range(
+            self.lane_stream(lane), self.group, min=message_id, max=message_id, count=1
+        )
+        return entries[0]["times_delivered"] if entries else 0
+
+    async def dead_letter(self, lane: int, item: QueuedUpdate) -> None:
+        """Перенести апдейт в поток необработанных и подтвердить его в дорожке"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(
+                self.dead_letter_stream,
+                {
+                    "token": item.webhook_token,
+                    "type": item.type.value,
+                    "payload": item.payload,
+                    "lane": lane,
+                    "message_id": item.message_id,
+                },
+                maxlen=self.max_len,
+                approximate=True,
+            )
+            pipe.xack(self.lane_stream(lane), self.group, item.message_id)
+            await pipe.execute()
+
+    async def acquire_lease(self, lane: int, owner: str, ttl_ms: int) -> bool:
+        """Захватить аренду дорожки"""
+        return bool(
+            await self.redis.set(self.lane_lease_key(lane), owner, nx=True, px=ttl_ms)
+        )
+
+    async def renew_lease(self, lane: int, owner: str, ttl_ms: int) -> bool:
+        """Продлить аренду дорожки"""
+        return bool(
+            await self.redis.eval(
+                RENEW_LEASE_SCRIPT, 1, self.lane_lease_key(lane), owner, ttl_ms
+            )
+        )
+
+    async def release_lease(self, lane: int, owner: str) -> None:
+        """Освободить аренду дорожки"""
+        await self.redis.eval(RELEASE_LEASE_SCRIPT, 1, self.lane_lease_key(lane), owner)
+
+    async def lane_stats(self, lane: int) -> LaneStats:
+        """Глубина дорожки и возраст самого старого необработанного апдейта"""
+        stream = self.lane_stream(lane)
+        try:
+            groups = await self.redis.xinfo_groups(stream)
+        except ResponseError:
+            return LaneStats(lane=lane, depth=0, lag_seconds=0.0)
+
+        group = next((g for g in groups if g["name"] == self.group), None)
+        if group is None:
+            return LaneStats(lane=lane, depth=await self.redis.xlen(stream), lag_seconds=0.0)
+
+        pending = group.get("pending") or 0
+        undelivered = group.get("lag") or 0
+
+        oldest_id = None
+        if pending:
+            summary = await self.redis.xpending(stream, self.group)
+            oldest_id = summary.get("min")
+        elif undelivered:
+            entries = await self.redis.xrange(
+                stream, min=f"({group['last-delivered-id']}", count=1
+            )
+            oldest_id = entries[0][0] if entries else None
+
+        lag_seconds = 0.0
+        if oldest_id:
+            oldest_ms = int(oldest_id.split("-")[0])
+            lag_seconds = max(0.0, time.time() - oldest_ms / 1000)
+
+        return LaneStats(lane=lane, depth=pending + undelivered, lag_seconds=lag_seconds)
+
+    @staticmethod
+    def _to_updates(entries: list) -> list[QueuedUpdate]:
+        return [
+            QueuedUpdate(
+                message_id=message_id,
+                webhook_token=fields["token"],
+                payload=fields["payload"],
+                type=QueueItemType(fields["type"]),
+            )
+            for message_id, fields in entries
+            if fields
+        ]
+
+
+def create_update_queue(redis_client) -> UpdateQueue:
+    return UpdateQueue(
+        redis_client=redis_client,
+        stream=settings.queue.STREAM,
+        group=settings.queue.GROUP,
+        max_len=settings.queue.MAX_LEN,
+        lanes=settings.queue.LANES,
+        dead_letter_stream=settings.queue.DEAD_LETTER_STREAM,
+    )
+
+
+async def get_update_queue(redis_client: RedisDI) -> UpdateQueue:
+    """Получить очередь входящих апдейтов"""
+    return create_update_queue(redis_client)
@@ -11,6 +11,7 @@ class UserState(BaseModel):
     variables: dict = Field(default_factory=dict)
     user_history: set[str] = Field(default_factory=set)
     db_data_loaded: dict[str, Any] = Field(default_factory=dict)
+    timer_id: Optional[str] = None
 
     model_config = {
         "from_attributes": True,
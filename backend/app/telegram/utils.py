@@ -12,6 +12,11 @@ ALLOWED_ATTRS = {
     'span': ['class'],  # только class="tg-spoiler"
 }
 
+COMMENT_PATTERN = re.compile(r'<!--.*?-->', re.DOTALL)
+TAG_PATTERN = re.compile(r'</?([a-zA-Z0-9]+)([^>]*)>', re.IGNORECASE)
+ATTR_PATTERN = re.compile(r'(\w+)\s*=\s*"(.*?)"')
+ANY_TAG_PATTERN = re.compile(r'<[^>]+>')
+
 
 def clean_telegram_html(text: str) -> str:
     def replace_tag(match):
@@ -27,7 +32,7 @@ def clean_telegram_html(text: str) -> str:
 
         # Парсим атрибуты (если есть)
         attr_string = match.group(2) or ''
-        attrs = re.findall(r'(\w+)\s*=\s*"(.*?)"', attr_string)
+        attrs = ATTR_PATTERN.findall(attr_string)
         allowed_attrs = []
 
         for attr, value in attrs:
@@ -41,11 +46,10 @@ def clean_telegram_html(text: str) -> str:
         return f"<{tag}{attr_str}>"
 
     # Удалим все комментарии
-    text = re.sub(r'<!--.*?-->', '', text, flags=re.DOTALL)
+    text = COMMENT_PATTERN.sub('', text)
 
     # Обработаем HTML-теги
-    tag_pattern = re.compile(r'</?([a-zA-Z0-9]+)([^>]*)>', re.IGNORECASE)
-    return tag_pattern.sub(replace_tag, text)
+    return TAG_PATTERN.sub(replace_tag, text)
 
 
 def format_message_to_buttons(
@@ -65,7 +69,7 @@ def format_message_to_buttons(
         max_total_length
     )
 
-    clean_text = re.sub(r'<[^>]+>', '', message)
+    clean_text = ANY_TAG_PATTERN.sub('', message)
     clean_text = clean_text[:max_total_length]
 
     if len(clean_text) > target_length:
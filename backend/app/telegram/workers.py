@@ -0,0 +1,462 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Awaitable, Callable, Optional
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import async_session_maker
+from app.core.metrics import metrics, Sample
+from app.core.s3 import get_s3_client
+from app.core.security import get_token_crypto
+from app.core.settings import settings
+from app.bots.repositories import BotRepository
+from app.bots.services import BotService
+from app.scenarios.repositories import ScenarioRepository, TriggerRepository
+from app.scenarios.services import ScenarioService
+from app.users_data.repositories import (
+    UserFieldRepository,
+    UserFieldValueRepository,
+    UserCurrentValueRepository,
+)
+from app.users_data.buffer import create_user_data_buffer
+from app.scenarios.buffer import create_draft_buffer
+from app.users_data.services import UserDataService
+from app.telegram.services.bot_manager import TelegramBotManager
+from app.telegram.services.update_processor import UpdateProcessor
+from app.telegram.services.bot_pool import bot_pool
+from app.telegram.services.scenario_cache import (
+    scenario_cache,
+    create_scenario_cache_invalidator,
+)
+from app.telegram.schemas.update import IncomingUpdate
+from app.telegram.storage.state_storage import RedisStateStorage
+from app.telegram.storage.delay_timer import DelayTimer
+from app.telegram.storage.file_id_cache import create_file_id_cache
+from app.broadcasts.audience import create_broadcast_audience
+from app.telegram.storage.timer_storage import (
+    DelayTimerStorage,
+    create_delay_timer_storage,
+)
+from app.telegram.storage.update_queue import (
+    UpdateQueue,
+    QueuedUpdate,
+    create_update_queue,
+)
+from app.enums import QueueItemType
+
+logger = logging.getLogger(__name__)
+
+UpdateHandler = Callable[[QueuedUpdate], Awaitable[None]]
+
+
+def build_update_processor(session: AsyncSession, redis_client) -> UpdateProcessor:
+    """Сборка обработчика апдейтов вне контекста HTTP-запроса"""
+    bot_repository = BotRepository(session)
+    scenario_repository = ScenarioRepository(session)
+    tg_bot_manager = TelegramBotManager(settings.app.WEBHOOK_URL)
+    cache_invalidator = create_scenario_cache_invalidator(redis_client)
+
+    return UpdateProcessor(
+        scenario_service=ScenarioService(
+            scenario_repository=scenario_repository,
+            trigger_repository=TriggerRepository(session),
+            bot_repository=bot_repository,
+            client=get_s3_client(),
+            cache_invalidator=cache_invalidator,
+            draft_buffer=create_draft_buffer(redis_client),
+        ),
+        user_data_service=UserDataService(
+            field_repository=UserFieldRepository(session),
+            value_repository=UserFieldValueRepository(session),
+            current_value_repository=UserCurrentValueRepository(session),
+            buffer=create_user_data_buffer(redis_client),
+        ),
+        bot_service=BotService(
+            bot_repository=bot_repository,
+            scenario_repository=scenario_repository,
+            tg_bot_manager=tg_bot_manager,
+            token_crypto=get_token_crypto(),
+            cache_invalidator=cache_invalidator,
+        ),
+        bot_pool=bot_pool,
+        state_storage=RedisStateStorage(redis_client),
+        delay_timers=create_delay_timer_storage(redis_client),
+        scenario_cache=scenario_cache,
+        file_ids=create_file_id_cache(redis_client),
+        audience=create_broadcast_audience(redis_client),
+    )
+
+
+def make_update_handler(redis_client) -> UpdateHandler:
+    """Обработчик апдейта из очереди: отдельная сессия БД на каждый апдейт.
+
+    Ошибка обработки пробрасывается, чтобы апдейт остался неподтверждённым.
+    """
+
+    async def handle(item: QueuedUpdate) -> None:
+        try:
+            if item.type == QueueItemType.TIMER:
+                timer = DelayTimer.model_validate_json(item.payload)
+            else:
+                update = IncomingUpdate.parse(item.payload)
+        except ValueError:
+            logger.warning("Dropping malformed queue item %s", item.message_id)
+            return
+        if item.type == QueueItemType.UPDATE and update is None:
+            return
+
+        async with async_session_maker() as session:
+            try:
+                processor = build_update_processor(session, redis_client)
+                if item.type == QueueItemType.TIMER:
+                    await processor.resume(timer)
+                else:
+                    await processor.process(item.webhook_token, update)
+                await session.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await session.rollback()
+                metrics.inc("telegram_updates_failed_total")
+                logger.exception("Failed to process update %s", item.message_id)
+                raise
+
+    return handle
+
+
+class LaneWorker:
+    """Последовательная обработка одной дорожки очереди.
+
+    Апдейт, обработка которого завершилась ошибкой, не подтверждается:
+    дорожка перечитывает неподтверждённые апдейты и повторяет его раньше
+    следующих, сохраняя порядок. После MAX_DELIVERIES выдач апдейт
+    переносится в поток необработанных, чтобы не блокировать дорожку.
+    Подтверждённые апдейты периодически удаляются из потока дорожки.
+    """
+
+    def __init__(
+        self,
+        queue: UpdateQueue,
+        lane: int,
+        owner: str,
+        handler: UpdateHandler,
+    ):
+        self.queue = queue
+        self.lane = lane
+        self.owner = owner
+        self.handler = handler
+        self._stopping = False
+        self._trimmed_at = time.monotonic()
+
+    def stop(self) -> None:
+        """Остановиться после текущего апдейта"""
+        self._stopping = True
+
+    async def run(self) -> None:
+        try:
+            await self.queue.ensure_group(self.lane)
+
+            # Сначала дочитываем апдейты, не подтверждённые прошлым владельцем дорожки
+            pending = True
+            while not self._stopping:
+                try:
+                    # Неподтверждённые читаются по одному: каждое чтение
+                    # засчитывается как выдача всем прочитанным апдейтам
+                    items = await self.queue.read(
+                        self.lane,
+                        count=1 if pending else settings.queue.BATCH_SIZE,
+                        block_ms=settings.queue.BLOCK_MS,
+                        pending=pending,
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Failed to read lane %s", self.lane)
+                    await asyncio.sleep(1)
+                    continue
+
+                await self._trim()
+
+                if pending and not items:
+                    pending = False
+                    continue
+
+                for item in items:
+                    if pending and await self._dead_letter_exhausted(item):
+                        continue
+                    if not await self._process(item):
+                        pending = True
+                        await asyncio.sleep(settings.queue.RETRY_DELAY)
+                        break
+                    if self._stopping:
+                        break
+        finally:
+            await self.queue.release_lease(self.lane, self.owner)
+
+    async def _trim(self) -> None:
+        """Удалить из дорожки подтверждённые апдейты раз в TRIM_INTERVAL"""
+        if time.monotonic() - self._trimmed_at < settings.queue.TRIM_INTERVAL:
+            return
+        self._trimmed_at = time.monotonic()
+        try:
+            trimmed = await self.queue.trim(self.lane)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Failed to trim lane %s", self.lane)
+            return
+        metrics.inc("telegram_updates_trimmed_total", trimmed, lane=str(self.lane))
+
+    async def _dead_letter_exhausted(self, item: QueuedUpdate) -> bool:
+        """Перенести апдейт в поток необработанных, если попытки исчерпаны"""
+        deliveries = await self.queue.delivery_count(self.lane, item.message_id)
+        if deliveries <= settings.queue.MAX_DELIVERIES:
+            return False
+
+        await self.queue.dead_letter(self.lane, item)
+        metrics.inc("telegram_updates_dead_lettered_total", lane=str(self.lane))
+        logger.error(
+            "Update %s moved to dead letter stream after %s deliveries",
+            item.message_id,
+            deliveries,
+        )
+        return True
+
+    async def _process(self, item: QueuedUpdate) -> bool:
+        """Обработать и подтвердить апдейт; False, если обработка не удалась"""
+        started = time.monotonic()
+        try:
+            await self.handler(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return False
+        await self.queue.ack(self.lane, item.message_id)
+
+        lane = str(self.lane)
+        metrics.inc("telegram_updates_processed_total", lane=lane)
+        metrics.observe(
+            "telegram_update_processing_seconds",
+            time.monotonic() - started,
+            lane=lane,
+        )
+        return True
+
+
+class LaneDispatcher:
+    """Распределение дорожек очереди между процессами.
+
+    Каждый процесс регистрируется в общем списке участников и забирает
+    дорожки с номером lane % участников == свой индекс. Аренда дорожки
+    гарантирует, что при перераспределении её не обрабатывают двое.
+    """
+
+    def __init__(self, queue: UpdateQueue, handler: UpdateHandler):
+        self.queue = queue
+        self.handler = handler
+        self.member_id = f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}"
+        self._members_key = f"{queue.stream}:members"
+        self._workers: dict[int, tuple[LaneWorker, asyncio.Task]] = {}
+
+    async def run(self) -> None:
+        try:
+            while True:
+                try:
+                    await self._rebalance()
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Failed to rebalance update lanes")
+                await asyncio.sleep(settings.queue.REBALANCE_INTERVAL)
+        finally:
+            await self._shutdown()
+
+    async def _assigned_lanes(self) -> set[int]:
+        """Дорожки, закреплённые за текущим процессом"""
+        now = time.time()
+        ttl = settings.queue.LANE_LEASE_MS / 1000
+        redis = self.queue.redis
+
+        await redis.zadd(self._members_key, {self.member_id: now})
+        await redis.zremrangebyscore(self._members_key, "-inf", now - ttl)
+        members = sorted(await redis.zrange(self._members_key, 0, -1))
+
+        index = members.index(self.member_id)
+        return {
+            lane for lane in range(self.queue.lanes)
+            if lane % len(members) == index
+        }
+
+    async def _rebalance(self) -> None:
+        assigned = await self._assigned_lanes()
+        lease_ms = settings.queue.LANE_LEASE_MS
+
+        for lane, (worker, task) in list(self._workers.items()):
+            if task.done():
+                self._workers.pop(lane)
+            elif lane not in assigned:
+                worker.stop()
+            elif not await self.queue.renew_lease(lane, self.member_id, lease_ms):
+                logger.warning("Lost lease on lane %s", lane)
+                task.cancel()
+
+        for lane in assigned - self._workers.keys():
+            if await self.queue.acquire_lease(lane, self.member_id, lease_ms):
+                worker = LaneWorker(self.queue, lane, self.member_id, self.handler)
+                self._workers[lane] = (worker, asyncio.create_task(worker.run()))
+
+    async def _shutdown(self) -> None:
+        tasks = [task for _, task in self._workers.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers.clear()
+        await self.queue.redis.zrem(self._members_key, self.member_id)
+
+
+class DelayScheduler:
+    """Цикл срабатывания таймеров задержки.
+
+    Наступившие таймеры забираются пачками. В режиме очереди продолжение
+    сценария ставится в дорожку пользователя, чтобы выполниться по порядку
+    с его апдейтами, иначе выполняется сразу. Таймер удаляется только
+    после успешного срабатывания; неудавшийся повторяется с растущей
+    паузой, а после MAX_ATTEMPTS попыток переносится в отдельный список.
+    """
+
+    def __init__(
+        self,
+        timers: DelayTimerStorage,
+        redis_client,
+        queue: Optional[UpdateQueue] = None,
+    ):
+        self.timers = timers
+        self.redis = redis_client
+        self.queue = queue
+
+    async def run(self) -> None:
+        while True:
+            try:
+                fired = await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to fire delay timers")
+                fired = 0
+
+            if fired < settings.scheduler.BATCH_SIZE:
+                await asyncio.sleep(settings.scheduler.POLL_INTERVAL)
+
+    async def tick(self) -> int:
+        """Обработать одну пачку наступивших таймеров"""
+        timers = await self.timers.claim_due(
+            limit=settings.scheduler.BATCH_SIZE,
+            visibility_timeout=settings.scheduler.VISIBILITY_TIMEOUT,
+        )
+        semaphore = asyncio.Semaphore(settings.scheduler.CONCURRENCY)
+
+        async def fire(timer: DelayTimer) -> None:
+            async with semaphore:
+                await self._fire(timer)
+
+        await asyncio.gather(*(fire(timer) for timer in timers))
+        return len(timers)
+
+    async def _fire(self, timer: DelayTimer) -> None:
+        try:
+            if self.queue:
+                await self.queue.put(
+                    timer.webhook_token,
+                    timer.user_id,
+                    timer.model_dump_json(),
+                    item_type=QueueItemType.TIMER,
+                )
+            else:
+                await self._resume(timer)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Failed to fire delay timer %s", timer.id)
+            await self._retry(timer)
+            return
+
+        await self.timers.complete(timer.id)
+        metrics.inc("telegram_delay_timers_fired_total")
+
+    async def _resume(self, timer: DelayTimer) -> None:
+        async with async_session_maker() as session:
+            try:
+                processor = build_update_processor(session, self.redis)
+                await processor.resume(timer)
+                await session.commit()
+            except BaseException:
+                await session.rollback()
+                raise
+
+    async def _retry(self, timer: DelayTimer) -> None:
+        """Отложить неудавшийся таймер или перенести его в список необработанных"""
+        metrics.inc("telegram_delay_timers_failed_total")
+        attempts = await self.timers.failed_attempts(timer.id) + 1
+        if attempts >= settings.scheduler.MAX_ATTEMPTS:
+            await self.timers.dead_letter(timer)
+            metrics.inc("telegram_delay_timers_dead_lettered_total")
+            logger.error(
+                "Delay timer %s moved to dead letter list after %s attempts",
+                timer.id,
+                attempts,
+            )
+            return
+        await self.timers.retry(
+            timer.id,
+            settings.scheduler.RETRY_DELAY * 2 ** (attempts - 1),
+        )
+
+
+def start_delay_scheduler(redis_client) -> asyncio.Task:
+    """Запуск цикла таймеров задержки в текущем event loop"""
+    scheduler = DelayScheduler(
+        timers=create_delay_timer_storage(redis_client),
+        redis_client=redis_client,
+        queue=create_update_queue(redis_client) if settings.queue.ENABLED else None,
+    )
+    return asyncio.create_task(scheduler.run())
+
+
+def start_cache_invalidation_listener(redis_client) -> asyncio.Task:
+    """Подписка на инвалидацию кэша сценариев в текущем event loop"""
+    invalidator = create_scenario_cache_invalidator(redis_client)
+    return asyncio.create_task(invalidator.listen())
+
+
+def lane_metrics_collector(queue: UpdateQueue) -> Callable[[], Awaitable[list[Sample]]]:
+    """Сбор глубины и задержки обработки по каждой дорожке"""
+
+    async def collect() -> list[Sample]:
+        samples = []
+        for lane in range(queue.lanes):
+            stats = await queue.lane_stats(lane)
+            labels = {"lane": str(lane)}
+            samples.append(("telegram_update_lane_depth", labels, stats.depth))
+            samples.append(("telegram_update_lane_lag_seconds", labels, stats.lag_seconds))
+        return samples
+
+    return collect
+
+
+def start_update_workers(redis_client) -> asyncio.Task:
+    """Запуск обработчиков очереди в текущем event loop"""
+    dispatcher = LaneDispatcher(
+        queue=create_update_queue(redis_client),
+        handler=make_update_handler(redis_client),
+    )
+    return asyncio.create_task(dispatcher.run())
+
+
+async def stop_background_task(task: asyncio.Task) -> None:
+    """Остановка фоновой задачи"""
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
@@ -14,15 +14,16 @@ class UserModel(Base):
     hashed_password: Mapped[str] = mapped_column(String(256))
     is_admin: Mapped[bool] = mapped_column(default=False)
 
+    # Пользователь загружается на каждый запрос, его боты и сценарии — нет
     bots: Mapped[list["BotModel"]] = relationship(
         back_populates="user",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise",
     )
     scenarios: Mapped[list["ScenarioModel"]] = relationship(
         back_populates="user",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise",
     )
 
     registered_at: Mapped[datetime.datetime] = mapped_column(
@@ -0,0 +1,135 @@
+import time
+
+from app.core.settings import settings
+from app.core.dependencies.redis_deps import RedisDI
+from app.users_data.schemas import UserFieldSchema
+
+# Перенос до ARGV[1] значений из начала буфера в список обработчика
+CLAIM_SCRIPT = """
+redis.call('HSET', KEYS[3], ARGV[2], ARGV[3])
+local claimed = {}
+for i = 1, tonumber(ARGV[1]) do
+    local payload = redis.call('LMOVE', KEYS[1], KEYS[2], 'LEFT', 'RIGHT')
+    if not payload then
+        break
+    end
+    claimed[#claimed + 1] = payload
+end
+return claimed
+"""
+
+# Возврат незаписанных значений в начало буфера в прежнем порядке
+RELEASE_SCRIPT = """
+local moved = 0
+while redis.call('LMOVE', KEYS[2], KEYS[1], 'RIGHT', 'LEFT') do
+    moved = moved + 1
+end
+return moved
+"""
+
+# Возврат значений обработчиков, которые перестали отмечаться (процесс убит)
+REAP_SCRIPT = """
+local consumers = redis.call('HGETALL', KEYS[2])
+local moved = 0
+for i = 1, #consumers, 2 do
+    if tonumber(consumers[i + 1]) < tonumber(ARGV[2]) then
+        local processing = ARGV[1] .. consumers[i]
+        while redis.call('LMOVE', processing, KEYS[1], 'RIGHT', 'LEFT') do
+            moved = moved + 1
+        end
+        redis.call('HDEL', KEYS[2], consumers[i])
+    end
+end
+return moved
+"""
+
+
+class UserDataBuffer:
+    """Буфер значений пользователей для отложенной записи в БД.
+
+    Значения из апдейтов складываются в список Redis, откуда фоновые
+    обработчики забирают их пачками, поэтому буфер переживает перезапуск
+    процесса и общий для всех процессов. Пачка переносится в список
+    обработчика и снимается с него только после записи; значения
+    обработчика, который не отмечался дольше CLAIM_TIMEOUT, возвращаются
+    в буфер.
+    """
+
+    def __init__(self, redis_client, key: str, dead_letter_key: str):
+        self.redis = redis_client
+        self.key = key
+        self.dead_letter_key = dead_letter_key
+        self.consumers_key = f"{key}:consumers"
+        self.processing_prefix = f"{key}:processing:"
+
+    async def push(self, items: list[UserFieldSchema]) -> None:
+        if items:
+            await self.redis.rpush(self.key, *(item.model_dump_json() for item in items))
+
+    async def claim(self, consumer: str, count: int) -> list[str]:
+        """Взять пачку на запись; значения возвращаются в том виде, в каком лежат в буфере"""
+        return await self.redis.eval(
+            CLAIM_SCRIPT,
+            3,
+            self.key,
+            self.processing_prefix + consumer,
+            self.consumers_key,
+            count,
+            consumer,
+            time.time(),
+        )
+
+    async def heartbeat(self, consumer: str) -> None:
+        """Отметить, что обработчик жив и его пачку не нужно возвращать"""
+        await self.redis.hset(self.consumers_key, consumer, time.time())
+
+    async def ack(self, consumer: str, payloads: list[str]) -> None:
+        """Снять записанные значения со списка обработчика"""
+        if not payloads:
+            return
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for payload in payloads:
+                pipe.lrem(self.processing_prefix + consumer, 1, payload)
+            await pipe.execute()
+
+    async def release(self, consumer: str) -> None:
+        """Вернуть незаписанную пачку обработчика в начало буфера"""
+        await self.redis.eval(RELEASE_SCRIPT, 2, self.key, self.processing_prefix + consumer)
+
+    async def unregister(self, consumer: str) -> None:
+        await self.release(consumer)
+        await self.redis.hdel(self.consumers_key, consumer)
+
+    async def reap(self) -> int:
+        """Вернуть в буфер пачки остановленных обработчиков; возвращает число значений"""
+        return await self.redis.eval(
+            REAP_SCRIPT,
+            2,
+            self.key,
+            self.consumers_key,
+            self.processing_prefix,
+            time.time() - settings.persistence.CLAIM_TIMEOUT,
+        )
+
+    async def dead_letter(self, consumer: str, payload: str) -> None:
+        """Перенести значение, которое не удаётся записать в БД, в отдельный список"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_prefix + consumer, 1, payload)
+            pipe.rpush(self.dead_letter_key, payload)
+            await pipe.execute()
+
+    async def size(self) -> int:
+        return await self.redis.llen(self.key)
+
+
+def create_user_data_buffer(redis_client) -> UserDataBuffer:
+    return UserDataBuffer(
+        redis_client,
+        key=settings.persistence.BUFFER_KEY,
+        dead_letter_key=settings.persistence.DEAD_LETTER_KEY,
+    )
+
+
+async def get_user_data_buffer(redis_client: RedisDI) -> UserDataBuffer:
+    """Получить буфер значений пользователей"""
+    return create_user_data_buffer(redis_client)
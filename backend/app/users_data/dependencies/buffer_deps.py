@@ -0,0 +1,7 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from app.users_data.buffer import UserDataBuffer, get_user_data_buffer
+
+UserDataBufferDI = Annotated[UserDataBuffer, Depends(get_user_data_buffer)]
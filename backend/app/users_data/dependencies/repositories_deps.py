@@ -2,9 +2,16 @@ from typing import Annotated
 
 from fastapi import Depends
 
-from app.users_data.repositories import UserFieldRepository, UserFieldValueRepository
+from app.users_data.repositories import (
+    UserFieldRepository,
+    UserFieldValueRepository,
+    UserCurrentValueRepository,
+)
 
 UserFieldRepositoryDI = Annotated[UserFieldRepository, Depends(UserFieldRepository)]
 UserFieldValueRepositoryDI = Annotated[
     UserFieldValueRepository, Depends(UserFieldValueRepository)
 ]
+UserCurrentValueRepositoryDI = Annotated[
+    UserCurrentValueRepository, Depends(UserCurrentValueRepository)
+]
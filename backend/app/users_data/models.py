@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import DateTime, func, String, ForeignKey, BigInteger
+from sqlalchemy import DateTime, func, String, ForeignKey, BigInteger, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -10,6 +10,9 @@ from app.enums import FieldType
 
 class UserFieldModel(Base):
     __tablename__ = "user_fields"
+    __table_args__ = (
+        UniqueConstraint("scenario_id", "variable", name="uq_user_fields_scenario_id_variable"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(255))
@@ -21,10 +24,19 @@ class UserFieldModel(Base):
     )
     scenario: Mapped["ScenarioModel"] = relationship(back_populates="fields")
     
+    # Значения читаются постранично отдельными запросами, случайная
+    # загрузка всех ответов пользователей через поле — ошибка
     values: Mapped[list["UserFieldValueModel"]] = relationship(
         back_populates="field",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,
+        lazy="raise",
+    )
+    current_values: Mapped[list["UserCurrentValueModel"]] = relationship(
+        back_populates="field",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise",
     )
 
     created_at: Mapped[datetime] = mapped_column(
@@ -34,6 +46,17 @@ class UserFieldModel(Base):
 
 class UserFieldValueModel(Base):
     __tablename__ = "user_field_values"
+    __table_args__ = (
+        # Последнее значение переменной пользователя читается по индексу
+        Index(
+            "ix_user_field_values_field_id_user_id_created_at",
+            "field_id",
+            "user_id",
+            "created_at",
+        ),
+        # История ответов сценария читается страницами по id
+        Index("ix_user_field_values_scenario_id_id", "scenario_id", "id"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     
@@ -44,6 +67,10 @@ class UserFieldValueModel(Base):
         ForeignKey("user_fields.id", ondelete="CASCADE"),
     )
     field: Mapped["UserFieldModel"] = relationship(back_populates="values")
+    # Копия user_fields.scenario_id для чтения истории без соединения
+    scenario_id: Mapped[int] = mapped_column(
+        ForeignKey("scenarios.id", ondelete="CASCADE"),
+    )
     
     value: Mapped[str] = mapped_column(String(500))
     
@@ -51,3 +78,30 @@ class UserFieldValueModel(Base):
         DateTime(timezone=True),
         server_default=func.now(),
     )
+
+
+class UserCurrentValueModel(Base):
+    """Последнее значение переменной пользователя в сценарии"""
+
+    __tablename__ = "user_current_values"
+
+    scenario_id: Mapped[int] = mapped_column(
+        ForeignKey("scenarios.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    variable: Mapped[str] = mapped_column(String(255), primary_key=True)
+
+    field_id: Mapped[int] = mapped_column(
+        ForeignKey("user_fields.id", ondelete="CASCADE"),
+        index=True,
+    )
+    field: Mapped["UserFieldModel"] = relationship(back_populates="current_values")
+
+    username: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    value: Mapped[str] = mapped_column(String(500))
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
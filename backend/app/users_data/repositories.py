@@ -1,10 +1,17 @@
-from typing import Optional
+from typing import Optional, Sequence
 
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from collections import Counter
+
+from sqlalchemy import Row, select, insert, update, tuple_, bindparam, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.core.dependencies.db_deps import AsyncSessionDI
-from app.users_data.models import UserFieldModel, UserFieldValueModel
+from app.scenarios.models import ScenarioModel
+from app.users_data.models import (
+    UserFieldModel,
+    UserFieldValueModel,
+    UserCurrentValueModel,
+)
 
 
 class UserFieldRepository:
@@ -17,16 +24,20 @@ class UserFieldRepository:
         await self._session.refresh(user_field)
         return user_field
 
-    async def get_field_by_scenario_id(
-        self,
-        scenario_id: int,
-    ) -> Optional[UserFieldModel]:
+    async def upsert_fields(self, fields: list[dict]) -> dict[tuple[int, str], int]:
+        """Создать недостающие поля одним запросом, id полей по (scenario_id, variable).
+
+        Транзакция не фиксируется: поля сохраняются вместе со значениями.
+        """
+        stmt = pg_insert(UserFieldModel).values(fields)
         result = await self._session.execute(
-            select(UserFieldModel)
-            .options(selectinload(UserFieldModel.values))
-            .where(UserFieldModel.scenario_id == scenario_id)
+            stmt.on_conflict_do_update(
+                constraint="uq_user_fields_scenario_id_variable",
+                set_={"name": stmt.excluded.name, "type": stmt.excluded.type},
+            )
+            .returning(UserFieldModel.id, UserFieldModel.scenario_id, UserFieldModel.variable)
         )
-        return result.scalar_one_or_none()
+        return {(row.scenario_id, row.variable): row.id for row in result}
 
 
 class UserFieldValueRepository:
@@ -41,3 +52,141 @@ class UserFieldValueRepository:
         await self._session.commit()
         await self._session.refresh(user_field_value)
         return user_field_value
+
+    async def create_user_field_values(self, values: list[dict]) -> None:
+        """Вставка значений одним многострочным INSERT"""
+        await self._session.execute(insert(UserFieldValueModel).values(values))
+        await self._session.commit()
+
+    async def get_scenario_history(
+        self,
+        scenario_id: int,
+        after_id: Optional[int],
+        limit: int,
+    ) -> Sequence[Row]:
+        """Страница всех ответов сценария по убыванию id, по индексу (scenario_id, id)"""
+        query = (
+            select(
+                UserFieldValueModel.id,
+                UserFieldValueModel.user_id,
+                UserFieldValueModel.username,
+                UserFieldValueModel.value,
+                UserFieldValueModel.created_at,
+                UserFieldModel.variable,
+                UserFieldModel.name,
+                UserFieldModel.type,
+            )
+            .join(UserFieldModel, UserFieldModel.id == UserFieldValueModel.field_id)
+            .where(UserFieldValueModel.scenario_id == scenario_id)
+            .order_by(UserFieldValueModel.id.desc())
+            .limit(limit)
+        )
+        if after_id is not None:
+            query = query.where(UserFieldValueModel.id < after_id)
+
+        result = await self._session.execute(query)
+        return result.all()
+
+
+class UserCurrentValueRepository:
+    def __init__(self, session: AsyncSessionDI):
+        self._session = session
+
+    async def get_values(
+        self,
+        scenario_id: int,
+        user_id: int,
+    ) -> Sequence[Row]:
+        """Последние значения переменных пользователя в сценарии с описанием полей"""
+        result = await self._session.execute(
+            select(
+                UserCurrentValueModel.variable,
+                UserFieldModel.name,
+                UserFieldModel.type,
+                UserCurrentValueModel.value,
+            )
+            .join(UserFieldModel, UserFieldModel.id == UserCurrentValueModel.field_id)
+            .where(
+                UserCurrentValueModel.scenario_id == scenario_id,
+                UserCurrentValueModel.user_id == user_id,
+            )
+        )
+        return result.all()
+
+    async def get_scenario_values(
+        self,
+        scenario_id: int,
+        after: Optional[tuple[int, str]],
+        limit: int,
+    ) -> Sequence[Row]:
+        """Страница последних значений сценария по порядку первичного ключа"""
+        query = (
+            select(
+                UserCurrentValueModel.user_id,
+                UserCurrentValueModel.username,
+                UserCurrentValueModel.variable,
+                UserCurrentValueModel.value,
+                UserCurrentValueModel.updated_at,
+                UserFieldModel.name,
+                UserFieldModel.type,
+            )
+            .join(UserFieldModel, UserFieldModel.id == UserCurrentValueModel.field_id)
+            .where(UserCurrentValueModel.scenario_id == scenario_id)
+            .order_by(UserCurrentValueModel.user_id, UserCurrentValueModel.variable)
+            .limit(limit)
+        )
+        if after is not None:
+            query = query.where(
+                tuple_(UserCurrentValueModel.user_id, UserCurrentValueModel.variable)
+                > tuple_(*after)
+            )
+
+        result = await self._session.execute(query)
+        return result.all()
+
+    async def upsert_values(self, values: list[dict]) -> None:
+        """Заменить последние значения переменных одним запросом.
+
+        Значение заменяется, только если ответ не старше сохранённого:
+        пачки из буфера могут записываться не в порядке ответов.
+        Новые переменные увеличивают счётчик значений сценария.
+        Транзакция не фиксируется: значения сохраняются вместе с историей.
+        """
+        stmt = pg_insert(UserCurrentValueModel).values(values)
+        result = await self._session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[
+                    UserCurrentValueModel.scenario_id,
+                    UserCurrentValueModel.user_id,
+                    UserCurrentValueModel.variable,
+                ],
+                set_={
+                    "field_id": stmt.excluded.field_id,
+                    "username": stmt.excluded.username,
+                    "value": stmt.excluded.value,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+                where=UserCurrentValueModel.updated_at <= stmt.excluded.updated_at,
+            )
+            # xmax = 0 только у вставленных строк, обновлённые уже учтены
+            .returning(UserCurrentValueModel.scenario_id, literal_column("xmax = 0").label("inserted"))
+        )
+        inserted = Counter(row.scenario_id for row in result if row.inserted)
+        if not inserted:
+            return
+
+        # Сценарии блокируются по возрастанию id, чтобы параллельные записи не взаимоблокировались
+        scenarios = ScenarioModel.__table__
+        await self._session.execute(
+            update(scenarios)
+            .where(scenarios.c.id == bindparam("scenario_id"))
+            .values(
+                values_count=scenarios.c.values_count + bindparam("inserted"),
+                # Счётчик не считается изменением сценария
+                updated_at=scenarios.c.updated_at,
+            ),
+            [
+                {"scenario_id": scenario_id, "inserted": count}
+                for scenario_id, count in sorted(inserted.items())
+            ],
+        )
@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.enums import FieldType
 
@@ -19,7 +19,6 @@ class UserFieldCreateSchema(UserFieldBaseSchema):
 
 class UserFieldReadSchema(UserFieldBaseSchema):
     id: int
-    values: list["UserFieldValueReadSchema"]
     created_at: datetime
 
     model_config = {
@@ -46,5 +45,50 @@ class UserFieldValueReadSchema(UserFieldValueBaseSchema):
     }
 
 
+class UserValueReadSchema(UserFieldValueBaseSchema):
+    name: str
+    type: FieldType
+    variable: str
+    updated_at: datetime
+
+    model_config = {
+        "from_attributes": True,
+    }
+
+
+class UserValuePageSchema(BaseModel):
+    items: list[UserValueReadSchema]
+    next_cursor: Optional[str]
+
+
+class UserValueHistoryReadSchema(UserFieldValueBaseSchema):
+    id: int
+    name: str
+    type: FieldType
+    variable: str
+    created_at: datetime
+
+    model_config = {
+        "from_attributes": True,
+    }
+
+
+class UserValueHistoryPageSchema(BaseModel):
+    items: list[UserValueHistoryReadSchema]
+    next_cursor: Optional[int]
+
+
 class UserFieldSchema(UserFieldValueBaseSchema, UserFieldBaseSchema):
-    pass
+    # Время ответа, а не записи в БД: по нему отбрасываются устаревшие значения
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class UserVariableValueSchema(BaseModel):
+    variable: str
+    name: str
+    type: FieldType
+    value: str
+
+    model_config = {
+        "from_attributes": True,
+    }
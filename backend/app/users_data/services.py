@@ -1,17 +1,21 @@
 from typing import Optional
 
+from app.core.settings import settings
 from app.users_data.dependencies.repositories_deps import (
     UserFieldRepositoryDI,
     UserFieldValueRepositoryDI,
+    UserCurrentValueRepositoryDI,
 )
+from app.users_data.dependencies.buffer_deps import UserDataBufferDI
+from app.users_data.exceptions.services_exceptions import InvalidCursorError
 from app.users_data.schemas import (
-    UserFieldCreateSchema,
-    UserFieldReadSchema,
-    UserFieldValueCreateSchema,
-    UserFieldValueReadSchema,
     UserFieldSchema,
+    UserVariableValueSchema,
+    UserValueReadSchema,
+    UserValuePageSchema,
+    UserValueHistoryReadSchema,
+    UserValueHistoryPageSchema,
 )
-from app.users_data.models import UserFieldModel, UserFieldValueModel
 
 
 class UserDataService:
@@ -19,77 +23,116 @@ class UserDataService:
         self,
         field_repository: UserFieldRepositoryDI,
         value_repository: UserFieldValueRepositoryDI,
+        current_value_repository: UserCurrentValueRepositoryDI,
+        buffer: UserDataBufferDI,
     ):
         self._field_repo = field_repository
         self._value_repo = value_repository
+        self._current_value_repo = current_value_repository
+        self._buffer = buffer
 
-    async def get_field_by_scenario_id(
+    async def get_latest_values(
         self,
         scenario_id: int,
-    ) -> UserFieldReadSchema:
-        field = await self._field_repo.get_field_by_scenario_id(scenario_id)
-        if not field:
-            return None
-        return UserFieldReadSchema.model_validate(field)
+        user_id: int,
+    ) -> list[UserVariableValueSchema]:
+        """Последние сохранённые значения переменных пользователя в сценарии"""
+        rows = await self._current_value_repo.get_values(scenario_id, user_id)
+        return [UserVariableValueSchema.model_validate(row) for row in rows]
 
-    async def save_user_data(
+    async def get_scenario_values(
         self,
-        user_data: UserFieldSchema,
-    ) -> None:
-        """Сохранение данных пользователя"""
-        # Получаем или создаем поле
-        field = await self._get_or_create_field(
-            field_data=UserFieldCreateSchema(
-                name=user_data.name,
-                type=user_data.type,
-                variable=user_data.variable,
-                scenario_id=user_data.scenario_id,
-            ),
-        )
+        scenario_id: int,
+        cursor: Optional[str],
+        limit: int,
+    ) -> UserValuePageSchema:
+        """Страница последних значений сценария; курсор — "user_id:variable" последней записи"""
+        after = None
+        if cursor is not None:
+            user_id, _, variable = cursor.partition(":")
+            try:
+                after = (int(user_id), variable)
+            except ValueError:
+                raise InvalidCursorError
 
-        # Сохраняем значение поля
-        await self._create_field_value(
-            value_data=UserFieldValueCreateSchema(
-                user_id=user_data.user_id,
-                username=user_data.username,
-                field_id=field.id,
-                value=user_data.value,
-            ),
-        )
+        # Лишняя запись показывает, есть ли следующая страница
+        rows = await self._current_value_repo.get_scenario_values(scenario_id, after, limit + 1)
+        items = [UserValueReadSchema.model_validate(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = f"{items[-1].user_id}:{items[-1].variable}"
+        return UserValuePageSchema(items=items, next_cursor=next_cursor)
 
-    async def _get_or_create_field(
+    async def get_scenario_history(
         self,
-        field_data: UserFieldCreateSchema,
-    ) -> UserFieldReadSchema:
-        field = await self._field_repo.get_field_by_scenario_id(
-            scenario_id=field_data.scenario_id,
-        )
-        if field:
-            return field
-        return await self._create_field(field_data)
+        scenario_id: int,
+        cursor: Optional[int],
+        limit: int,
+    ) -> UserValueHistoryPageSchema:
+        """Страница всех ответов сценария, новые первыми; курсор — id последнего ответа"""
+        rows = await self._value_repo.get_scenario_history(scenario_id, cursor, limit + 1)
+        items = [UserValueHistoryReadSchema.model_validate(row) for row in rows[:limit]]
+        next_cursor = items[-1].id if len(rows) > limit else None
+        return UserValueHistoryPageSchema(items=items, next_cursor=next_cursor)
 
-    async def _create_field(
+    async def save_user_data(
         self,
-        field_data: UserFieldCreateSchema,
-    ) -> UserFieldReadSchema:
-        new_field = UserFieldModel(
-            name=field_data.name,
-            type=field_data.type,
-            variable=field_data.variable,
-            scenario_id=field_data.scenario_id,
-        )
-        field = await self._field_repo.create_field(new_field)
-        return UserFieldReadSchema.model_validate(field)
+        items: list[UserFieldSchema],
+    ) -> None:
+        """Сохранение данных пользователя сразу или через буфер отложенной записи"""
+        if settings.persistence.WRITE_BEHIND:
+            await self._buffer.push(items)
+        else:
+            await self.write_user_data(items)
 
-    async def _create_field_value(
+    async def write_user_data(
         self,
-        value_data: UserFieldValueCreateSchema,
-    ) -> UserFieldValueReadSchema:
-        new_value = UserFieldValueModel(
-            user_id=value_data.user_id,
-            username=value_data.username,
-            field_id=value_data.field_id,
-            value=value_data.value,
-        )
-        value = await self._value_repo.create_user_field_value(new_value)
-        return UserFieldValueReadSchema.model_validate(value)
+        items: list[UserFieldSchema],
+    ) -> None:
+        """Запись значений в одной транзакции: один запрос на поля, один на значения"""
+        if not items:
+            return
+
+        # Поле переменной сценария создаётся при первом значении
+        fields = {
+            (item.scenario_id, item.variable): {
+                "name": item.name,
+                "type": item.type,
+                "variable": item.variable,
+                "scenario_id": item.scenario_id,
+            }
+            for item in items
+        }
+        field_ids = await self._field_repo.upsert_fields(list(fields.values()))
+
+        values = [
+            {
+                "user_id": item.user_id,
+                "username": item.username,
+                "field_id": field_ids[(item.scenario_id, item.variable)],
+                "scenario_id": item.scenario_id,
+                "value": item.value,
+                "created_at": item.created_at,
+            }
+            for item in items
+        ]
+
+        # Последние значения обновляются в той же транзакции, что и история;
+        # из нескольких ответов на одну переменную берётся самый поздний
+        current_values = {}
+        for item, value in zip(items, values):
+            key = (item.scenario_id, item.user_id, item.variable)
+            if key in current_values and current_values[key]["updated_at"] > item.created_at:
+                continue
+            current_values[key] = {
+                "scenario_id": item.scenario_id,
+                "user_id": item.user_id,
+                "variable": item.variable,
+                "field_id": value["field_id"],
+                "username": item.username,
+                "value": item.value,
+                "updated_at": item.created_at,
+            }
+        await self._current_value_repo.upsert_values(list(current_values.values()))
+
+        await self._value_repo.create_user_field_values(values)
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.core.database import async_session_maker
+from app.core.metrics import metrics
+from app.core.settings import settings
+from app.users_data.buffer import UserDataBuffer, create_user_data_buffer
+from app.users_data.repositories import (
+    UserFieldRepository,
+    UserFieldValueRepository,
+    UserCurrentValueRepository,
+)
+from app.users_data.schemas import UserFieldSchema
+from app.users_data.services import UserDataService
+
+logger = logging.getLogger(__name__)
+
+# Ошибки, которые не исчезнут при повторе: нарушение ключей или неверные данные
+REJECTED_ERRORS = (IntegrityError, DataError)
+
+
+class UserDataFlusher:
+    """Перенос значений пользователей из буфера в БД.
+
+    Пачка переносится из буфера в список этого обработчика и
+    записывается одной транзакцией. Если запись не удалась
+    FLUSH_RETRIES раз, значения пишутся по одному, а отклонённые БД
+    переносятся в отдельный список, чтобы одно значение не
+    останавливало запись остальных. Значения снимаются со списка
+    обработчика только после записи: при ошибке или остановке они
+    возвращаются в начало буфера, а если процесс убит, их возвращает
+    в буфер другой обработчик. Порядок записи пачек не важен: последнее
+    значение переменной выбирается по времени ответа.
+    """
+
+    def __init__(self, buffer: UserDataBuffer):
+        self.buffer = buffer
+        self.consumer = uuid4().hex
+
+    async def run(self) -> None:
+        try:
+            while True:
+                try:
+                    written = await self.flush()
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Failed to flush user data")
+                    written = 0
+
+                if written < settings.persistence.FLUSH_SIZE:
+                    await asyncio.sleep(settings.persistence.FLUSH_INTERVAL)
+        finally:
+            try:
+                await self.buffer.unregister(self.consumer)
+            except Exception:
+                logger.exception("Failed to release user data flusher")
+
+    async def flush(self) -> int:
+        """Записать одну пачку; возвращает число записанных значений"""
+        reaped = await self.buffer.reap()
+        if reaped:
+            logger.warning("Requeued %s user data values of a stopped flusher", reaped)
+
+        payloads = await self.buffer.claim(self.consumer, settings.persistence.FLUSH_SIZE)
+        if not payloads:
+            return 0
+        items = [UserFieldSchema.model_validate_json(payload) for payload in payloads]
+
+        try:
+            written = await self._write_batch(items)
+            if written is None:
+                written = await self._write_each(payloads, items)
+            else:
+                await self.buffer.ack(self.consumer, payloads)
+        except BaseException:
+            await self.buffer.release(self.consumer)
+            raise
+
+        metrics.inc("user_data_flushed_total", written)
+        return written
+
+    async def _write_batch(self, items: list[UserFieldSchema]) -> Optional[int]:
+        """Запись пачки с повторами; None, если все попытки не удались"""
+        for attempt in range(1, settings.persistence.FLUSH_RETRIES + 1):
+            await self.buffer.heartbeat(self.consumer)
+            try:
+                await self._write(items)
+                return len(items)
+            except Exception:
+                metrics.inc("user_data_flush_errors_total")
+                logger.exception("Failed to write user data batch (attempt %s)", attempt)
+            if attempt < settings.persistence.FLUSH_RETRIES:
+                await asyncio.sleep(settings.persistence.FLUSH_INTERVAL)
+        return None
+
+    async def _write_each(self, payloads: list[str], items: list[UserFieldSchema]) -> int:
+        """Запись по одному значению; возвращает число записанных"""
+        written = 0
+        for payload, item in zip(payloads, items):
+            await self.buffer.heartbeat(self.consumer)
+            try:
+                await self._write([item])
+            except REJECTED_ERRORS:
+                await self.buffer.dead_letter(self.consumer, payload)
+                metrics.inc("user_data_dead_lettered_total")
+                logger.exception("User data value rejected, moved to dead letter list")
+            else:
+                await self.buffer.ack(self.consumer, [payload])
+                written += 1
+        return written
+
+    async def _write(self, items: list[UserFieldSchema]) -> None:
+        async with async_session_maker() as session:
+            service = UserDataService(
+                field_repository=UserFieldRepository(session),
+                value_repository=UserFieldValueRepository(session),
+                current_value_repository=UserCurrentValueRepository(session),
+                buffer=self.buffer,
+            )
+            await service.write_user_data(items)
+
+
+def start_user_data_flusher(redis_client) -> asyncio.Task:
+    """Запуск записи буфера значений пользователей в текущем event loop"""
+    return asyncio.create_task(UserDataFlusher(create_user_data_buffer(redis_client)).run())
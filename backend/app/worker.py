@@ -0,0 +1,45 @@
+import asyncio
+import logging
+
+from app.core.settings import settings
+from app.core.redis import create_redis_client
+from app.telegram.services.bot_pool import bot_pool
+from app.telegram.services.rate_limiter import create_rate_limiter
+from app.telegram.workers import (
+    start_update_workers,
+    start_delay_scheduler,
+    start_cache_invalidation_listener,
+    stop_background_task,
+)
+from app.broadcasts.workers import start_broadcast_runner
+from app.users_data.workers import start_user_data_flusher
+from app.scenarios.workers import start_draft_flusher
+
+
+async def main() -> None:
+    redis_client = create_redis_client()
+    if settings.telegram.RATE_LIMIT_ENABLED:
+        bot_pool.add_request_middleware(create_rate_limiter(redis_client))
+    tasks = [
+        start_cache_invalidation_listener(redis_client),
+        start_delay_scheduler(redis_client),
+        start_broadcast_runner(redis_client),
+    ]
+    if settings.queue.ENABLED:
+        tasks.append(start_update_workers(redis_client))
+    if settings.persistence.WRITE_BEHIND:
+        tasks.append(start_user_data_flusher(redis_client))
+    if settings.drafts.BUFFERED:
+        tasks.append(start_draft_flusher(redis_client))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            await stop_background_task(task)
+        await bot_pool.close()
+        await redis_client.aclose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
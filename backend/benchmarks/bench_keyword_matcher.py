@@ -0,0 +1,67 @@
+"""Сравнение поиска ключевых слов: прежняя проверка и автомат Ахо–Корасик.
+
+Запуск из каталога backend:
+
+    python -m benchmarks.bench_keyword_matcher
+"""
+import random
+import string
+import timeit
+
+from app.telegram.handlers.start.keyword_matcher import KeywordMatcher
+
+
+def legacy_search(keywords: list[str], message_text: str) -> bool:
+    """Прежняя реализация из TriggerHandler._check_trigger"""
+    message_text = message_text.lower()
+    return any(kw.lower() in message_text for kw in keywords)
+
+
+class AutomatonOnly(KeywordMatcher):
+    """Автомат без перехода на поиск подстрок для небольших наборов"""
+
+    AUTOMATON_THRESHOLD = 0
+
+
+def random_word(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+
+def run(keywords_count: int, text_length: int, number: int = 2000) -> None:
+    rng = random.Random(keywords_count * 31 + text_length)
+    keywords = [random_word(rng, rng.randint(4, 10)).upper() for _ in range(keywords_count)]
+    # Худший для старой реализации случай: совпадений нет
+    text = " ".join(
+        random_word(rng, rng.randint(3, 8)) for _ in range(text_length // 6)
+    )[:text_length]
+
+    matcher = KeywordMatcher(keywords)
+    automaton = KeywordMatcher(keywords)
+    if not automaton.use_automaton:
+        automaton = AutomatonOnly(keywords)
+    assert matcher.search(text) == automaton.search(text) == legacy_search(keywords, text)
+
+    legacy = timeit.timeit(lambda: legacy_search(keywords, text), number=number)
+    automaton_time = timeit.timeit(lambda: automaton.search(text), number=number)
+    compiled = timeit.timeit(lambda: matcher.search(text), number=number)
+    build = timeit.timeit(lambda: KeywordMatcher(keywords), number=10) / 10
+
+    print(
+        f"{keywords_count:>6} {text_length:>6} "
+        f"{legacy / number * 1e6:>12.2f} {automaton_time / number * 1e6:>12.2f} "
+        f"{compiled / number * 1e6:>12.2f} {legacy / compiled:>8.2f}x {build * 1e3:>10.2f}"
+    )
+
+
+def main() -> None:
+    print(
+        f"{'words':>6} {'text':>6} {'legacy, us':>12} {'automaton, us':>12} "
+        f"{'matcher, us':>12} {'speedup':>9} {'build, ms':>10}"
+    )
+    for keywords_count in (10, 100, 300, 1000, 3000):
+        for text_length in (20, 200, 1000):
+            run(keywords_count, text_length)
+
+
+if __name__ == "__main__":
+    main()
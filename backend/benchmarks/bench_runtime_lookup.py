@@ -0,0 +1,124 @@
+"""Время получения сценария по webhook-токену при промахе кэша.
+
+Сравнивает прежний путь (сценарий с графом ORM-объектов, ScenarioReadSchema
+и отдельный запрос токена бота) с одним запросом runtime-проекции.
+Нужна база из настроек приложения; тестовые данные создаются в транзакции,
+которая откатывается в конце.
+
+Запуск из каталога backend:
+
+    python -m benchmarks.bench_runtime_lookup
+"""
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+from app.core.database import async_session_maker
+from app.enums import TriggerType, FieldType
+from app.users.models import UserModel
+from app.bots.models import BotModel
+from app.bots.repositories import BotRepository
+from app.scenarios.models import ScenarioModel, TriggerModel
+from app.scenarios.repositories import ScenarioRepository
+from app.scenarios.schemas.scenario import ScenarioReadSchema
+from app.users_data.models import UserFieldModel
+
+ITERATIONS = 500
+
+
+def scenario_data(blocks_count: int) -> dict:
+    blocks = [{"id": "start", "type": "start", "data": {"triggers": []}}]
+    blocks += [
+        {"id": f"block-{i}", "type": "message", "data": {"text": f"Сообщение {i} " * 20}}
+        for i in range(blocks_count)
+    ]
+    edges = [
+        {"source": blocks[i]["id"], "target": blocks[i + 1]["id"]}
+        for i in range(blocks_count)
+    ]
+    return {"blocks": blocks, "edges": edges}
+
+
+async def seed(session, blocks_count: int) -> str:
+    webhook_token = uuid4().hex
+    user = UserModel(email=f"bench-{webhook_token}@example.com", hashed_password="-")
+    session.add(user)
+    await session.flush()
+
+    bot = BotModel(
+        first_name="Bench",
+        username=f"bench_{webhook_token[:16]}_bot",
+        encrypted_token="-",
+        webhook_token=webhook_token,
+        user_id=user.id,
+    )
+    session.add(bot)
+    await session.flush()
+
+    scenario = ScenarioModel(
+        name="Bench",
+        enabled=True,
+        data=scenario_data(blocks_count),
+        bot_id=bot.id,
+        user_id=user.id,
+        triggers=[
+            TriggerModel(type=TriggerType.KEY_WORD, data={"keywords": [f"word{i}"]}, enabled=True)
+            for i in range(5)
+        ],
+        fields=[
+            UserFieldModel(name=f"field{i}", type=FieldType.TEXT, variable=f"var{i}")
+            for i in range(5)
+        ],
+    )
+    session.add(scenario)
+    await session.flush()
+    return webhook_token
+
+
+async def legacy_lookup(session, webhook_token: str) -> None:
+    """Прежний путь UpdateProcessor._get_runtime"""
+    scenario = await ScenarioRepository(session).get_scenario_model_by_webhook_token(webhook_token)
+    ScenarioReadSchema.model_validate(scenario)
+    await BotRepository(session).get_encrypted_token_by_webhook_token(webhook_token)
+
+
+async def runtime_lookup(session, webhook_token: str) -> None:
+    await ScenarioRepository(session).get_runtime_by_webhook_token(webhook_token)
+
+
+async def measure(session, lookup, webhook_token: str) -> list[float]:
+    timings = []
+    for _ in range(ITERATIONS):
+        # Каждый апдейт обрабатывается в новой сессии, identity map пуст
+        session.expunge_all()
+        started = time.perf_counter()
+        await lookup(session, webhook_token)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95)]
+    print(
+        f"{name:>10} {statistics.mean(timings) * 1e3:>10.3f} "
+        f"{statistics.median(timings) * 1e3:>10.3f} {p95 * 1e3:>10.3f}"
+    )
+
+
+async def main() -> None:
+    async with async_session_maker() as session:
+        try:
+            for blocks_count in (10, 200):
+                webhook_token = await seed(session, blocks_count)
+                print(f"\nblocks: {blocks_count}")
+                print(f"{'lookup':>10} {'mean, ms':>10} {'median, ms':>10} {'p95, ms':>10}")
+                report("legacy", await measure(session, legacy_lookup, webhook_token))
+                report("runtime", await measure(session, runtime_lookup, webhook_token))
+        finally:
+            await session.rollback()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
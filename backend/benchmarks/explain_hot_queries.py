@@ -0,0 +1,341 @@
+"""Проверка планов запросов репозиториев на последовательное сканирование.
+
+Вызывает методы репозиториев, которые выполняются при обработке запросов
+API, апдейтов и в фоновых обработчиках, перехватывает выполненные запросы
+(SELECT, UPDATE, DELETE, INSERT, в том числе ON CONFLICT, и запросы с WITH) и
+получает для каждого план через EXPLAIN.
+Последовательное сканирование отключается настройкой enable_seqscan:
+если подходящего индекса нет, в плане всё равно остаётся Seq Scan, и
+проверка завершается с ошибкой. Нужна база из настроек приложения с
+применёнными миграциями; тестовые данные создаются в транзакции, которая
+откатывается в конце.
+
+Запуск из каталога backend:
+
+    python -m benchmarks.explain_hot_queries
+"""
+import asyncio
+import json
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy import event, text
+
+from app.core.database import async_session_maker, engine
+from app.enums import TriggerType, FieldType
+from app.users.models import UserModel
+from app.users.repositories import UserRepository
+from app.bots.models import BotModel
+from app.bots.repositories import BotRepository
+from app.bots.schemas import BotPatchSchema
+from app.broadcasts.models import BroadcastModel
+from app.broadcasts.repositories import BroadcastRepository
+from app.scenarios.models import ScenarioModel, TriggerModel
+from app.scenarios.repositories import ScenarioRepository, TriggerRepository
+from app.scenarios.schemas.trigger import TriggerSyncSchema, TriggerCreateSchema, TriggerPatchSchema
+from app.users_data.models import UserFieldModel, UserFieldValueModel, UserCurrentValueModel
+from app.users_data.repositories import (
+    UserFieldRepository,
+    UserFieldValueRepository,
+    UserCurrentValueRepository,
+)
+
+TELEGRAM_USER_ID = 100500
+BROADCAST_OWNER = "explain"
+EXPLAINED = ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")
+
+
+@contextmanager
+def captured_statements():
+    """Запросы, выполненные внутри блока"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(EXPLAINED):
+            # План executemany одинаков для всех наборов параметров
+            statements.append((statement, parameters[0] if executemany else parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+def seq_scans(plan: dict) -> list[str]:
+    """Таблицы, которые план читает последовательным сканированием"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found += seq_scans(child)
+    return found
+
+
+async def seed(session) -> dict:
+    webhook_token = uuid4().hex
+    user = UserModel(email=f"explain-{webhook_token}@example.com", hashed_password="-")
+    session.add(user)
+    await session.flush()
+
+    bot = BotModel(
+        first_name="Explain",
+        username=f"explain_{webhook_token[:16]}_bot",
+        encrypted_token="-",
+        webhook_token=webhook_token,
+        user_id=user.id,
+    )
+    session.add(bot)
+    await session.flush()
+
+    scenario = ScenarioModel(
+        name="Explain",
+        enabled=True,
+        data={"blocks": [], "edges": []},
+        bot_id=bot.id,
+        user_id=user.id,
+        triggers=[
+            TriggerModel(type=TriggerType.KEY_WORD, data={"keywords": ["word"]}, enabled=True),
+        ],
+    )
+    session.add(scenario)
+    await session.flush()
+
+    for i in range(3):
+        field = UserFieldModel(
+            name=f"field{i}",
+            type=FieldType.TEXT,
+            variable=f"var{i}",
+            scenario_id=scenario.id,
+            values=[UserFieldValueModel(
+                user_id=TELEGRAM_USER_ID,
+                scenario_id=scenario.id,
+                value=f"value{i}",
+            )],
+        )
+        session.add(field)
+        await session.flush()
+        session.add(UserCurrentValueModel(
+            scenario_id=scenario.id,
+            user_id=TELEGRAM_USER_ID,
+            variable=field.variable,
+            field_id=field.id,
+            value=f"value{i}",
+        ))
+    await session.flush()
+
+    broadcast = BroadcastModel(text="Explain", bot_id=bot.id, user_id=user.id)
+    session.add(broadcast)
+    await session.flush()
+
+    trigger_id = scenario.triggers[0].id
+    return {
+        "user_id": user.id,
+        "email": user.email,
+        "bot_id": bot.id,
+        "scenario_id": scenario.id,
+        "trigger_id": trigger_id,
+        "field_id": field.id,
+        "broadcast_id": broadcast.id,
+        "webhook_token": webhook_token,
+    }
+
+
+def hot_queries(session, ids: dict) -> dict:
+    users = UserRepository(session)
+    bots = BotRepository(session)
+    scenarios = ScenarioRepository(session)
+    triggers = TriggerRepository(session)
+    fields = UserFieldRepository(session)
+    values = UserFieldValueRepository(session)
+    current_values = UserCurrentValueRepository(session)
+    broadcasts = BroadcastRepository(session)
+    value = {
+        "user_id": TELEGRAM_USER_ID,
+        "username": "explain",
+        "field_id": ids["field_id"],
+        "scenario_id": ids["scenario_id"],
+        "value": "value",
+    }
+    return {
+        "users.get_user_model_by_email": lambda: users.get_user_model_by_email(ids["email"]),
+        "users.get_user_model_by_id": lambda: users.get_user_model_by_id(ids["user_id"]),
+        "bots.get_bot_summaries_by_user_id": (
+            lambda: bots.get_bot_summaries_by_user_id(ids["user_id"])
+        ),
+        "bots.get_bot_model_by_id": lambda: bots.get_bot_model_by_id(ids["bot_id"]),
+        "bots.get_bot_with_scenarios_by_id": (
+            lambda: bots.get_bot_with_scenarios_by_id(ids["bot_id"])
+        ),
+        "bots.get_encrypted_token_by_webhook_token": (
+            lambda: bots.get_encrypted_token_by_webhook_token(ids["webhook_token"])
+        ),
+        "bots.update_bot_by_id": (
+            lambda: bots.update_bot_by_id(ids["bot_id"], BotPatchSchema(first_name="Explain"))
+        ),
+        "bots.change_bot_status_by_id": lambda: bots.change_bot_status_by_id(ids["bot_id"], True),
+        "scenarios.get_scenario_summaries_by_user_id": (
+            lambda: scenarios.get_scenario_summaries_by_user_id(ids["user_id"], None, 50)
+        ),
+        "scenarios.get_scenario_model_by_id": (
+            lambda: scenarios.get_scenario_model_by_id(ids["scenario_id"])
+        ),
+        "scenarios.get_scenario_model_by_webhook_token": (
+            lambda: scenarios.get_scenario_model_by_webhook_token(ids["webhook_token"])
+        ),
+        "scenarios.get_runtime_by_webhook_token": (
+            lambda: scenarios.get_runtime_by_webhook_token(ids["webhook_token"])
+        ),
+        "scenarios.get_scenario_for_bot": (
+            lambda: scenarios.get_scenario_for_bot(ids["scenario_id"], ids["bot_id"])
+        ),
+        "scenarios.change_scenario_status_by_id": (
+            lambda: scenarios.change_scenario_status_by_id(ids["scenario_id"], True)
+        ),
+        "scenarios.get_scenario_owner_id": (
+            lambda: scenarios.get_scenario_owner_id(ids["scenario_id"])
+        ),
+        "scenarios.update_scenario_by_id": (
+            lambda: scenarios.update_scenario_by_id(ids["scenario_id"], {"name": "Explain"})
+        ),
+        "scenarios.get_active_version_hash": (
+            lambda: scenarios.get_active_version_hash(ids["scenario_id"])
+        ),
+        "scenarios.add_version": (
+            lambda: scenarios.add_version(ids["scenario_id"], "0" * 64, {"blocks": [], "edges": []})
+        ),
+        "scenarios.get_draft_revision": (
+            lambda: scenarios.get_draft_revision(ids["scenario_id"])
+        ),
+        "scenarios.get_draft_for_update": (
+            lambda: scenarios.get_draft_for_update(ids["scenario_id"], 0)
+        ),
+        "scenarios.patch_draft": (
+            lambda: scenarios.patch_draft(
+                ids["scenario_id"], 0, [{"op": "replace", "path": "/data", "value": {}}]
+            )
+        ),
+        "scenarios.replace_draft": (
+            lambda: scenarios.replace_draft(ids["scenario_id"], 1, {"data": {}})
+        ),
+        "scenarios.save_drafts": (
+            lambda: scenarios.save_drafts({ids["scenario_id"]: {"data": {}}})
+        ),
+        "triggers.get_trigger_model_by_id": (
+            lambda: triggers.get_trigger_model_by_id(ids["trigger_id"])
+        ),
+        "triggers.get_triggers_by_scenario_id": (
+            lambda: triggers.get_triggers_by_scenario_id(ids["scenario_id"])
+        ),
+        "triggers.sync_triggers": (
+            lambda: triggers.sync_triggers(ids["scenario_id"], TriggerSyncSchema(
+                create=[TriggerCreateSchema(type=TriggerType.KEY_WORD, data={}, enabled=True)],
+                update={ids["trigger_id"]: TriggerPatchSchema(enabled=True)},
+                delete=[0],
+            ))
+        ),
+        "users_data.upsert_fields": (
+            lambda: fields.upsert_fields([{
+                "name": "field0",
+                "type": FieldType.TEXT,
+                "variable": "var0",
+                "scenario_id": ids["scenario_id"],
+            }])
+        ),
+        "users_data.upsert_values": (
+            lambda: current_values.upsert_values([
+                {
+                    "scenario_id": ids["scenario_id"],
+                    "variable": "var2",
+                    "updated_at": datetime.now(timezone.utc),
+                    **value,
+                },
+            ])
+        ),
+        "users_data.create_user_field_values": (
+            lambda: values.create_user_field_values([value])
+        ),
+        "users_data.get_values": (
+            lambda: current_values.get_values(ids["scenario_id"], TELEGRAM_USER_ID)
+        ),
+        "users_data.get_scenario_values": (
+            lambda: current_values.get_scenario_values(ids["scenario_id"], None, 50)
+        ),
+        "users_data.get_scenario_history": (
+            lambda: values.get_scenario_history(ids["scenario_id"], None, 50)
+        ),
+        "broadcasts.get_known_chat_ids": lambda: broadcasts.get_known_chat_ids(ids["bot_id"]),
+        "broadcasts.get_broadcast_model_by_id": (
+            lambda: broadcasts.get_broadcast_model_by_id(ids["broadcast_id"])
+        ),
+        "broadcasts.get_broadcasts_by_user_id": (
+            lambda: broadcasts.get_broadcasts_by_user_id(ids["user_id"], ids["bot_id"])
+        ),
+        "broadcasts.get_encrypted_token_by_bot_id": (
+            lambda: broadcasts.get_encrypted_token_by_bot_id(ids["bot_id"])
+        ),
+        "broadcasts.claim_broadcast": lambda: broadcasts.claim_broadcast(BROADCAST_OWNER, 60),
+        "broadcasts.start_broadcast": (
+            lambda: broadcasts.start_broadcast(ids["broadcast_id"], BROADCAST_OWNER, 1)
+        ),
+        "broadcasts.checkpoint_broadcast": (
+            lambda: broadcasts.checkpoint_broadcast(
+                ids["broadcast_id"], BROADCAST_OWNER, 1, 1, 0, 0, 60
+            )
+        ),
+        "broadcasts.complete_broadcast": (
+            lambda: broadcasts.complete_broadcast(ids["broadcast_id"], BROADCAST_OWNER)
+        ),
+        "broadcasts.release_broadcast": (
+            lambda: broadcasts.release_broadcast(ids["broadcast_id"], BROADCAST_OWNER)
+        ),
+        "broadcasts.cancel_broadcast_by_id": (
+            lambda: broadcasts.cancel_broadcast_by_id(ids["broadcast_id"])
+        ),
+    }
+
+
+async def explain(session, statement: str, parameters) -> dict:
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+async def main() -> int:
+    failures = 0
+    async with async_session_maker() as session:
+        # Методы репозиториев фиксируют транзакцию; здесь всё остаётся
+        # в одной транзакции, которая откатывается в конце
+        session.commit = session.flush
+        try:
+            ids = await seed(session)
+            await session.execute(text("SET LOCAL enable_seqscan = off"))
+
+            for name, query in hot_queries(session, ids).items():
+                # Связанные объекты загружаются заново, как в новой сессии
+                session.expunge_all()
+                with captured_statements() as statements:
+                    await query()
+
+                tables = []
+                for statement, parameters in statements:
+                    tables += seq_scans(await explain(session, statement, parameters))
+
+                if tables:
+                    failures += 1
+                    print(f"FAIL {name}: seq scan on {', '.join(sorted(set(tables)))}")
+                else:
+                    print(f"  ok {name} ({len(statements)} queries)")
+        finally:
+            await session.rollback()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -2,7 +2,6 @@ import React, { useEffect, useState } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import api from '../utils/axios';
 import styled from 'styled-components';
-import { ChevronDown, ChevronUp } from 'lucide-react';
 import * as XLSX from 'xlsx';
 
 const Breadcrumbs = styled.nav`
@@ -70,12 +69,6 @@ const RowsSelect = styled.select`
   margin-left: 8px;
 `;
 
-const SortIcon = styled.span`
-  margin-left: 4px;
-  display: inline-flex;
-  vertical-align: middle;
-`;
-
 const NavigationLink = styled(Link)`
   color: var(--color-primary);
   font-size: 14px;
@@ -141,100 +134,112 @@ const PageContainer = styled.main`
 const CollectedDataPage: React.FC = () => {
   const { scenarioId } = useParams<{ scenarioId: string }>();
   const [scenario, setScenario] = useState<any>(null);
+  const [values, setValues] = useState<any[]>([]);
   const [loading, setLoading] = useState(true);
+  const [exporting, setExporting] = useState(false);
   const [error, setError] = useState<string | null>(null);
-  const [sortBy, setSortBy] = useState<string>('');
-  const [sortOrder, setSortOrder] = useState<'asc' | 'desc'>('asc');
   const [currentPage, setCurrentPage] = useState(1);
   const [rowsPerPage, setRowsPerPage] = useState(25);
+  // Курсоры открытых страниц: cursors[i] — курсор (i + 1)-й страницы
+  const [cursors, setCursors] = useState<(number | null)[]>([null]);
+  const [nextCursor, setNextCursor] = useState<number | null>(null);
 
   useEffect(() => {
     const fetchScenario = async () => {
-      setLoading(true);
       try {
         const res = await api.get(`/scenario/${scenarioId}`);
         setScenario(res.data);
       } catch (e: any) {
         const detail = e?.response?.data?.detail;
         setError(detail || 'Ошибка загрузки данных');
-      } finally {
-        setLoading(false);
       }
     };
     fetchScenario();
+    // Сброс страницы только при смене scenarioId
+    setCursors([null]);
+    setCurrentPage(1);
   }, [scenarioId]);
 
-  // Преобразуем данные для таблицы
-  const tableRows = scenario?.fields?.flatMap((field: any) =>
-    (field.values || []).map((value: any) => ({
-      name: field.name,
-      type: field.type,
-      user_id: value.user_id,
-      username: value.username,
-      value: value.value,
-      created_at: value.created_at,
-    }))
-  ) || [];
-
-  // Сортировка
-  const sortedRows = React.useMemo(() => {
-    if (!sortBy) return tableRows;
-    return [...tableRows].sort((a, b) => {
-      if (a[sortBy] === null || a[sortBy] === undefined) return 1;
-      if (b[sortBy] === null || b[sortBy] === undefined) return -1;
-      if (a[sortBy] === b[sortBy]) return 0;
-      if (sortOrder === 'asc') {
-        return a[sortBy] > b[sortBy] ? 1 : -1;
-      } else {
-        return a[sortBy] < b[sortBy] ? 1 : -1;
+  // Ответы загружаются по одной странице, новые сверху
+  useEffect(() => {
+    const fetchPage = async () => {
+      setLoading(true);
+      try {
+        const res = await api.get(`/scenario/${scenarioId}/values/history`, {
+          params: { cursor: cursors[currentPage - 1] ?? undefined, limit: rowsPerPage },
+        });
+        setValues(res.data.items);
+        setNextCursor(res.data.next_cursor);
+        setError(null);
+      } catch (e: any) {
+        const detail = e?.response?.data?.detail;
+        setError(detail || 'Ошибка загрузки данных');
+      } finally {
+        setLoading(false);
       }
-    });
-  }, [tableRows, sortBy, sortOrder]);
-
-  // Пагинация
-  const totalRows = sortedRows.length;
-  const totalPages = Math.ceil(totalRows / rowsPerPage) || 1;
-  const paginatedRows = sortedRows.slice((currentPage - 1) * rowsPerPage, currentPage * rowsPerPage);
+    };
+    fetchPage();
+  }, [scenarioId, cursors, currentPage, rowsPerPage]);
 
-  const handleSort = (key: string) => {
-    if (sortBy === key) {
-      setSortOrder(sortOrder === 'asc' ? 'desc' : 'asc');
-    } else {
-      setSortBy(key);
-      setSortOrder('asc');
-    }
-  };
+  // Преобразуем данные для таблицы
+  const toRow = (value: any) => ({
+    name: value.name,
+    type: value.type,
+    user_id: value.user_id,
+    username: value.username,
+    value: value.value,
+    created_at: value.created_at,
+  });
+  const tableRows = values.map(toRow);
 
   const handleRowsPerPageChange = (e: React.ChangeEvent<HTMLSelectElement>) => {
     setRowsPerPage(Number(e.target.value));
+    setCursors([null]);
     setCurrentPage(1);
   };
 
-  const handlePageChange = (page: number) => {
-    setCurrentPage(page);
+  const handleNextPage = () => {
+    if (nextCursor === null) return;
+    setCursors(prev => [...prev.slice(0, currentPage), nextCursor]);
+    setCurrentPage(currentPage + 1);
   };
 
-  // Сброс страницы только при смене scenarioId
-  useEffect(() => {
-    setCurrentPage(1);
-  }, [scenarioId]);
+  // Экспорт в Excel: вся история ответов загружается только по запросу
+  const handleExportExcel = async () => {
+    setExporting(true);
+    try {
+      const items: any[] = [];
+      let cursor: number | null = null;
+      do {
+        const page: any = await api.get(`/scenario/${scenarioId}/values/history`, {
+          params: { cursor: cursor ?? undefined, limit: 500 },
+        });
+        items.push(...page.data.items);
+        cursor = page.data.next_cursor;
+      } while (cursor !== null);
 
-  // Экспорт в Excel
-  const handleExportExcel = () => {
-    const exportData = sortedRows.map((row: any) => ({
-      'Название поля': row.name,
-      'Тип поля': row.type,
-      'ID пользователя': row.user_id,
-      'Имя пользователя': row.username || '-',
-      'Ответ': row.value,
-      'Время ответа': row.created_at ? new Date(row.created_at).toLocaleString() : '-',
-    }));
-    const worksheet = XLSX.utils.json_to_sheet(exportData);
-    const workbook = XLSX.utils.book_new();
-    XLSX.utils.book_append_sheet(workbook, worksheet, 'Данные');
-    XLSX.writeFile(workbook, 'collected_data.xlsx');
+      const exportData = items.map(toRow).map((row: any) => ({
+        'Название поля': row.name,
+        'Тип поля': row.type,
+        'ID пользователя': row.user_id,
+        'Имя пользователя': row.username || '-',
+        'Ответ': row.value,
+        'Время ответа': row.created_at ? new Date(row.created_at).toLocaleString() : '-',
+      }));
+      const worksheet = XLSX.utils.json_to_sheet(exportData);
+      const workbook = XLSX.utils.book_new();
+      XLSX.utils.book_append_sheet(workbook, worksheet, 'Данные');
+      XLSX.writeFile(workbook, 'collected_data.xlsx');
+    } catch (e: any) {
+      const detail = e?.response?.data?.detail;
+      setError(detail || 'Ошибка экспорта данных');
+    } finally {
+      setExporting(false);
+    }
   };
 
+  const exportDisabled = loading || exporting || !!error || tableRows.length === 0;
+
   return (
     <PageContainer>
       <Breadcrumbs>
@@ -244,10 +249,10 @@ const CollectedDataPage: React.FC = () => {
         <Title>Собранные данные</Title>
         <ExportButton 
           onClick={handleExportExcel} 
-          $disabled={loading || !!error || paginatedRows.length === 0}
-          disabled={loading || !!error || paginatedRows.length === 0}
+          $disabled={exportDisabled}
+          disabled={exportDisabled}
         >
-          Экспорт в Excel
+          {exporting ? 'Экспорт...' : 'Экспорт в Excel'}
         </ExportButton>
       </HeaderRow>
       {loading ? (
@@ -260,23 +265,12 @@ const CollectedDataPage: React.FC = () => {
             <thead>
               <Tr>
                 {columns.map(col => (
-                  <Th
-                    key={col.key}
-                    style={{ cursor: 'pointer', userSelect: 'none' }}
-                    onClick={() => handleSort(col.key)}
-                  >
-                    {col.label}
-                    {sortBy === col.key && (
-                      <SortIcon>
-                        {sortOrder === 'asc' ? <ChevronUp size={16} /> : <ChevronDown size={16} />}
-                      </SortIcon>
-                    )}
-                  </Th>
+                  <Th key={col.key}>{col.label}</Th>
                 ))}
               </Tr>
             </thead>
             <tbody>
-              {paginatedRows.map((row: any, idx: number) => (
+              {tableRows.map((row: any, idx: number) => (
                 <Tr key={idx}>
                   <Td>{row.name}</Td>
                   <Td>{row.type}</Td>
@@ -298,11 +292,10 @@ const CollectedDataPage: React.FC = () => {
               </RowsSelect>
             </div>
             <div>
-              <PageButton onClick={() => handlePageChange(1)} disabled={currentPage === 1}>{'<<'}</PageButton>
-              <PageButton onClick={() => handlePageChange(currentPage - 1)} disabled={currentPage === 1}>{'<'}</PageButton>
-              <span style={{ margin: '0 8px' }}>Страница {currentPage} из {totalPages}</span>
-              <PageButton onClick={() => handlePageChange(currentPage + 1)} disabled={currentPage === totalPages}>{'>'}</PageButton>
-              <PageButton onClick={() => handlePageChange(totalPages)} disabled={currentPage === totalPages}>{'>>'}</PageButton>
+              <PageButton onClick={() => setCurrentPage(1)} disabled={currentPage === 1}>{'<<'}</PageButton>
+              <PageButton onClick={() => setCurrentPage(currentPage - 1)} disabled={currentPage === 1}>{'<'}</PageButton>
+              <span style={{ margin: '0 8px' }}>Страница {currentPage}</span>
+              <PageButton onClick={handleNextPage} disabled={nextCursor === null}>{'>'}</PageButton>
             </div>
           </PaginationWrapper>
         </>
@@ -311,4 +304,4 @@ const CollectedDataPage: React.FC = () => {
   );
 };
 
-export default CollectedDataPage; 
\ No newline at end of file
+export default CollectedDataPage;
@@ -608,12 +608,6 @@ const truncateScenarioName = (name: string) => {
   return name.length > 40 ? name.slice(0, 40) + '...' : name;
 };
 
-// Вспомогательная функция для подсчета общего количества собранных данных
-const getTotalDataCount = (fields: any[] | null) => {
-  if (!fields || fields.length === 0) return 0;
-  return fields.reduce((total, field) => total + (field.values?.length || 0), 0);
-};
-
 // Хук для отслеживания ширины окна
 function useWindowWidth() {
   const [width, setWidth] = React.useState(window.innerWidth);
@@ -646,6 +640,7 @@ const DashboardPage: React.FC = () => {
   const [scenarioError, setScenarioError] = useState('');
   const [bots, setBots] = useState<any[]>([]);
   const [scenarios, setScenarios] = useState<any[]>([]);
+  const [scenariosCursor, setScenariosCursor] = useState<number | null>(null);
   const [isEditScenarioModalOpen, setIsEditScenarioModalOpen] = useState(false);
   const [selectedScenarioForEdit, setSelectedScenarioForEdit] = useState<{ id: string; name: string } | null>(null);
   const [newScenarioNameEdit, setNewScenarioNameEdit] = useState('');
@@ -664,10 +659,22 @@ const DashboardPage: React.FC = () => {
       setBots(res.data);
     } catch {}
   };
+  // Список сценариев отдаётся постранично: первая страница загружается сразу,
+  // следующие — по кнопке «Показать ещё»
   const fetchScenarios = async () => {
     try {
       const res = await api.get('/scenario');
-      setScenarios(res.data);
+      setScenarios(res.data.items);
+      setScenariosCursor(res.data.next_cursor);
+    } catch {}
+  };
+
+  const fetchMoreScenarios = async () => {
+    if (scenariosCursor === null) return;
+    try {
+      const res = await api.get('/scenario', { params: { cursor: scenariosCursor } });
+      setScenarios(prev => [...prev, ...res.data.items]);
+      setScenariosCursor(res.data.next_cursor);
     } catch {}
   };
 
@@ -1009,10 +1016,10 @@ const DashboardPage: React.FC = () => {
                             </ScenarioTriggers>
                           )}
                           <ScenarioInfoRight>
-                            {getTotalDataCount(scenario.fields) > 0 ? (
+                            {scenario.values_count > 0 ? (
                               <DataCollectionInfo type="button" tabIndex={0} title="Собранные данные" onClick={() => handleDataCollectionClick(scenario.id)}>
                                 <DataIcon />
-                                <DataCount>{getTotalDataCount(scenario.fields)}</DataCount>
+                                <DataCount>{scenario.values_count}</DataCount>
                               </DataCollectionInfo>
                             ) : null}
                             {windowWidth > 992 && (
@@ -1089,10 +1096,10 @@ const DashboardPage: React.FC = () => {
                       </ScenarioTriggers>
                     )}
                     <ScenarioInfoRight>
-                      {getTotalDataCount(scenario.fields) > 0 ? (
+                      {scenario.values_count > 0 ? (
                         <DataCollectionInfo type="button" tabIndex={0} title="Собранные данные" onClick={() => handleDataCollectionClick(scenario.id)}>
                           <DataIcon />
-                          <DataCount>{getTotalDataCount(scenario.fields)}</DataCount>
+                          <DataCount>{scenario.values_count}</DataCount>
                         </DataCollectionInfo>
                       ) : null}
                       {windowWidth > 992 && (
@@ -1134,6 +1141,13 @@ const DashboardPage: React.FC = () => {
           ))
         )}
       </BotList>
+      {scenariosCursor !== null && (
+        <div style={{ textAlign: 'center', marginTop: 16 }}>
+          <AddButton variant="outline" onClick={fetchMoreScenarios}>
+            Показать ещё сценарии
+          </AddButton>
+        </div>
+      )}
 
       {isModalOpen && (
         <Modal onClick={() => setIsModalOpen(false)}>
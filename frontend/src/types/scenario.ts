@@ -4,6 +4,8 @@ interface Trigger {
   enabled: boolean;
   data: {
     key_words?: string[];
+    whole_word?: boolean;
+    casefold?: boolean;
   };
 }
 